@@ -0,0 +1,133 @@
+"""Concurrent batch downloads for mac-utils"""
+
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .urls import canonical_key
+from .util import DownloaderSession, move_mp3_files_to_music_folder, yt_dlp_download
+from .video import move_video_files_to_downloads
+
+log = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+
+
+def read_urls(source: str) -> List[str]:
+    """Read URLs from a file, one per line
+
+    Blank lines and lines starting with ``#`` are ignored and duplicate URLs are
+    dropped, keeping the first occurrence. URLs are duplicates when they have the
+    same ``urls.canonical_key``, e.g. a youtu.be link and a watch URL of the video.
+
+    Args:
+        source: Path to the file, or "-" to read from stdin
+
+    Returns:
+        list: URLs in the order they were listed
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"URL file not found: {path}")
+        lines = path.read_text().splitlines()
+
+    urls: Dict[str, str] = {}
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith("#"):
+            urls.setdefault(canonical_key(url), url)
+    return list(urls.values())
+
+
+def download_batch(
+    jobs: List[Tuple[str, str]],
+    media_type: str,
+    workers: int = DEFAULT_WORKERS,
+    dry_run: bool = False,
+    output_dir: str = None,
+    force: bool = False,
+) -> Dict[str, Exception]:
+    """Download many URLs concurrently with a bounded worker pool
+
+    Every URL goes through ``yt_dlp_download`` so the history check, retry logic
+    and MP3 tagging are the same as for single downloads. Workers share one
+    ``DownloaderSession`` so each thread keeps its downloader warm between URLs.
+    Finished files are moved once after all downloads complete.
+
+    Args:
+        jobs: (url, media_company) pairs to download
+        media_type: Media type to download ('mp3' or 'video')
+        workers: Maximum number of concurrent downloads
+        dry_run: If True, only show what would be downloaded
+        output_dir: Custom output directory
+        force: If True, download even if URL exists in history
+
+    Returns:
+        dict: Exceptions raised by failed downloads, keyed by URL
+    """
+    if workers < 1:
+        raise ValueError("Number of workers must be at least 1")
+
+    failures: Dict[str, Exception] = {}
+    files: List[Path] = []
+    log.info(f"Downloading {len(jobs)} URL(s) with {workers} worker(s)...")
+
+    with (
+        DownloaderSession() as session,
+        ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mac-utils-dl") as executor,
+    ):
+        futures = {
+            executor.submit(
+                yt_dlp_download,
+                url,
+                media_company,
+                media_type,
+                dry_run=dry_run,
+                output_dir=output_dir,
+                force=force,
+                session=session,
+            ): url
+            for url, media_company in jobs
+        }
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                files.extend(future.result())
+            except Exception as e:
+                failures[url] = e
+
+    log.info(f"Batch complete: {len(jobs) - len(failures)} succeeded, {len(failures)} failed")
+    for url, error in failures.items():
+        log.error(f"   Failed: {url} - {error}")
+
+    if not dry_run and files:
+        move_downloaded_files(media_type, files, output_dir, force=force)
+
+    return failures
+
+
+def move_downloaded_files(
+    media_type: str, files: List[Path], output_dir: str = None, force: bool = False
+) -> None:
+    """Move finished downloads to their library folder
+
+    Args:
+        media_type: Media type that was downloaded ('mp3' or 'video')
+        files: Downloaded files to move
+        output_dir: Custom output directory - downloads are left there
+        force: If True, keep MP3s whose audio is already in the library
+    """
+    if output_dir:
+        return
+    if media_type == "mp3":
+        move_mp3_files_to_music_folder(files=files, force=force)
+    else:
+        move_video_files_to_downloads(files=files)
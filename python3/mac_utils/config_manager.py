@@ -1,8 +1,18 @@
-"""Configuration management for mac-utils"""
+"""Configuration management for mac-utils
+
+The config file is parsed once per process and cached. The cache is checked
+against the file's mtime at most once every ``CONFIG_RECHECK_INTERVAL`` seconds,
+so batch runs reading settings per item neither re-read nor re-parse the YAML.
+Values are validated against ``Config``; invalid values fall back to defaults
+with a warning. Subscribers are notified when the configuration changes.
+"""
 
 import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import yaml
 
@@ -11,13 +21,233 @@ log = logging.getLogger(__name__)
 DEFAULT_CONFIG_DIR = Path.home() / ".mac-utils"
 DEFAULT_CONFIG_FILE = DEFAULT_CONFIG_DIR / "config.yaml"
 
-DEFAULT_CONFIG = {
-    "retry_count": 3,
-    "retry_delay": 2,
-    "show_progress": True,
-    "log_level": "INFO",
-    "output_dir": None,
+CONFIG_RECHECK_INTERVAL = 1.0  # seconds
+
+_TRUE_VALUES = ("true", "1", "yes", "y", "on")
+_FALSE_VALUES = ("false", "0", "no", "n", "off")
+
+
+@dataclass(frozen=True)
+class Config:
+    """Validated configuration values"""
+
+    retry_count: int = 3
+    retry_delay: int = 2
+    retry_max_delay: int = 60
+    retry_max_elapsed: int = 300
+    show_progress: bool = True
+    log_level: str = "INFO"
+    output_dir: Optional[str] = None
+    batch_workers: int = 4
+    youtube_concurrency: int = 2
+    soundcloud_concurrency: int = 4
+    skip_duplicates: bool = True
+
+
+# Smallest allowed value of integer settings
+CONFIG_MINIMUMS = {
+    "retry_count": 1,
+    "retry_delay": 0,
+    "retry_max_delay": 0,
+    "retry_max_elapsed": 0,
+    "batch_workers": 1,
+    "youtube_concurrency": 1,
+    "soundcloud_concurrency": 1,
 }
+CONFIG_TYPES = {field.name: field.type for field in fields(Config)}
+DEFAULT_CONFIG = asdict(Config())
+
+# Called as callback(old, new) when the configuration changes
+ConfigListener = Callable[[Config, Config], None]
+
+
+def parse_config_value(key: str, value: Any) -> Any:
+    """Convert a value to the type of a config key
+
+    Args:
+        key: Configuration key
+        value: Value as given, e.g. a string from the command line
+
+    Returns:
+        The converted value. Values of unknown keys are returned unchanged
+
+    Raises:
+        ValueError: The value is not valid for the key
+    """
+    expected = CONFIG_TYPES.get(key)
+    if expected is None:
+        return value
+
+    if expected is bool:
+        if isinstance(value, bool):
+            return value
+        if str(value).strip().lower() in _TRUE_VALUES:
+            return True
+        if str(value).strip().lower() in _FALSE_VALUES:
+            return False
+        raise ValueError(f"{key} must be true or false")
+
+    if expected is int:
+        if isinstance(value, bool):
+            raise ValueError(f"{key} must be an integer")
+        try:
+            converted = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{key} must be an integer")
+        if converted != float(value):
+            raise ValueError(f"{key} must be an integer")
+        minimum = CONFIG_MINIMUMS.get(key)
+        if minimum is not None and converted < minimum:
+            raise ValueError(f"{key} must be at least {minimum}")
+        return converted
+
+    # Optional[str] and str
+    if value is None or value == "":
+        if expected is str:
+            raise ValueError(f"{key} must not be empty")
+        return None
+    return str(value)
+
+
+def validate_config(raw: Dict[str, Any]) -> Tuple[Config, Dict[str, Any]]:
+    """Validate raw config values
+
+    Args:
+        raw: Values read from the config file
+
+    Returns:
+        tuple: (typed Config, dict of all values including unknown keys)
+    """
+    values = dict(DEFAULT_CONFIG)
+    for key, value in raw.items():
+        try:
+            values[key] = parse_config_value(key, value)
+        except ValueError as e:
+            log.warning(f"Invalid config value {key}={value!r}: {e}. Using {values.get(key)!r}")
+
+    known = {key: values[key] for key in CONFIG_TYPES}
+    return Config(**known), values
+
+
+class ConfigStore:
+    """Process-wide cache of the parsed and validated config file"""
+
+    def __init__(self) -> None:
+        self._config = Config()
+        self._values: Dict[str, Any] = dict(DEFAULT_CONFIG)
+        self._stamp: Optional[Tuple] = None
+        self._checked_at: Optional[float] = None
+        self._listeners: List[ConfigListener] = []
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def file_stamp() -> Tuple:
+        """Identify the current state of the config file"""
+        try:
+            stat = DEFAULT_CONFIG_FILE.stat()
+        except FileNotFoundError:
+            return (str(DEFAULT_CONFIG_FILE), None, None)
+        return (str(DEFAULT_CONFIG_FILE), stat.st_mtime_ns, stat.st_size)
+
+    def _read(self) -> Dict[str, Any]:
+        """Read the raw values from the config file"""
+        if not DEFAULT_CONFIG_FILE.exists():
+            log.debug(f"No config file found at {DEFAULT_CONFIG_FILE}, using defaults")
+            return {}
+
+        try:
+            with open(DEFAULT_CONFIG_FILE, "r") as f:
+                config = yaml.safe_load(f) or {}
+            if not isinstance(config, dict):
+                raise ValueError("expected a mapping of keys to values")
+            log.debug(f"Loaded config from {DEFAULT_CONFIG_FILE}")
+            return config
+        except Exception as e:
+            log.warning(f"Error loading config file: {e}. Using defaults.")
+            return {}
+
+    def _update(self, config: Config, values: Dict[str, Any]) -> None:
+        """Replace the cached config and notify listeners if it changed"""
+        old = self._config
+        self._config, self._values = config, values
+        if config != old:
+            for listener in list(self._listeners):
+                try:
+                    listener(old, config)
+                except Exception as e:
+                    log.warning(f"Config listener failed: {e}")
+
+    def _refresh(self) -> None:
+        """Re-read the config file if it changed since it was cached"""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < CONFIG_RECHECK_INTERVAL:
+            return
+        self._checked_at = now
+
+        stamp = self.file_stamp()
+        if stamp == self._stamp:
+            return
+        self._stamp = stamp
+        self._update(*validate_config(self._read()))
+
+    def get(self) -> Config:
+        """Get the typed configuration"""
+        with self._lock:
+            self._refresh()
+            return self._config
+
+    def values(self) -> Dict[str, Any]:
+        """Get a copy of all configuration values, including unknown keys"""
+        with self._lock:
+            self._refresh()
+            return dict(self._values)
+
+    def save(self, values: Dict[str, Any]) -> None:
+        """Write values to the config file and cache them
+
+        Args:
+            values: Configuration dictionary to save
+        """
+        DEFAULT_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            try:
+                with open(DEFAULT_CONFIG_FILE, "w") as f:
+                    yaml.safe_dump(values, f, default_flow_style=False, sort_keys=False)
+                log.info(f"Configuration saved to {DEFAULT_CONFIG_FILE}")
+            except Exception as e:
+                log.error(f"Error saving config file: {e}")
+                return
+            self._stamp = self.file_stamp()
+            self._checked_at = time.monotonic()
+            self._update(*validate_config(values))
+
+    def subscribe(self, listener: ConfigListener) -> Callable[[], None]:
+        """Call a function whenever the configuration changes
+
+        Args:
+            listener: Called as listener(old, new) with ``Config`` values
+
+        Returns:
+            callable: Call it to unsubscribe
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def invalidate(self) -> None:
+        """Force the config file to be re-read on the next lookup"""
+        with self._lock:
+            self._stamp = None
+            self._checked_at = None
+
+
+config_store = ConfigStore()
 
 
 def get_config_path() -> Path:
@@ -30,29 +260,22 @@ def ensure_config_dir() -> None:
     DEFAULT_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def load_config() -> Dict[str, Any]:
-    """Load configuration from file
+def get_config() -> Config:
+    """Get the validated configuration
 
     Returns:
-        dict: Configuration dictionary
+        Config: Typed configuration values
     """
-    if not DEFAULT_CONFIG_FILE.exists():
-        log.debug(f"No config file found at {DEFAULT_CONFIG_FILE}, using defaults")
-        return DEFAULT_CONFIG.copy()
+    return config_store.get()
 
-    try:
-        with open(DEFAULT_CONFIG_FILE, "r") as f:
-            config = yaml.safe_load(f) or {}
 
-        # Merge with defaults (defaults for missing keys)
-        merged_config = DEFAULT_CONFIG.copy()
-        merged_config.update(config)
+def load_config() -> Dict[str, Any]:
+    """Load configuration from file
 
-        log.debug(f"Loaded config from {DEFAULT_CONFIG_FILE}")
-        return merged_config
-    except Exception as e:
-        log.warning(f"Error loading config file: {e}. Using defaults.")
-        return DEFAULT_CONFIG.copy()
+    Returns:
+        dict: Configuration dictionary
+    """
+    return config_store.values()
 
 
 def save_config(config: Dict[str, Any]) -> None:
@@ -61,14 +284,7 @@ def save_config(config: Dict[str, Any]) -> None:
     Args:
         config: Configuration dictionary to save
     """
-    ensure_config_dir()
-
-    try:
-        with open(DEFAULT_CONFIG_FILE, "w") as f:
-            yaml.safe_dump(config, f, default_flow_style=False, sort_keys=False)
-        log.info(f"Configuration saved to {DEFAULT_CONFIG_FILE}")
-    except Exception as e:
-        log.error(f"Error saving config file: {e}")
+    config_store.save(config)
 
 
 def get_config_value(key: str, default: Any = None) -> Any:
@@ -81,8 +297,9 @@ def get_config_value(key: str, default: Any = None) -> Any:
     Returns:
         Configuration value
     """
-    config = load_config()
-    return config.get(key, default)
+    if key in CONFIG_TYPES:
+        return getattr(config_store.get(), key)
+    return config_store.values().get(key, default)
 
 
 def set_config_value(key: str, value: Any) -> None:
@@ -91,12 +308,27 @@ def set_config_value(key: str, value: Any) -> None:
     Args:
         key: Configuration key
         value: Value to set
+
+    Raises:
+        ValueError: The value is not valid for the key
     """
     config = load_config()
-    config[key] = value
+    config[key] = parse_config_value(key, value)
     save_config(config)
 
 
+def subscribe(listener: ConfigListener) -> Callable[[], None]:
+    """Call a function whenever the configuration changes
+
+    Args:
+        listener: Called as listener(old, new) with ``Config`` values
+
+    Returns:
+        callable: Call it to unsubscribe
+    """
+    return config_store.subscribe(listener)
+
+
 def show_config() -> None:
     """Display current configuration"""
     config = load_config()
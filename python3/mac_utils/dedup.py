@@ -0,0 +1,318 @@
+"""Content-level deduplication of downloads
+
+URL history only catches the exact same link. This module also recognises the
+same media reached another way (a short link, a playlist entry, a repost):
+
+- Media IDs (the canonical key of the media's URL, see ``get_media_id``) are
+  recorded for every download and checked by a yt-dlp ``match_filter`` before
+  anything is downloaded.
+- A partial content hash of each downloaded file is recorded, and checked before
+  files are moved into the Music library, so identical audio isn't stored twice.
+
+Both live in the ``media`` table of the history database.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import history_manager
+from .timings import timed
+from .urls import parse_url
+
+log = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 256 * 1024  # bytes read from each sampled part of a file
+
+MEDIA_COLUMNS = ("media_id", "content_hash", "url", "title", "file_path", "timestamp")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    media_id TEXT,
+    content_hash TEXT,
+    url TEXT,
+    title TEXT,
+    file_path TEXT,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_media_media_id ON media (media_id);
+CREATE INDEX IF NOT EXISTS idx_media_content_hash ON media (content_hash);
+"""
+
+
+def connect() -> sqlite3.Connection:
+    """Open the history database with the media table created
+
+    Returns:
+        sqlite3.Connection: Connection with rows accessible by column name
+    """
+    conn = history_manager.connect()
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def get_media_id(info: Dict[str, Any]) -> Optional[str]:
+    """Get the canonical ID of a media item from its yt-dlp info
+
+    The ID is the key ``urls.canonical_key`` gives the item's page URL, so media IDs
+    match the keys of the download history and the job journal, e.g.
+    ``soundcloud:artist/track`` rather than SoundCloud's numeric track ID.
+
+    Args:
+        info: yt-dlp info dict - complete, or a flat playlist entry
+
+    Returns:
+        str or None: Canonical key of the item's URL, e.g. ``youtube:dQw4w9WgXcQ``,
+            or ``<extractor>:<id>`` for media on other sites
+    """
+    for url in (info.get("webpage_url"), info.get("url")):
+        parsed = parse_url(url or "")
+        if parsed and parsed.kind in ("video", "track"):
+            return parsed.key
+
+    extractor = info.get("extractor_key") or info.get("ie_key")
+    media_id = info.get("id")
+    return f"{extractor.lower()}:{media_id}" if extractor and media_id else None
+
+
+def _payload_range(f: Any, size: int, suffix: str) -> Tuple[int, int]:
+    """Find the part of a file that holds the media data
+
+    ID3 tags are written by us after download, so they are left out of MP3 hashes.
+    """
+    if suffix != ".mp3":
+        return 0, size
+
+    start, end = 0, size
+    header = f.read(10)
+    if len(header) == 10 and header[:3] == b"ID3":
+        # Tag size is a 28-bit syncsafe integer, plus the header and optional footer
+        tag_size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        start = min(size, 10 + tag_size + (10 if header[5] & 0x10 else 0))
+    if end - start >= 128:
+        f.seek(end - 128)
+        if f.read(3) == b"TAG":
+            end -= 128
+    return start, end
+
+
+def content_hash(file_path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Hash a file by sampling its start, middle and end
+
+    Reads at most three chunks, so hashing a large video costs the same as a song.
+
+    Args:
+        file_path: File to hash
+        chunk_size: Bytes read from each sampled part
+
+    Returns:
+        str: Hex digest, prefixed with the hashed length
+    """
+    file_path = Path(file_path)
+    size = os.path.getsize(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(file_path, "rb") as f:
+        start, end = _payload_range(f, size, file_path.suffix.lower())
+        length = end - start
+        if length <= 3 * chunk_size:
+            offsets = [(start, length)]
+        else:
+            middle = start + (length - chunk_size) // 2
+            offsets = [(start, chunk_size), (middle, chunk_size), (end - chunk_size, chunk_size)]
+        for offset, count in offsets:
+            f.seek(offset)
+            digest.update(f.read(count))
+
+    return f"{length}:{digest.hexdigest()}"
+
+
+def find_media(media_id: str) -> Optional[Dict]:
+    """Look up the first recorded download of a media item that is still on disk
+
+    Records of files deleted since, e.g. removed from the library, are ignored so
+    the media can be downloaded again.
+
+    Args:
+        media_id: Canonical media ID from ``get_media_id``
+
+    Returns:
+        dict or None: Media record if found
+    """
+    try:
+        with closing(connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(MEDIA_COLUMNS)} FROM media WHERE media_id = ? ORDER BY id",
+                (media_id,),
+            ).fetchall()
+    except Exception as e:
+        log.warning(f"Error reading media index: {e}")
+        return None
+
+    for row in rows:
+        if row["file_path"] and os.path.exists(row["file_path"]):
+            return {column: row[column] for column in MEDIA_COLUMNS}
+    return None
+
+
+@timed("dedup.record")
+def record_downloads(downloads: Iterable[Tuple[Path, Dict[str, Any]]], url: str) -> None:
+    """Record the media ID and content hash of downloaded files
+
+    Args:
+        downloads: (final file path, yt-dlp info) pairs
+        url: URL the files were downloaded from
+    """
+    timestamp = datetime.now().isoformat()
+    rows = []
+    for file_path, info in downloads:
+        try:
+            file_hash = content_hash(file_path)
+        except OSError as e:
+            log.debug(f"Not hashing {file_path}: {e}")
+            file_hash = None
+        rows.append(
+            (
+                get_media_id(info),
+                file_hash,
+                url,
+                info.get("title"),
+                os.path.abspath(file_path),
+                timestamp,
+            )
+        )
+
+    if not rows:
+        return
+    try:
+        with closing(connect()) as conn, conn:
+            conn.executemany(
+                f"INSERT INTO media ({', '.join(MEDIA_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+    except Exception as e:
+        log.error(f"Error saving media index: {e}")
+
+
+def find_duplicate_file(file_path: Path, file_hash: Optional[str] = None) -> Optional[Path]:
+    """Find an existing file with the same content as a file
+
+    Args:
+        file_path: File to check
+        file_hash: Its content hash, if already known
+
+    Returns:
+        Path or None: Another recorded file with the same content that still exists
+    """
+    file_hash = file_hash or content_hash(file_path)
+    try:
+        with closing(connect()) as conn:
+            rows = conn.execute(
+                "SELECT file_path FROM media WHERE content_hash = ? AND file_path != ?",
+                (file_hash, os.path.abspath(file_path)),
+            ).fetchall()
+    except Exception as e:
+        log.warning(f"Error reading media index: {e}")
+        return None
+
+    for row in rows:
+        other = Path(row["file_path"])
+        if other.exists() and not other.samefile(file_path):
+            return other
+    return None
+
+
+@timed("dedup.check")
+def drop_duplicate_files(files: Iterable[Path]) -> List[Path]:
+    """Delete files whose content is already in the library
+
+    Args:
+        files: Downloaded files about to be moved
+
+    Returns:
+        list: The files that are not duplicates
+    """
+    unique = []
+    for file_path in files:
+        try:
+            duplicate_of = find_duplicate_file(file_path)
+        except OSError as e:
+            log.debug(f"Not checking {file_path} for duplicates: {e}")
+            duplicate_of = None
+
+        if duplicate_of is None:
+            unique.append(file_path)
+            continue
+        log.info(f"⏭️  Skipping {file_path.name} - same content as {duplicate_of}")
+        file_path.unlink(missing_ok=True)
+    return unique
+
+
+def clear_media() -> None:
+    """Forget every recorded download, so no media is skipped as a duplicate"""
+    try:
+        with closing(connect()) as conn, conn:
+            conn.execute("DELETE FROM media")
+    except Exception as e:
+        log.error(f"Error clearing media index: {e}")
+
+
+def update_file_paths(moves: Iterable[Tuple[Path, Path]]) -> None:
+    """Point media records at the files' new locations
+
+    Args:
+        moves: (old path, new path) pairs
+    """
+    rows = [(os.path.abspath(dest), os.path.abspath(source)) for source, dest in moves]
+    if not rows:
+        return
+    try:
+        with closing(connect()) as conn, conn:
+            conn.executemany("UPDATE media SET file_path = ? WHERE file_path = ?", rows)
+    except Exception as e:
+        log.error(f"Error saving media index: {e}")
+
+
+class DuplicateFilter:
+    """yt-dlp ``match_filter`` that skips media already downloaded from any URL
+
+    The filter is shared by the threads of a ``DownloaderSession``; each thread
+    enables it and reads what it skipped through ``reset`` and ``skipped``.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def reset(self, enabled: bool = True) -> None:
+        """Start a download on the current thread
+
+        Args:
+            enabled: If False, nothing is skipped (e.g. for --force)
+        """
+        self._local.enabled = enabled
+        self._local.skipped = {}
+
+    @property
+    def skipped(self) -> List[Dict]:
+        """Media records of the items skipped on this thread since ``reset``"""
+        return list(getattr(self._local, "skipped", {}).values())
+
+    def __call__(self, info: Dict[str, Any], *, incomplete: bool = False) -> Optional[str]:
+        """Return a reason to skip the item, or None to download it"""
+        if not getattr(self._local, "enabled", False):
+            return None
+        media_id = get_media_id(info)
+        record = find_media(media_id) if media_id else None
+        if record is None:
+            return None
+
+        # yt-dlp may ask about the same item twice, first with incomplete info
+        self._local.skipped[media_id] = record
+        title = info.get("title") or record.get("title") or media_id
+        return f"{title} is already in the library ({record['file_path'] or record['url']})"
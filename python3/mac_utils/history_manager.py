@@ -1,15 +1,45 @@
-"""Download history management for mac-utils"""
+"""Download history management for mac-utils
+
+History is stored in an SQLite database so that recording a download is a single
+indexed INSERT instead of rewriting the whole history file. Histories written by
+older versions (``history.json``) are migrated automatically the first time the
+database is opened.
+
+Lookups go through a process-level in-memory index keyed by canonical URL (see
+``urls``), so a batch run checking thousands of URLs reads the database once.
+"""
 
 import json
 import logging
+import sqlite3
+import threading
+from contextlib import closing
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from .timings import timed
+from .urls import canonical_key
 
 log = logging.getLogger(__name__)
 
 DEFAULT_HISTORY_DIR = Path.home() / ".mac-utils"
-DEFAULT_HISTORY_FILE = DEFAULT_HISTORY_DIR / "history.json"
+DEFAULT_HISTORY_FILE = DEFAULT_HISTORY_DIR / "history.db"
+LEGACY_HISTORY_FILE = DEFAULT_HISTORY_DIR / "history.json"
+
+HISTORY_COLUMNS = ("url", "title", "media_type", "file_path", "timestamp")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    title TEXT,
+    media_type TEXT,
+    file_path TEXT,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_downloads_url ON downloads (url);
+"""
 
 
 def ensure_history_dir() -> None:
@@ -17,39 +47,201 @@ def ensure_history_dir() -> None:
     DEFAULT_HISTORY_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _row_to_record(row: sqlite3.Row) -> Dict:
+    """Convert a database row to a history record dictionary"""
+    return {column: row[column] for column in HISTORY_COLUMNS}
+
+
+def _record_to_row(record: Dict) -> tuple:
+    """Convert a history record dictionary to a tuple of column values"""
+    return tuple(record.get(column) for column in HISTORY_COLUMNS)
+
+
+def _insert_records(conn: sqlite3.Connection, records: List[Dict]) -> int:
+    """Insert history records in a single statement batch
+
+    Returns:
+        int: Number of rows inserted; records without a URL are skipped
+    """
+    rows = [_record_to_row(record) for record in records if record.get("url")]
+    conn.executemany(
+        f"INSERT INTO downloads ({', '.join(HISTORY_COLUMNS)}) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    return len(rows)
+
+
+def migrate_legacy_history(conn: sqlite3.Connection) -> int:
+    """Import records from the legacy JSON history file into the database
+
+    The legacy file is renamed to ``history.json.migrated`` afterwards so the
+    migration only ever runs once. The import and the rename happen while holding
+    the database's write lock, so concurrent processes migrate the file only once.
+    A file that isn't a list of records is renamed to ``history.json.invalid``.
+
+    Args:
+        conn: Open connection to the history database
+
+    Returns:
+        int: Number of records migrated
+    """
+    if not LEGACY_HISTORY_FILE.exists():
+        return 0
+
+    try:
+        with open(LEGACY_HISTORY_FILE, "r") as f:
+            records = json.load(f)
+    except Exception as e:
+        log.warning(f"Error reading legacy history file: {e}. Skipping migration.")
+        return 0
+
+    if not isinstance(records, list):
+        invalid_file = LEGACY_HISTORY_FILE.with_name(LEGACY_HISTORY_FILE.name + ".invalid")
+        log.warning(
+            f"Legacy history file {LEGACY_HISTORY_FILE} is not a list of records. "
+            f"Skipping migration and renaming it to {invalid_file.name}."
+        )
+        LEGACY_HISTORY_FILE.replace(invalid_file)
+        return 0
+
+    migrated_file = LEGACY_HISTORY_FILE.with_name(LEGACY_HISTORY_FILE.name + ".migrated")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated the file while this one waited for the lock
+        if not LEGACY_HISTORY_FILE.exists():
+            conn.rollback()
+            return 0
+        count = _insert_records(conn, [record for record in records if isinstance(record, dict)])
+        LEGACY_HISTORY_FILE.rename(migrated_file)
+        try:
+            conn.commit()
+        except Exception:
+            migrated_file.rename(LEGACY_HISTORY_FILE)
+            raise
+    except BaseException:
+        conn.rollback()
+        raise
+
+    log.info(f"Migrated {count} record(s) from {LEGACY_HISTORY_FILE} to {DEFAULT_HISTORY_FILE}")
+    return count
+
+
+def connect() -> sqlite3.Connection:
+    """Open the history database, creating and migrating it if needed
+
+    Returns:
+        sqlite3.Connection: Connection with rows accessible by column name
+    """
+    ensure_history_dir()
+
+    conn = sqlite3.connect(DEFAULT_HISTORY_FILE, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    migrate_legacy_history(conn)
+    return conn
+
+
+class HistoryIndex:
+    """In-memory index of download records keyed by canonical URL key
+
+    The index is built from a single read of the history database and rebuilt only
+    when the database file's mtime or size changes (i.e. another process wrote to it).
+    """
+
+    def __init__(self) -> None:
+        self._records: Dict[str, Dict] = {}
+        self._stamp: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def file_stamp() -> Tuple:
+        """Identify the current state of the history database file"""
+        try:
+            stat = DEFAULT_HISTORY_FILE.stat()
+        except FileNotFoundError:
+            return (str(DEFAULT_HISTORY_FILE), None, None)
+        return (str(DEFAULT_HISTORY_FILE), stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self) -> None:
+        """Rebuild the index if the database changed since it was built"""
+        stamp = self.file_stamp()
+        if stamp == self._stamp:
+            return
+
+        records: Dict[str, Dict] = {}
+        for record in load_history():
+            # Keep the first download of a URL, matching the order of the history
+            records.setdefault(canonical_key(record["url"]), record)
+        self._records = records
+        # Loading creates the database when it is missing, which changes its stamp
+        self._stamp = stamp if stamp[1] is not None else self.file_stamp()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Look up the first download record for a URL"""
+        with self._lock:
+            self._refresh()
+            return self._records.get(canonical_key(url))
+
+    def add(self, record: Dict, stamp_before: Optional[Tuple], stamp_after: Tuple) -> None:
+        """Add a record written by this process without re-reading the database
+
+        Args:
+            record: Record that was just inserted
+            stamp_before: File stamp taken before the insert; if the index was not
+                current at that point it is left to rebuild on the next lookup
+            stamp_after: File stamp reflecting only this insert on top of
+                ``stamp_before``
+        """
+        with self._lock:
+            if self._stamp != stamp_before:
+                return
+            self._records.setdefault(canonical_key(record["url"]), record)
+            self._stamp = stamp_after
+
+    def invalidate(self) -> None:
+        """Force the index to be rebuilt on the next lookup"""
+        with self._lock:
+            self._stamp = None
+            self._records = {}
+
+
+history_index = HistoryIndex()
+
+
+@timed("history.load")
 def load_history() -> List[Dict]:
     """Load download history from file
 
     Returns:
-        list: List of download records
+        list: List of download records, oldest first
     """
-    if not DEFAULT_HISTORY_FILE.exists():
-        return []
-
     try:
-        with open(DEFAULT_HISTORY_FILE, "r") as f:
-            history = json.load(f)
-        return history
+        with closing(connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(HISTORY_COLUMNS)} FROM downloads ORDER BY id"
+            ).fetchall()
+        return [_row_to_record(row) for row in rows]
     except Exception as e:
         log.warning(f"Error loading history file: {e}. Starting with empty history.")
         return []
 
 
+@timed("history.write")
 def save_history(history: List[Dict]) -> None:
-    """Save download history to file
+    """Replace the stored download history
 
     Args:
         history: List of download records to save
     """
-    ensure_history_dir()
-
     try:
-        with open(DEFAULT_HISTORY_FILE, "w") as f:
-            json.dump(history, f, indent=2)
+        with closing(connect()) as conn, conn:
+            conn.execute("DELETE FROM downloads")
+            _insert_records(conn, history)
     except Exception as e:
         log.error(f"Error saving history file: {e}")
+    history_index.invalidate()
 
 
+@timed("history.write")
 def add_to_history(url: str, title: str, media_type: str, file_path: Optional[str] = None) -> None:
     """Add a download to history
 
@@ -59,8 +251,6 @@ def add_to_history(url: str, title: str, media_type: str, file_path: Optional[st
         media_type: Type of media (mp3, video)
         file_path: Path where file was saved
     """
-    history = load_history()
-
     record = {
         "url": url,
         "title": title,
@@ -69,8 +259,32 @@ def add_to_history(url: str, title: str, media_type: str, file_path: Optional[st
         "timestamp": datetime.now().isoformat(),
     }
 
-    history.append(record)
-    save_history(history)
+    stamp_before = HistoryIndex.file_stamp()
+    try:
+        with closing(connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # No other process can write now, so a changed stamp means one already did
+                own_write_only = HistoryIndex.file_stamp() == stamp_before
+                row_id = conn.execute(
+                    f"INSERT INTO downloads ({', '.join(HISTORY_COLUMNS)}) VALUES (?, ?, ?, ?, ?)",
+                    _record_to_row(record),
+                ).lastrowid
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            stamp_after = HistoryIndex.file_stamp()
+            # A write by another process between the commit and the stamp adds or removes rows
+            own_write_only &= conn.execute("SELECT MAX(id) FROM downloads").fetchone()[0] == row_id
+    except Exception as e:
+        log.error(f"Error saving history file: {e}")
+        return
+
+    if own_write_only:
+        history_index.add(record, stamp_before, stamp_after)
+    else:
+        history_index.invalidate()
     log.debug(f"Added to history: {url}")
 
 
@@ -78,15 +292,15 @@ def is_downloaded(url: str) -> bool:
     """Check if a URL has been downloaded before
 
     Args:
-        url: URL to check
+        url: URL to check (compared after normalization)
 
     Returns:
         bool: True if URL exists in history
     """
-    history = load_history()
-    return any(record["url"] == url for record in history)
+    return get_download_info(url) is not None
 
 
+@timed("history.lookup")
 def get_download_info(url: str) -> Optional[Dict]:
     """Get download information for a URL
 
@@ -96,16 +310,15 @@ def get_download_info(url: str) -> Optional[Dict]:
     Returns:
         dict or None: Download record if found
     """
-    history = load_history()
-    for record in history:
-        if record["url"] == url:
-            return record
-    return None
+    return history_index.get(url)
 
 
 def clear_history() -> None:
-    """Clear all download history"""
+    """Clear all download history, including the media index used to skip duplicates"""
+    from .dedup import clear_media
+
     save_history([])
+    clear_media()
     log.info("Download history cleared")
 
 
@@ -115,25 +328,31 @@ def show_history(limit: Optional[int] = None) -> None:
     Args:
         limit: Maximum number of records to show
     """
-    history = load_history()
+    try:
+        with closing(connect()) as conn:
+            total = conn.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+            # Show most recent first
+            rows = conn.execute(
+                f"SELECT {', '.join(HISTORY_COLUMNS)} FROM downloads ORDER BY id DESC LIMIT ?",
+                (limit or -1,),
+            ).fetchall()
+    except Exception as e:
+        log.warning(f"Error loading history file: {e}. Starting with empty history.")
+        total, rows = 0, []
 
-    if not history:
+    if not total:
         log.info("Download history is empty")
         return
 
-    log.info(f"Download History ({len(history)} total downloads)")
+    log.info(f"Download History ({total} total downloads)")
     log.info(f"History file: {DEFAULT_HISTORY_FILE}")
 
-    # Show most recent first
-    history_to_show = list(reversed(history))
-    if limit:
-        history_to_show = history_to_show[:limit]
-
-    for i, record in enumerate(history_to_show, 1):
-        timestamp = record.get("timestamp", "Unknown")
-        url = record.get("url", "Unknown")
-        title = record.get("title", "Unknown")
-        media_type = record.get("media_type", "Unknown")
+    for i, row in enumerate(rows, 1):
+        record = _row_to_record(row)
+        timestamp = record.get("timestamp") or "Unknown"
+        url = record.get("url") or "Unknown"
+        title = record.get("title") or "Unknown"
+        media_type = record.get("media_type") or "Unknown"
 
         log.info(f"{i}. [{timestamp}]")
         log.info(f"   Type: {media_type}")
@@ -0,0 +1,277 @@
+"""Journal of in-flight downloads, so interrupted downloads resume on the next run
+
+yt-dlp already resumes a ``.part`` file with a ranged request when it finds one at
+the path it is about to write, but only in the directory the download runs in. The
+journal remembers, per URL, where each partial file was written and how many of its
+bytes had arrived. When the URL is downloaded again, from any directory, its partial
+files are moved into the new download directory first so the transfer picks up
+where it stopped instead of starting over.
+
+Entries are removed when a download completes. Entries not updated for
+``STALE_JOB_AGE`` seconds are dropped with their partial files the first time the
+journal is read in a process.
+"""
+
+import glob
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .urls import canonical_key
+
+log = logging.getLogger(__name__)
+
+DEFAULT_JOBS_FILE = Path.home() / ".mac-utils" / "jobs.json"
+JOURNAL_VERSION = 1
+STALE_JOB_AGE = 7 * 24 * 60 * 60  # seconds
+SAVE_INTERVAL = 5.0  # seconds between journal writes while bytes arrive
+
+
+def partial_files(part: Dict[str, Any]) -> List[Path]:
+    """List the files yt-dlp keeps for one unfinished download
+
+    Args:
+        part: Journal entry of the download ("filename" and "tmpfilename")
+
+    Returns:
+        list: The ``.part`` file, its fragments and the ``.ytdl`` fragment index
+            that exist on disk
+    """
+    tmp = Path(part["tmpfilename"])
+    candidates = [
+        tmp,
+        Path(part["filename"] + ".ytdl"),
+        *tmp.parent.glob(glob.escape(tmp.name) + "-Frag*"),
+    ]
+    return [path for path in candidates if path.is_file()]
+
+
+def format_offset(part: Dict[str, Any]) -> str:
+    """Describe how far a partial download got, e.g. "120.0 MiB of 2.0 GiB" """
+    from .progress import format_bytes
+
+    offset = format_bytes(part.get("downloaded_bytes") or 0)
+    total = part.get("total_bytes")
+    return f"{offset} of {format_bytes(total)}" if total else offset
+
+
+class JobJournal:
+    """In-flight downloads by URL, persisted as JSON under ``~/.mac-utils``
+
+    Downloads register with ``track``; the progress hook then records the partial
+    files written by the thread's current download. The journal is shared by the
+    threads of a process. Concurrent processes each rewrite the whole file, so the
+    last one to save wins - at worst an interrupted download starts from scratch.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        save_interval: float = SAVE_INTERVAL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            path: Journal file (default: DEFAULT_JOBS_FILE)
+            save_interval: Seconds between writes while a download progresses
+            clock: Time source, for tests
+        """
+        self._path = path
+        self.save_interval = save_interval
+        self.clock = clock
+        self._jobs: Optional[Dict[str, Dict[str, Any]]] = None
+        self._last_save = 0.0
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+    @property
+    def path(self) -> Path:
+        return self._path or DEFAULT_JOBS_FILE
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Read the journal on first use and drop stale entries"""
+        if self._jobs is None:
+            jobs = {}
+            try:
+                with open(self.path, "r") as f:
+                    journal = json.load(f)
+                if journal.get("version") == JOURNAL_VERSION:
+                    jobs = journal["jobs"]
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                log.warning(f"Ignoring unreadable job journal {self.path}: {e}")
+            self._jobs = jobs
+            if self.clean_stale():
+                self._save()
+        return self._jobs
+
+    def _save(self) -> None:
+        """Replace the journal file atomically"""
+        path = self.path
+        temp_path = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w") as f:
+                json.dump({"version": JOURNAL_VERSION, "jobs": self._jobs}, f, indent=2)
+            os.replace(temp_path, path)
+            self._last_save = self.clock()
+        except Exception as e:
+            log.warning(f"Could not save job journal {path}: {e}")
+            temp_path.unlink(missing_ok=True)
+
+    def jobs(self) -> Dict[str, Dict[str, Any]]:
+        """Get a copy of the unfinished jobs
+
+        Returns:
+            dict: Job (url, media_type, work_dir, updated_at, parts) by URL key
+        """
+        with self._lock:
+            return json.loads(json.dumps(self._load()))
+
+    def clean_stale(self, max_age: float = STALE_JOB_AGE) -> int:
+        """Drop jobs that can't be resumed, deleting their partial files
+
+        A job is stale when it wasn't updated for ``max_age`` seconds, or when none of
+        its partial files exist any more.
+
+        Args:
+            max_age: Seconds since the last update after which a job is abandoned
+
+        Returns:
+            int: Number of jobs dropped (the journal isn't saved)
+        """
+        with self._lock:
+            jobs = self._load()
+            now = self.clock()
+            stale = []
+            for key, job in jobs.items():
+                files = [path for part in job["parts"].values() for path in partial_files(part)]
+                if now - job["updated_at"] > max_age:
+                    for path in files:
+                        log.info(f"Removing stale partial download {path}")
+                        path.unlink(missing_ok=True)
+                    stale.append(key)
+                elif not files:
+                    stale.append(key)
+            for key in stale:
+                del jobs[key]
+            return len(stale)
+
+    @contextmanager
+    def track(self, url: str, media_type: str, work_dir: Path) -> Iterator[None]:
+        """Make a URL the current download of this thread
+
+        Partial files left by an earlier run of the same URL are moved into
+        ``work_dir``, where yt-dlp will find and resume them. The job is journaled
+        once bytes arrive, and stays in the journal after the block unless ``finish``
+        is called, so a failed download is resumed next time.
+
+        Args:
+            url: URL being downloaded
+            media_type: Type of media ('mp3' or 'video')
+            work_dir: Directory yt-dlp writes to
+        """
+        key = canonical_key(url)
+        work_dir = Path(work_dir).resolve()
+        with self._lock:
+            job = self._load().get(key)
+            if job is not None:
+                self._restore(job, work_dir)
+                job.update(work_dir=str(work_dir), updated_at=self.clock())
+
+        self._local.job = {"url": url, "media_type": media_type, "work_dir": str(work_dir)}
+        self._local.key = key
+        try:
+            yield
+        finally:
+            self._local.key = None
+            with self._lock:
+                jobs = self._load()
+                if key in jobs:
+                    if not jobs[key]["parts"]:
+                        # Nothing left to resume, e.g. every file finished downloading
+                        del jobs[key]
+                    self._save()
+
+    def _restore(self, job: Dict[str, Any], work_dir: Path) -> None:
+        """Move the partial files of a job into the directory it resumes in"""
+        parts = {}
+        for filename, part in job["parts"].items():
+            files = partial_files(part)
+            if not files:
+                continue
+            tmp = Path(part["tmpfilename"])
+            if tmp.parent.resolve() != work_dir:
+                if (work_dir / tmp.name).exists():
+                    log.warning(f"Not resuming {tmp}: {work_dir} has a partial file of that name")
+                    continue
+                try:
+                    for path in files:
+                        shutil.move(path, work_dir / path.name)
+                except OSError as e:
+                    log.warning(f"Could not move partial download {tmp}: {e}")
+                    continue
+                part = {
+                    **part,
+                    "filename": str(work_dir / Path(filename).name),
+                    "tmpfilename": str(work_dir / tmp.name),
+                }
+            log.info(f"⏯️  Resuming {Path(part['filename']).name} from {format_offset(part)}")
+            parts[part["filename"]] = part
+        job["parts"] = parts
+
+    def finish(self, url: str) -> None:
+        """Forget a completed download
+
+        Args:
+            url: URL passed to ``track``
+        """
+        with self._lock:
+            if self._load().pop(canonical_key(url), None) is not None:
+                self._save()
+
+    def progress_hook(self, d: Dict[str, Any]) -> None:
+        """yt-dlp progress hook that records the partial files of the current download"""
+        key = getattr(self._local, "key", None)
+        status = d.get("status")
+        if key is None or status not in ("downloading", "finished", "error"):
+            return
+
+        with self._lock:
+            jobs = self._load()
+            job = jobs.get(key)
+            if job is None:
+                if status != "downloading":
+                    return
+                job = jobs[key] = {**self._local.job, "parts": {}}
+            if not d.get("filename"):
+                return
+            filename = os.path.abspath(d["filename"])
+            if status == "finished":
+                job["parts"].pop(filename, None)
+            elif d.get("tmpfilename"):
+                job["parts"][filename] = {
+                    "filename": filename,
+                    "tmpfilename": os.path.abspath(d["tmpfilename"]),
+                    "downloaded_bytes": d.get("downloaded_bytes"),
+                    "total_bytes": d.get("total_bytes") or d.get("total_bytes_estimate"),
+                }
+            job["updated_at"] = self.clock()
+            if status != "downloading" or self.clock() - self._last_save >= self.save_interval:
+                self._save()
+
+    def invalidate(self) -> None:
+        """Forget the loaded journal so it is read again on next use"""
+        with self._lock:
+            self._jobs = None
+
+
+# Journal shared by every download of the process
+journal = JobJournal()
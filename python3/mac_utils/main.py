@@ -1,17 +1,22 @@
 import logging
-import re
+import os
 import sys
+import time
 from pathlib import Path
 from typing import Optional
 
 import typer
 
-from mac_utils import music, util, video
-from mac_utils.config_manager import load_config, show_config
+from mac_utils.config_manager import get_config_value, load_config, show_config
+from mac_utils.progress import ProgressLogHandler
+from mac_utils.urls import detect_media_company
 
-# Configure logging
+# Download modules (and yt-dlp/mutagen with them) are imported inside the commands
+# that need them so `--help`, `config` and `history` start quickly
+
+# Configure logging - records are written above the download progress bars
 logging.basicConfig(
-    stream=sys.stdout,
+    handlers=[ProgressLogHandler(sys.stdout)],
     level=logging.INFO,
     format="%(asctime)s [%(levelname)8s] %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
@@ -55,8 +60,70 @@ def verbosity_callback(ctx: typer.Context, param: typer.CallbackParam, value: bo
     return value
 
 
+def start_timings(ctx: typer.Context, show: bool, json_path: Optional[Path]) -> None:
+    """Record stage timings and report them when the command finishes
+
+    Args:
+        ctx: Context of the main callback
+        show: Print the report
+        json_path: JSON Lines file to append the timings to
+    """
+    from mac_utils import timings
+
+    started = time.perf_counter()
+    timings.reset()
+    timings.enable()
+
+    def report() -> None:
+        timings.disable()
+        wall_seconds = time.perf_counter() - started
+        stages = timings.summary()
+        if show:
+            typer.echo(timings.format_report(stages, wall_seconds), err=True)
+        if json_path:
+            timings.write_json(
+                json_path,
+                stages,
+                command=ctx.invoked_subcommand,
+                args=sys.argv[1:],
+                wall_seconds=wall_seconds,
+            )
+
+    ctx.call_on_close(report)
+
+
+def start_metrics(ctx: typer.Context, path: Path) -> None:
+    """Count downloads and write the metrics file when the command finishes
+
+    Stage timings are recorded too, and exported with the counters.
+
+    Args:
+        ctx: Context of the main callback
+        path: Prometheus textfile (or JSON snapshot for .json files) to replace
+    """
+    from mac_utils import metrics, timings
+
+    started = time.perf_counter()
+    metrics.reset()
+    timings.reset()
+    timings.enable()
+
+    def export() -> None:
+        timings.disable()
+        metrics.write_metrics(
+            path,
+            timings.summary(),
+            time.perf_counter() - started,
+            command=ctx.invoked_subcommand,
+            args=sys.argv[1:],
+        )
+
+    ctx.call_on_close(export)
+
+
 @app.callback()
 def main(
+    ctx: typer.Context,
     verbose: bool = typer.Option(
         False,
         "--verbose",
@@ -85,10 +152,27 @@ def main(
     version: Optional[bool] = typer.Option(
         None, "--version", help="Show version and exit", callback=version_callback, is_eager=True
     ),
+    show_timings: bool = typer.Option(
+        False, "--timings", help="Print how long each stage took when the command finishes"
+    ),
+    timings_json: Optional[Path] = typer.Option(
+        None, "--timings-json", help="Append the stage timings of this run to a JSON Lines file"
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None,
+        "--metrics-file",
+        help="Write download counters and stage timings of this run to a Prometheus "
+        "textfile (or a JSON snapshot for .json files)",
+    ),
 ):
     """
     Personal CLI utility for downloading media and managing files on macOS.
     """
+    if show_timings or timings_json:
+        start_timings(ctx, show_timings, timings_json)
+    if metrics_file:
+        start_metrics(ctx, metrics_file)
+
     # Load config and merge with CLI options (CLI takes precedence)
     config = load_config()
 
@@ -101,42 +185,53 @@ def main(
 
 
 @app.command()
-def open_apps(type: str = typer.Option("default", "--type", "-t", prompt="Open my apps")) -> None:
-    """Start up basic applications"""
+def open_apps(
+    type: str = typer.Option("default", "--type", "-t", prompt="Open my apps"),
+    timeout: float = typer.Option(
+        30, "--timeout", help="Seconds to wait for each application to open"
+    ),
+) -> None:
+    """Start up basic applications
+
+    Types: default (installed + system apps), full (full installed list + system
+    apps) or music. Applications are opened concurrently.
+    """
+    from mac_utils import util
+
     log.info("Welcome! Starting up Applications...")
     match type:
         case "default":
-            log.info("Opening System Applications...")
-            util.open_apps("installed")
-            log.info("Opening Installed Applications...")
-            util.open_apps("system")
+            log.info("Opening Installed and System Applications...")
+            apps = util.get_app_list("installed") + util.get_app_list("system")
+        case "full":
+            log.info("Opening Full Installed and System Applications...")
+            apps = util.get_app_list("installed", "full") + util.get_app_list("system")
         case "music":
             log.info("Opening Music Applications...")
-            util.open_apps("music")
+            apps = util.get_app_list("music")
+        case _:
+            log.error(f"Unknown app type: {type}. Expected default, full or music")
+            raise typer.Exit(code=1)
+
+    results = util.launch_apps(apps, timeout=timeout)
+    if any(code != 0 for code in results.values()):
+        raise typer.Exit(code=1)
 
 
 def validate_url(url: str) -> tuple[bool, str | None]:
     """Validate URL and determine media company
 
+    Accepts any page on a YouTube (including youtu.be and m.youtube.com) or
+    SoundCloud host; see ``urls.detect_media_company``.
+
     Args:
         url (str): URL to validate
 
     Returns:
         tuple[bool, str | None]: (is_valid, media_company)
     """
-    # YouTube URL pattern
-    youtube_pattern = r"^https?://(www\.)?youtube\.com/.+"
-
-    # SoundCloud URL pattern
-    soundcloud_pattern = r"^https?://(www\.)?soundcloud\.com/.+"
-
-    if re.match(youtube_pattern, url):
-        return True, "YouTube"
-
-    if re.match(soundcloud_pattern, url):
-        return True, "SoundCloud"
-
-    return False, None
+    media_company = detect_media_company(url)
+    return media_company is not None, media_company
 
 
 @app.command()
@@ -147,6 +242,8 @@ def dl_song(url: str = typer.Argument(..., help="YouTube or SoundCloud URL to do
         mac-utils dl-song "https://youtube.com/watch?v=..."
         mac-utils dl-song "https://soundcloud.com/artist/track"
     """
+    from mac_utils import music
+
     is_valid, media_company = validate_url(url)
 
     if not is_valid or not media_company:
@@ -169,6 +266,8 @@ def dl_video(url: str = typer.Argument(..., help="YouTube URL to download")) ->
     Examples:
         mac-utils dl-video "https://youtube.com/watch?v=..."
     """
+    from mac_utils import video
+
     is_valid, media_company = validate_url(url)
 
     if not is_valid or media_company != "YouTube":
@@ -191,12 +290,65 @@ def dl_sc_user_likes(
     Examples:
         mac-utils dl-sc-user-likes username
     """
+    from mac_utils import music
+
     log.info(f"Downloading SoundCloud user likes: {username}...")
     music.download_soundcloud_user_likes(
         username, dry_run=state.dry_run, output_dir=state.output_dir, force=state.force
     )
 
 
+@app.command()
+def dl_batch(
+    source: str = typer.Argument(
+        "-", help="File with one URL per line, or '-' to read URLs from stdin"
+    ),
+    media_type: str = typer.Option(
+        "mp3", "--type", "-t", help="Media type to download: 'mp3' or 'video'"
+    ),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", "-w", help="Number of concurrent downloads (default: batch_workers)"
+    ),
+) -> None:
+    """Download many URLs concurrently
+
+    Examples:
+        mac-utils dl-batch urls.txt --workers 8
+        cat urls.txt | mac-utils dl-batch --type video
+    """
+    from mac_utils import batch
+
+    if media_type not in ["mp3", "video"]:
+        raise ValueError("Media type must be either 'mp3' or 'video'")
+    if workers is None:
+        workers = get_config_value("batch_workers", batch.DEFAULT_WORKERS)
+    elif workers < 1:
+        raise typer.BadParameter("must be at least 1", param_hint="'--workers'")
+
+    jobs = []
+    for url in batch.read_urls(source):
+        is_valid, media_company = validate_url(url)
+        if not is_valid or (media_type == "video" and media_company != "YouTube"):
+            log.error(f"Skipping URL: {url} is not a valid URL for {media_type} downloads")
+            continue
+        jobs.append((url, media_company))
+
+    if not jobs:
+        log.warning("No valid URLs to download")
+        return
+
+    failures = batch.download_batch(
+        jobs,
+        media_type,
+        workers=workers,
+        dry_run=state.dry_run,
+        output_dir=state.output_dir,
+        force=state.force,
+    )
+    if failures:
+        raise typer.Exit(code=1)
+
+
 @app.command()
 def order_files(
     path_to_folder: str = typer.Option(
@@ -206,17 +358,45 @@ def order_files(
         ..., "--file-type", "-ft", help="File type to filter by - Pass 'all' to include all files"
     ),
     order_by: str = typer.Option(
-        ..., "--order-by", "-ob", help="Order files by name, date, or size"
+        ..., "--order-by", "-ob", help="Order files by name, date, size, or type"
+    ),
+    recursive: bool = typer.Option(False, "--recursive", "-R", help="Include sub folders"),
+    top: Optional[int] = typer.Option(
+        None, "--top", "-n", help="Only show the first N files, e.g. the 10 largest"
+    ),
+    desc: bool = typer.Option(False, "--desc", help="Order descending (newest/largest first)"),
+    use_index: bool = typer.Option(
+        False, "--use-index", help="Use the saved snapshot index to skip unchanged folders"
+    ),
+    clear_snapshots: bool = typer.Option(
+        False, "--clear-snapshots", help="Delete saved snapshots first so every folder is rescanned"
     ),
 ) -> None:
-    """Order files by name or created on date"""
+    """Order files by name, created on date, size, or file type"""
+    from mac_utils import util
+
     if not Path(path_to_folder).exists():
         raise ValueError("Path must be a valid directory")
-    if order_by not in ["name", "date"]:
-        raise ValueError("Order by must be either 'name', 'date'")
+    if order_by not in util.SORT_KEYS:
+        raise ValueError("Order by must be one of 'name', 'date', 'size', 'type'")
+
+    if clear_snapshots:
+        from mac_utils import snapshots
+
+        log.info(f"Deleted {snapshots.clear_snapshots()} saved snapshot(s)")
 
     log.info(f"Ordering files in folder '{path_to_folder}' by '{order_by}'...")
-    util.sort_files_by(path_to_folder, file_type, order_by)
+    files = util.sort_files_by(
+        path_to_folder,
+        file_type,
+        order_by,
+        recursive=recursive,
+        top=top,
+        reverse=desc,
+        use_index=use_index,
+    )
+    for entry in files:
+        log.info(os.path.relpath(entry.path, path_to_folder) if recursive else entry.name)
 
 
 @app.command()
@@ -235,20 +415,11 @@ def config(
         return
 
     if set_key and value is not None:
-        # Handle type conversions
-        converted_value: int | bool | str
-        if set_key in ["retry_count", "retry_delay"]:
-            try:
-                converted_value = int(value)
-            except ValueError:
-                log.error(f"Invalid value for {set_key}: must be an integer")
-                raise typer.Exit(code=1)
-        elif set_key == "show_progress":
-            converted_value = value.lower() in ["true", "1", "yes", "y"]
-        else:
-            converted_value = value
-
-        set_config_value(set_key, converted_value)
+        try:
+            set_config_value(set_key, value)
+        except ValueError as e:
+            log.error(f"Invalid value for {set_key}: {e}")
+            raise typer.Exit(code=1)
         log.info(f"Set {set_key} = {value}")
         show_config()
     elif set_key and value is None:
@@ -0,0 +1,230 @@
+"""Counters of a run, exported as a Prometheus textfile or a JSON snapshot
+
+Downloads count what happened (downloaded, skipped, retried, failed, bytes) with
+``inc``. At the end of a run started with ``--metrics-file``, ``write_metrics``
+replaces the file with the counters and the stage timings of the run, so a cron job
+can be graphed with node_exporter's textfile collector or any JSON reader.
+
+Every value describes the last run only: metrics are exported as gauges and the
+file is overwritten, not appended to.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+PREFIX = "mac_utils"
+
+# name -> help text of the counters
+COUNTERS = {
+    "downloads": "URLs downloaded by the last run",
+    "files_downloaded": "Files written by the last run",
+    "skipped": "URLs skipped by the last run, by reason (history or duplicate)",
+    "retries": "Download attempts retried by the last run",
+    "failures": "URLs that failed to download in the last run",
+    "bytes_downloaded": "Bytes transferred by the last run",
+}
+
+# name -> help text of every exported metric
+HELP = {
+    **COUNTERS,
+    "stage_runs": "Runs of each stage in the last run",
+    "stage_seconds": "Total seconds spent in each stage in the last run",
+    "stage_max_seconds": "Longest run of each stage in the last run",
+    "run_duration_seconds": "Wall clock duration of the last run",
+    "last_run_timestamp_seconds": "Unix time the last run finished",
+}
+
+# (name, sorted label pairs) -> value
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+# file name -> downloaded_bytes of its last progress report
+_transfers: Dict[str, float] = {}
+_lock = threading.Lock()
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def inc(name: str, amount: float = 1, **labels: str) -> None:
+    """Add to a counter
+
+    Args:
+        name: Counter name, one of ``COUNTERS``
+        amount: Amount to add
+        **labels: Labels of the counter, e.g. media_type="mp3"
+    """
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def reset() -> None:
+    """Set every counter back to zero"""
+    with _lock:
+        _counters.clear()
+        _transfers.clear()
+
+
+def value(name: str, **labels: str) -> float:
+    """Get the current value of a counter
+
+    Args:
+        name: Counter name
+        **labels: Labels of the counter
+
+    Returns:
+        float: Value, 0 for counters never incremented
+    """
+    with _lock:
+        return _counters.get((name, tuple(sorted(labels.items()))), 0)
+
+
+def progress_hook(d: Dict[str, Any]) -> None:
+    """yt-dlp progress hook that counts the bytes transferred by this run
+
+    Bytes are counted as the growth of ``downloaded_bytes`` between reports of a
+    file, starting from its first report. The part of a resumed file fetched by an
+    earlier run isn't counted, nor is a file yt-dlp finds already downloaded.
+    """
+    status = d.get("status")
+    key = d.get("filename") or d.get("tmpfilename")
+    if not key or status not in ("downloading", "finished", "error"):
+        return
+
+    downloaded = d.get("downloaded_bytes")
+    with _lock:
+        if status == "downloading":
+            last = _transfers.get(key)
+            if downloaded is not None:
+                _transfers[key] = downloaded
+        else:
+            last = _transfers.pop(key, None)
+            downloaded = downloaded or d.get("total_bytes")
+    if last is not None and downloaded and downloaded > last:
+        inc("bytes_downloaded", downloaded - last)
+
+
+def collect(
+    stages: Optional[Dict[str, Dict[str, float]]] = None,
+    wall_seconds: Optional[float] = None,
+) -> List[Sample]:
+    """Get every sample of the run
+
+    Counters never incremented are reported as 0 so the series don't disappear from
+    graphs after a quiet run.
+
+    Args:
+        stages: Stage timings from ``timings.summary``
+        wall_seconds: Duration of the run
+
+    Returns:
+        list: (metric name, labels, value) samples
+    """
+    with _lock:
+        counters = dict(_counters)
+
+    samples: List[Sample] = []
+    for name in COUNTERS:
+        values = sorted((labels, v) for (n, labels), v in counters.items() if n == name)
+        if not values:
+            samples.append((name, {}, 0))
+        samples += [(name, dict(labels), v) for labels, v in values]
+    for stage, stats in (stages or {}).items():
+        samples.append(("stage_runs", {"stage": stage}, stats["count"]))
+        samples.append(("stage_seconds", {"stage": stage}, stats["total"]))
+        samples.append(("stage_max_seconds", {"stage": stage}, stats["max"]))
+    if wall_seconds is not None:
+        samples.append(("run_duration_seconds", {}, wall_seconds))
+    samples.append(("last_run_timestamp_seconds", {}, time.time()))
+    return samples
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(sample_value: float) -> str:
+    sample_value = float(sample_value)
+    return str(int(sample_value)) if sample_value.is_integer() else repr(sample_value)
+
+
+def format_prometheus(samples: List[Sample]) -> str:
+    """Format samples in the Prometheus text exposition format
+
+    Args:
+        samples: Samples from ``collect``
+
+    Returns:
+        str: Text for node_exporter's textfile collector
+    """
+    # Samples of a metric must be listed together, under its HELP and TYPE lines
+    families: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        families.setdefault(sample[0], []).append(sample)
+
+    lines = []
+    for name, family in families.items():
+        metric = f"{PREFIX}_{name}"
+        lines.append(f"# HELP {metric} {HELP.get(name, name)}")
+        lines.append(f"# TYPE {metric} gauge")
+        for _, labels, sample_value in family:
+            label_text = ",".join(f'{key}="{_escape(str(v))}"' for key, v in labels.items())
+            series = f"{metric}{{{label_text}}}" if labels else metric
+            lines.append(f"{series} {_format_value(sample_value)}")
+    return "\n".join(lines) + "\n"
+
+
+def format_json(samples: List[Sample], **fields: Any) -> str:
+    """Format samples as a JSON snapshot
+
+    Args:
+        samples: Samples from ``collect``
+        **fields: Extra top-level fields, e.g. command
+
+    Returns:
+        str: JSON object with the fields and a list of metrics
+    """
+    metrics = [{"name": name, "labels": labels, "value": v} for name, labels, v in samples]
+    return json.dumps({**fields, "metrics": metrics}, indent=2) + "\n"
+
+
+def write_metrics(
+    path: Path,
+    stages: Optional[Dict[str, Dict[str, float]]] = None,
+    wall_seconds: Optional[float] = None,
+    **fields: Any,
+) -> None:
+    """Replace a metrics file with the metrics of this run, atomically
+
+    The format follows the file name: JSON for ``.json`` files, Prometheus text
+    otherwise (node_exporter's textfile collector reads ``*.prom`` files). The file
+    is written next to its destination and renamed over it, so a collector never
+    reads a partial file.
+
+    Args:
+        path: File to write
+        stages: Stage timings from ``timings.summary``
+        wall_seconds: Duration of the run
+        **fields: Extra fields for JSON snapshots, e.g. command
+    """
+    path = Path(path)
+    samples = collect(stages, wall_seconds)
+    if path.suffix.lower() == ".json":
+        text = format_json(samples, **fields)
+    else:
+        text = format_prometheus(samples)
+
+    temp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "w") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except Exception as e:
+        log.warning(f"Could not write metrics to {path}: {e}")
+        temp_path.unlink(missing_ok=True)
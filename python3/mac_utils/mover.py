@@ -0,0 +1,221 @@
+"""Move downloaded files into place, across filesystems if needed"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MOVE_WORKERS = 4
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # bytes
+STAGING_PREFIX = ".mac-utils-staging-"
+
+# Called as progress(source, bytes_moved, total_bytes) while a file is moved
+ProgressCallback = Callable[[Path, int, int], None]
+
+# Serialises renames on filesystems without hard links
+_place_lock = threading.Lock()
+
+
+def same_device(source: Path, dest_dir: Path) -> bool:
+    """Check whether a file can be renamed into a directory
+
+    Args:
+        source: File to move
+        dest_dir: Destination directory
+
+    Returns:
+        bool: True if both are on the same filesystem
+    """
+    return os.stat(source).st_dev == os.stat(dest_dir).st_dev
+
+
+def staging_dir(dest_dir: Path) -> Path:
+    """Pick the directory cross-device copies are written in before they're moved in
+
+    Folders watched for new files, like Music's "Automatically Add to Music", pick
+    up whatever appears in them, so copies are staged next to the destination
+    rather than inside it: the parent directory, when it is writable and on the
+    same filesystem so the finished copy can be renamed in.
+
+    Args:
+        dest_dir: Destination directory
+
+    Returns:
+        Path: The parent of ``dest_dir``, or ``dest_dir`` itself when the parent
+            can't be used
+    """
+    parent = dest_dir.resolve().parent
+    if parent == dest_dir.resolve() or not os.access(parent, os.W_OK):
+        return dest_dir
+    return parent if os.stat(parent).st_dev == os.stat(dest_dir).st_dev else dest_dir
+
+
+def place_file(path: Path, dest_dir: Path, name: str) -> Path:
+    """Move a file into a directory under a free name, adding " (1)", " (2)"... on collisions
+
+    Each candidate name is claimed with a hard link, which fails rather than
+    overwrite an existing file, and the old path is then unlinked. Nothing but the
+    complete file ever appears in ``dest_dir``. Where hard links aren't supported
+    the file is renamed to the first name that doesn't exist, which is only safe
+    against moves from the same process.
+
+    Args:
+        path: File to move, on the same filesystem as ``dest_dir``
+        dest_dir: Destination directory
+        name: Preferred file name
+
+    Returns:
+        Path: Final path of the file
+    """
+    stem, suffix = Path(name).stem, Path(name).suffix
+    counter = 0
+    while True:
+        candidate = dest_dir / (name if counter == 0 else f"{stem} ({counter}){suffix}")
+        try:
+            os.link(path, candidate)
+        except FileExistsError:
+            counter += 1
+            continue
+        except OSError:
+            with _place_lock:
+                if os.path.lexists(candidate):
+                    counter += 1
+                    continue
+                os.replace(path, candidate)
+            return candidate
+        try:
+            os.unlink(path)
+        except OSError as e:
+            # The file is in place under its new name, so the move still counts as done
+            log.warning(f"Moved {path.name} to {dest_dir}, but could not delete it: {e}")
+        return candidate
+
+
+def copy_file(
+    source: Path,
+    dest: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> None:
+    """Copy a file in chunks and sync the copy to disk
+
+    Args:
+        source: File to copy
+        dest: Path of the copy, removed again if the copy fails
+        chunk_size: Bytes copied per read
+        progress: Called after each chunk
+    """
+    total = os.path.getsize(source)
+    copied = 0
+    try:
+        with open(source, "rb") as src, open(dest, "wb") as dst:
+            while chunk := src.read(chunk_size):
+                dst.write(chunk)
+                copied += len(chunk)
+                if progress:
+                    progress(source, copied, total)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copystat(source, dest)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+
+
+def move_file(
+    source: Path,
+    dest_dir: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> Path:
+    """Move a file into a directory without overwriting anything there
+
+    Uses a rename when the directory is on the same filesystem. Otherwise the file
+    is copied into a staging directory outside ``dest_dir`` (see ``staging_dir``),
+    synced to disk and renamed in, and only then is the source deleted.
+
+    Args:
+        source: File to move
+        dest_dir: Destination directory
+        chunk_size: Bytes copied per read for cross-device moves
+        progress: Called as bytes are moved
+
+    Returns:
+        Path: Final path of the file
+
+    Raises:
+        OSError: The file could not be moved. The source is left in place, and is only
+            left behind after a successful move if it can't be deleted
+    """
+    source, dest_dir = Path(source), Path(dest_dir)
+    if same_device(source, dest_dir):
+        size = os.path.getsize(source)
+        dest = place_file(source, dest_dir, source.name)
+        if progress:
+            progress(source, size, size)
+    else:
+        log.debug(f"Copying {source.name} across filesystems to {dest_dir}")
+        staging = Path(tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=staging_dir(dest_dir)))
+        try:
+            staged = staging / source.name
+            copy_file(source, staged, chunk_size=chunk_size, progress=progress)
+            dest = place_file(staged, dest_dir, source.name)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        try:
+            source.unlink()
+        except OSError as e:
+            log.warning(f"Moved {source.name} to {dest_dir}, but could not delete it: {e}")
+
+    if dest.name != source.name:
+        log.info(f"{dest_dir / source.name} already exists, saved as {dest.name}")
+    return dest
+
+
+def move_files(
+    files: Iterable[Path],
+    dest_dir: Path,
+    workers: int = DEFAULT_MOVE_WORKERS,
+    progress: Optional[ProgressCallback] = None,
+    on_moved: Optional[Callable[[Path, Path], None]] = None,
+) -> List[Path]:
+    """Move files into a directory in parallel
+
+    A file that fails to move is logged and left where it is; the others are
+    still moved.
+
+    Args:
+        files: Files to move
+        dest_dir: Destination directory
+        workers: Maximum number of files moved at once
+        progress: Called as bytes are moved, from the worker threads
+        on_moved: Called as (source, final path) after each file is moved, from the
+            worker threads
+
+    Returns:
+        list: Final paths of the moved files, in the order they were given
+    """
+    files = [Path(file_path) for file_path in files]
+
+    def move(file_path: Path) -> Optional[Path]:
+        try:
+            dest = move_file(file_path, dest_dir, progress=progress)
+        except OSError as e:
+            log.error(f"Could not move {file_path.name} to {dest_dir}: {str(e)}")
+            return None
+        if on_moved:
+            on_moved(file_path, dest)
+        return dest
+
+    if len(files) <= 1 or workers <= 1:
+        results = [move(file_path) for file_path in files]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mac-utils-move") as pool:
+            results = list(pool.map(move, files))
+    return [dest for dest in results if dest is not None]
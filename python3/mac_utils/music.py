@@ -1,6 +1,14 @@
 import logging
+from typing import Iterator
 
-from .util import move_mp3_files_to_music_folder, yt_dlp_download
+from . import metrics
+from .history_manager import is_downloaded
+from .util import (
+    DownloaderSession,
+    move_mp3_files_to_music_folder,
+    resolve_browser_cookies,
+    yt_dlp_download,
+)
 
 log = logging.getLogger(__name__)
 
@@ -14,12 +22,115 @@ def download_mp3(
         url: Media URL
         media_company: Media company name
         dry_run: If True, only show what would be downloaded
-        output_dir: Custom output directory
+        output_dir: Custom output directory - MP3s are left there instead of being
+            moved to the Music folder
         force: If True, download even if URL exists in history
     """
-    yt_dlp_download(url, media_company, "mp3", dry_run=dry_run, output_dir=output_dir, force=force)
-    if not dry_run:
-        move_mp3_files_to_music_folder()
+    files = yt_dlp_download(
+        url, media_company, "mp3", dry_run=dry_run, output_dir=output_dir, force=force
+    )
+    # If custom output is specified, don't move files
+    if not dry_run and not output_dir:
+        move_mp3_files_to_music_folder(files=files, force=force)
+
+
+def iter_playlist_entries(url: str) -> Iterator[str]:
+    """Yield the URL of each playlist entry as yt-dlp enumerates it
+
+    Uses flat extraction without processing, so entries are fetched page by page
+    instead of resolving the whole playlist up front.
+
+    Args:
+        url: Playlist URL
+
+    Yields:
+        str: Entry URL - or the URL itself if it is not a playlist
+    """
+    import yt_dlp
+
+    options = {"extract_flat": "in_playlist", "quiet": True, "skip_download": True}
+    cookies = resolve_browser_cookies("chrome")
+    if cookies:
+        options["cookiesfrombrowser"] = cookies
+
+    with yt_dlp.YoutubeDL(options) as ydl:
+        info = ydl.extract_info(url, download=False, process=False)
+        if not info:
+            return
+        if info.get("_type") not in ("playlist", "multi_video"):
+            yield url
+            return
+
+        for entry in info.get("entries") or []:
+            entry_url = entry and (entry.get("webpage_url") or entry.get("url"))
+            if entry_url:
+                yield entry_url
+
+
+def download_playlist(
+    url: str,
+    media_company: str,
+    dry_run: bool = False,
+    output_dir: str = None,
+    force: bool = False,
+) -> None:
+    """Download a playlist as MP3s one entry at a time
+
+    Entries are downloaded while the playlist is still being enumerated. Entries
+    already in history are skipped, and each download is committed to history and
+    moved to the Music folder as soon as it finishes, so an interrupted sync
+    resumes where it stopped.
+
+    Args:
+        url: Playlist URL
+        media_company: Media company name
+        dry_run: If True, only show what would be downloaded
+        output_dir: Custom output directory - MP3s are left there instead of being
+            moved to the Music folder
+        force: If True, download even if URL exists in history
+    """
+    downloaded = planned = skipped = failed = 0
+
+    with DownloaderSession() as session:
+        for entry_url in iter_playlist_entries(url):
+            if not force and is_downloaded(entry_url):
+                skipped += 1
+                metrics.inc("skipped", reason="history")
+                log.debug(f"Skipping - already downloaded: {entry_url}")
+                continue
+
+            try:
+                files = yt_dlp_download(
+                    entry_url,
+                    media_company,
+                    "mp3",
+                    dry_run=dry_run,
+                    output_dir=output_dir,
+                    force=force,
+                    session=session,
+                )
+            except Exception as e:
+                failed += 1
+                log.error(f"Skipping playlist entry {entry_url}: {str(e)}")
+                continue
+
+            if dry_run:
+                planned += 1
+                continue
+            downloaded += 1
+            if not output_dir:
+                move_mp3_files_to_music_folder(files=files, force=force)
+
+    if dry_run:
+        log.info(
+            f"[DRY RUN] Playlist complete: {planned} would be downloaded, "
+            f"{skipped} already in history, {failed} failed"
+        )
+    else:
+        log.info(
+            f"Playlist complete: {downloaded} downloaded, {skipped} already in history, "
+            f"{failed} failed"
+        )
 
 
 def download_youtube_playlist(
@@ -33,9 +144,7 @@ def download_youtube_playlist(
         output_dir: Custom output directory
         force: If True, download even if URL exists in history
     """
-    yt_dlp_download(url, "YouTube", "mp3", dry_run=dry_run, output_dir=output_dir, force=force)
-    if not dry_run:
-        move_mp3_files_to_music_folder()
+    download_playlist(url, "YouTube", dry_run=dry_run, output_dir=output_dir, force=force)
 
 
 def download_soundcloud_user_likes(
@@ -50,6 +159,4 @@ def download_soundcloud_user_likes(
         force: If True, download even if URL exists in history
     """
     url = f"https://soundcloud.com/{username}/likes"
-    yt_dlp_download(url, "SoundCloud", "mp3", dry_run=dry_run, output_dir=output_dir, force=force)
-    if not dry_run:
-        move_mp3_files_to_music_folder()
+    download_playlist(url, "SoundCloud", dry_run=dry_run, output_dir=output_dir, force=force)
@@ -0,0 +1,179 @@
+"""Asyncio download orchestration with per-host concurrency limits
+
+Example:
+    import asyncio
+    from mac_utils.orchestrator import DownloadOrchestrator
+
+    orchestrator = DownloadOrchestrator({"YouTube": 2, "SoundCloud": 6})
+    failures = asyncio.run(orchestrator.download_many(urls, "mp3"))
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .batch import move_downloaded_files
+from .config_manager import get_config_value
+from .urls import detect_media_company
+from .util import DownloaderSession, yt_dlp_download
+
+log = logging.getLogger(__name__)
+
+DEFAULT_HOST_LIMITS = {"YouTube": 2, "SoundCloud": 4}
+
+
+def get_host_limits() -> Dict[str, int]:
+    """Get per-media-company concurrency limits from config
+
+    Returns:
+        dict: Maximum concurrent downloads keyed by media company
+    """
+    return {
+        "YouTube": get_config_value("youtube_concurrency", DEFAULT_HOST_LIMITS["YouTube"]),
+        "SoundCloud": get_config_value("soundcloud_concurrency", DEFAULT_HOST_LIMITS["SoundCloud"]),
+    }
+
+
+class DownloadOrchestrator:
+    """Schedule downloads concurrently while capping parallelism per media company
+
+    Blocking ``yt_dlp_download`` calls run in an executor; an asyncio semaphore per
+    media company limits how many of them hit the same host at once. Executor
+    threads keep their downloaders warm between URLs through a shared
+    ``DownloaderSession``. Semaphores bind to the event loop that first uses them,
+    so use one orchestrator per loop.
+    """
+
+    def __init__(
+        self, host_limits: Optional[Dict[str, int]] = None, executor: Optional[Executor] = None
+    ) -> None:
+        """
+        Args:
+            host_limits: Maximum concurrent downloads keyed by media company
+                (default: youtube_concurrency / soundcloud_concurrency config keys)
+            executor: Executor for blocking downloads (default: a thread pool large
+                enough to run every host at its limit). An executor passed in is left
+                running by ``shutdown``
+        """
+        self.host_limits = host_limits or get_host_limits()
+        if any(limit < 1 for limit in self.host_limits.values()):
+            raise ValueError("Concurrency limits must be at least 1")
+
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=sum(self.host_limits.values()), thread_name_prefix="mac-utils-async"
+        )
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._session = DownloaderSession()
+
+    def _semaphore(self, media_company: str) -> asyncio.Semaphore:
+        """Get the semaphore guarding a media company"""
+        if media_company not in self._semaphores:
+            self._semaphores[media_company] = asyncio.Semaphore(
+                self.host_limits.get(media_company, 1)
+            )
+        return self._semaphores[media_company]
+
+    async def download(
+        self,
+        url: str,
+        media_type: str,
+        media_company: Optional[str] = None,
+        dry_run: bool = False,
+        output_dir: str = None,
+        force: bool = False,
+    ) -> List[Path]:
+        """Download a single URL once its host has a free slot
+
+        Args:
+            url: Media URL to download
+            media_type: Media type to download ('mp3' or 'video')
+            media_company: Media company (default: detected from the URL)
+            dry_run: If True, only show what would be downloaded
+            output_dir: Custom output directory
+            force: If True, download even if URL exists in history
+
+        Returns:
+            list: Final paths of the downloaded files
+
+        Raises:
+            ValueError: If the URL is not a YouTube or SoundCloud URL
+        """
+        if media_company is None:
+            media_company = detect_media_company(url)
+            if not media_company:
+                raise ValueError(f"URL: {url} is not a valid YouTube or SoundCloud URL")
+
+        async with self._semaphore(media_company):
+            log.debug(f"Starting {media_company} download: {url}")
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(
+                    yt_dlp_download,
+                    url,
+                    media_company,
+                    media_type,
+                    dry_run=dry_run,
+                    output_dir=output_dir,
+                    force=force,
+                    session=self._session,
+                ),
+            )
+
+    async def download_many(
+        self,
+        urls: Iterable[str],
+        media_type: str,
+        dry_run: bool = False,
+        output_dir: str = None,
+        force: bool = False,
+        move_files: bool = True,
+    ) -> Dict[str, BaseException]:
+        """Download many URLs concurrently
+
+        Args:
+            urls: Media URLs to download
+            media_type: Media type to download ('mp3' or 'video')
+            dry_run: If True, only show what would be downloaded
+            output_dir: Custom output directory
+            force: If True, download even if URL exists in history
+            move_files: If True, move finished files to their library folder
+
+        Returns:
+            dict: Exceptions raised by failed downloads, keyed by URL
+        """
+        urls = list(urls)
+        results = await asyncio.gather(
+            *(
+                self.download(url, media_type, dry_run=dry_run, output_dir=output_dir, force=force)
+                for url in urls
+            ),
+            return_exceptions=True,
+        )
+        failures = {
+            url: result for url, result in zip(urls, results) if isinstance(result, BaseException)
+        }
+        for url, error in failures.items():
+            log.error(f"Failed: {url} - {error}")
+
+        files = [path for result in results if isinstance(result, list) for path in result]
+        if move_files and not dry_run and files:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self._executor, move_downloaded_files, media_type, files, output_dir, force
+            )
+
+        return failures
+
+    def shutdown(self) -> None:
+        """Close downloaders once all downloads have finished
+
+        The executor is shut down too, unless it was passed in by the caller.
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+        self._session.close()
@@ -0,0 +1,219 @@
+"""Throttled progress display for yt-dlp downloads
+
+yt-dlp calls progress hooks for every chunk it receives, often hundreds of times
+a second. ``ProgressReporter.hook`` only records the numbers; the display is
+redrawn at most every ``DEFAULT_REFRESH_INTERVAL`` seconds with one line per
+active download, so concurrent downloads share the terminal instead of
+overwriting each other's line. Log records are written through
+``ProgressLogHandler``, which prints them above the bars.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+DEFAULT_REFRESH_INTERVAL = 0.2  # seconds
+BAR_WIDTH = 20
+NAME_WIDTH = 40
+
+# ANSI sequences: move to the start of the line n lines up, clear to end of screen
+_CURSOR_UP = "\x1b[{}F"
+_CLEAR_DOWN = "\x1b[J"
+
+
+class DownloadState:
+    """Latest progress numbers of one download"""
+
+    __slots__ = ("name", "downloaded", "total", "speed", "eta")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.downloaded = 0
+        self.total: Optional[int] = None
+        self.speed: Optional[float] = None
+        self.eta: Optional[int] = None
+
+
+def format_bytes(count: Optional[float]) -> str:
+    """Format a byte count, e.g. 1.5MiB"""
+    if count is None:
+        return "--"
+    if count < 1024:
+        return f"{count:.0f}B"
+    for unit in ("KiB", "MiB"):
+        count /= 1024
+        if count < 1024:
+            return f"{count:.1f}{unit}"
+    return f"{count / 1024:.1f}GiB"
+
+
+def format_eta(seconds: Optional[int]) -> str:
+    """Format seconds as MM:SS, or H:MM:SS for an hour or more"""
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def format_line(state: DownloadState) -> str:
+    """Render one download as a progress bar line
+
+    Args:
+        state: Progress of the download
+
+    Returns:
+        str: e.g. ``Song.webm  [########------------]  42.0%  1.2MiB/s  ETA 00:07``
+    """
+    name = state.name
+    if len(name) > NAME_WIDTH:
+        name = name[: NAME_WIDTH - 1] + "…"
+
+    if state.total:
+        fraction = min(state.downloaded / state.total, 1.0)
+        filled = int(fraction * BAR_WIDTH)
+        bar = "#" * filled + "-" * (BAR_WIDTH - filled)
+        amount = f"{fraction * 100:5.1f}%"
+    else:
+        bar = "?" * BAR_WIDTH
+        amount = format_bytes(state.downloaded)
+
+    speed = f"{format_bytes(state.speed)}/s"
+    return f"{name:<{NAME_WIDTH}}  [{bar}]  {amount}  {speed}  ETA {format_eta(state.eta)}"
+
+
+class ProgressReporter:
+    """Collects progress from yt-dlp hooks and draws it at a capped rate
+
+    One reporter can be shared by all download threads. Bars are only drawn when
+    the stream is a terminal; otherwise progress is not shown at all, so logs
+    written to files or pipes aren't flooded.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        interval: float = DEFAULT_REFRESH_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            stream: Where to draw (default: sys.stdout at the time of drawing)
+            interval: Minimum seconds between redraws
+            clock: Monotonic time source
+        """
+        self._stream = stream
+        self.interval = interval
+        self._clock = clock
+        self._downloads: Dict[str, DownloadState] = {}
+        self._lock = threading.Lock()
+        self._rendered_at: Optional[float] = None
+        self._drawn_lines = 0
+
+    @property
+    def stream(self) -> TextIO:
+        return self._stream or sys.stdout
+
+    def hook(self, d: Dict[str, Any]) -> None:
+        """yt-dlp progress hook
+
+        Args:
+            d: Progress dict from yt-dlp
+        """
+        key = d.get("filename") or d.get("tmpfilename") or "download"
+        if d.get("status") != "downloading":
+            self.finish(key)
+            return
+
+        now = self._clock()
+        with self._lock:
+            state = self._downloads.get(key)
+            if state is None:
+                state = self._downloads[key] = DownloadState(os.path.basename(key))
+            state.downloaded = d.get("downloaded_bytes") or 0
+            state.total = d.get("total_bytes") or d.get("total_bytes_estimate")
+            state.speed = d.get("speed")
+            state.eta = d.get("eta")
+
+            if self._rendered_at is not None and now - self._rendered_at < self.interval:
+                return
+            self._rendered_at = now
+            self._draw(self.lines())
+
+    def finish(self, key: str) -> None:
+        """Remove a download from the display
+
+        Args:
+            key: File name the download was reported under
+        """
+        with self._lock:
+            if self._downloads.pop(key, None) is not None:
+                # Clear the bars so the caller can log; they're redrawn on the next update
+                self._draw([])
+                self._rendered_at = None
+
+    @contextmanager
+    def suspended(self) -> Iterator[None]:
+        """Clear the bars while something else writes to the stream, then redraw them
+
+        Redraws from other threads wait until the block ends.
+        """
+        with self._lock:
+            drawn = self._drawn_lines
+            if drawn:
+                self._draw([])
+            try:
+                yield
+            finally:
+                if drawn:
+                    self._draw(self.lines())
+
+    def lines(self) -> List[str]:
+        """Render the active downloads, one line each"""
+        return [format_line(state) for state in self._downloads.values()]
+
+    def _draw(self, lines: List[str]) -> None:
+        """Replace the previously drawn lines"""
+        stream = self.stream
+        if not stream.isatty():
+            return
+        parts = []
+        if self._drawn_lines:
+            parts.append(_CURSOR_UP.format(self._drawn_lines))
+        parts.append(_CLEAR_DOWN)
+        parts.extend(f"{line}\n" for line in lines)
+        stream.write("".join(parts))
+        stream.flush()
+        self._drawn_lines = len(lines)
+
+
+class ProgressLogHandler(logging.StreamHandler):
+    """Log handler that writes records above the progress bars
+
+    The bars are cleared before each record is written and redrawn below it, so
+    log lines from any thread neither interleave with a redraw nor get drawn over.
+    The handler and the reporter should write to the same stream.
+    """
+
+    def __init__(
+        self, stream: Optional[TextIO] = None, reporter: Optional[ProgressReporter] = None
+    ) -> None:
+        """
+        Args:
+            stream: Where to write records (default: sys.stderr)
+            reporter: Reporter drawing the bars (default: the shared ``reporter``)
+        """
+        super().__init__(stream)
+        self._reporter = reporter
+
+    def emit(self, record: logging.LogRecord) -> None:
+        with (self._reporter or reporter).suspended():
+            super().emit(record)
+
+
+# Shared by every download in the process, see util.yt_dl_progress_hook
+reporter = ProgressReporter()
@@ -0,0 +1,141 @@
+"""Retry policy for downloads: exponential backoff, jitter and error classification"""
+
+import logging
+import random
+import re
+from typing import Optional
+
+from .config_manager import get_config_value
+
+log = logging.getLogger(__name__)
+
+# Errors that will fail the same way on every attempt
+FATAL_ERROR_PATTERN = re.compile(
+    r"video unavailable|private video|is not available|has been removed|"
+    r"unsupported url|not a valid url|http error (?:400|401|404|410)|"
+    r"members[- ]only|confirm your age|copyright|account (?:has been )?terminated",
+    re.IGNORECASE,
+)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Classify a download error as transient (worth retrying) or fatal
+
+    Args:
+        error: Exception raised by a download attempt
+
+    Returns:
+        bool: False for errors that will fail the same way on every attempt
+    """
+    import yt_dlp.utils
+
+    # yt-dlp wraps the underlying error in a DownloadError
+    cause = error
+    if isinstance(error, yt_dlp.utils.DownloadError) and error.exc_info:
+        cause = error.exc_info[1] or error
+
+    if isinstance(cause, (yt_dlp.utils.UnsupportedError, yt_dlp.utils.GeoRestrictedError)):
+        return False
+    if isinstance(cause, yt_dlp.utils.ExtractorError) and cause.expected:
+        # yt-dlp marks errors it expects the user to see (removed, private...) as expected
+        return False
+    if isinstance(cause, (ValueError, TypeError)) and not isinstance(
+        cause, yt_dlp.utils.YoutubeDLError
+    ):
+        return False
+
+    return not FATAL_ERROR_PATTERN.search(str(error))
+
+
+class RetryPolicy:
+    """Decide whether and when to retry a failed download
+
+    Delays grow exponentially from ``base_delay`` up to ``max_delay`` and are
+    randomized by ``jitter`` so parallel downloads don't retry in lockstep. No retry
+    is scheduled once ``max_elapsed`` seconds would be exceeded or the error is fatal.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 2,
+        max_delay: float = 60,
+        multiplier: float = 2,
+        jitter: float = 0.5,
+        max_elapsed: Optional[float] = 300,
+    ) -> None:
+        """
+        Args:
+            max_attempts: Maximum number of attempts, including the first one
+            base_delay: Seconds to wait before the first retry
+            max_delay: Upper bound for a single wait
+            multiplier: Factor the delay grows by after each attempt
+            jitter: Fraction of each delay that is randomized (0 disables jitter)
+            max_elapsed: Seconds after which no more retries are started (None: no limit)
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1")
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.max_elapsed = max_elapsed
+
+    @classmethod
+    def from_config(
+        cls, max_attempts: Optional[int] = None, base_delay: Optional[float] = None
+    ) -> "RetryPolicy":
+        """Build a policy from the ``retry_*`` config keys
+
+        Args:
+            max_attempts: Overrides ``retry_count``
+            base_delay: Overrides ``retry_delay``
+
+        Returns:
+            RetryPolicy: Policy using config values for anything not overridden
+        """
+        return cls(
+            max_attempts=max_attempts or get_config_value("retry_count", 3),
+            base_delay=base_delay if base_delay is not None else get_config_value("retry_delay", 2),
+            max_delay=get_config_value("retry_max_delay", 60),
+            max_elapsed=get_config_value("retry_max_elapsed", 300),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Get the wait before the retry that follows a failed attempt
+
+        Args:
+            attempt: Number of the attempt that failed, starting at 1
+
+        Returns:
+            float: Seconds to wait
+        """
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def next_delay(self, attempt: int, error: BaseException, elapsed: float) -> Optional[float]:
+        """Get the wait before retrying, or None if the download should give up
+
+        Args:
+            attempt: Number of the attempt that failed, starting at 1
+            error: Exception raised by the failed attempt
+            elapsed: Seconds spent on the download so far
+
+        Returns:
+            float or None: Seconds to wait before the next attempt
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if not is_retryable(error):
+            log.debug(f"Not retrying fatal error: {error}")
+            return None
+
+        delay = self.backoff(attempt)
+        if self.max_elapsed is not None and elapsed + delay > self.max_elapsed:
+            log.debug(f"Not retrying - retry budget of {self.max_elapsed}s would be exceeded")
+            return None
+        return delay
@@ -0,0 +1,192 @@
+"""On-disk snapshots of folder listings for fast repeat scans
+
+A snapshot stores, for every folder under a root, the folder's mtime and the
+name, size, mtime and ctime of its files. Adding, removing or renaming a file
+changes its folder's mtime, so on refresh only folders whose mtime changed are
+listed and statted again - unchanged subtrees cost one stat per folder.
+
+Files rewritten in place (same name) don't change the folder mtime, so their
+size and times may be stale until something else in the folder changes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = Path.home() / ".mac-utils" / "snapshots"
+SNAPSHOT_VERSION = 1
+
+# (path, size, mtime, ctime)
+SnapshotFile = Tuple[str, int, float, float]
+
+
+def snapshot_path(root: str) -> Path:
+    """Get the snapshot file for a folder
+
+    Args:
+        root: Folder the snapshot lists
+
+    Returns:
+        Path: Snapshot file under DEFAULT_SNAPSHOT_DIR
+    """
+    key = hashlib.sha1(os.path.abspath(root).encode()).hexdigest()[:16]
+    return DEFAULT_SNAPSHOT_DIR / f"{key}.json"
+
+
+def load_snapshot(root: str) -> Dict[str, Any]:
+    """Load the snapshot for a folder
+
+    Args:
+        root: Folder the snapshot lists
+
+    Returns:
+        dict: Folder path -> {"mtime_ns", "files", "dirs"}. Empty if there is no
+            usable snapshot
+    """
+    path = snapshot_path(root)
+    if not path.exists():
+        return {}
+
+    try:
+        with open(path, "r") as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            return {}
+        return snapshot["dirs"]
+    except Exception as e:
+        log.warning(f"Ignoring unreadable snapshot {path}: {e}")
+        return {}
+
+
+def save_snapshot(root: str, dirs: Dict[str, Any]) -> None:
+    """Save the snapshot for a folder, replacing the previous one atomically
+
+    Args:
+        root: Folder the snapshot lists
+        dirs: Folder path -> {"mtime_ns", "files", "dirs"}
+    """
+    path = snapshot_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    snapshot = {"version": SNAPSHOT_VERSION, "root": os.path.abspath(root), "dirs": dirs}
+
+    try:
+        with open(temp_path, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+    except Exception as e:
+        log.warning(f"Could not save snapshot {path}: {e}")
+        temp_path.unlink(missing_ok=True)
+
+
+def scan_dir(folder: str, mtime_ns: int) -> Dict[str, Any]:
+    """List and stat one folder
+
+    Args:
+        folder: Folder to list
+        mtime_ns: The folder's mtime, read before listing it
+
+    Returns:
+        dict: {"mtime_ns", "files": [[name, size, mtime, ctime], ...], "dirs": [name, ...]}
+    """
+    files: List[list] = []
+    dirs: List[str] = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.name)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files.append([entry.name, stat.st_size, stat.st_mtime, stat.st_ctime])
+            except OSError:
+                # Removed while listing
+                continue
+    return {"mtime_ns": mtime_ns, "files": files, "dirs": dirs}
+
+
+def refresh_snapshot(root: str, recursive: bool = False) -> Dict[str, Any]:
+    """Bring a folder's snapshot up to date and save it
+
+    Args:
+        root: Folder to snapshot
+        recursive: Also refresh sub folders
+
+    Returns:
+        dict: Folder path -> {"mtime_ns", "files", "dirs"} for the refreshed folders
+
+    Raises:
+        OSError: The root folder can't be read
+    """
+    root = os.path.abspath(root)
+    cached = load_snapshot(root)
+    refreshed: Dict[str, Any] = {}
+    rescanned = 0
+
+    folders = [root]
+    while folders:
+        folder = folders.pop()
+        try:
+            # Read the mtime before listing, so changes made during the scan are
+            # picked up next time
+            mtime_ns = os.stat(folder).st_mtime_ns
+            listing = cached.get(folder)
+            if not listing or listing["mtime_ns"] != mtime_ns:
+                listing = scan_dir(folder, mtime_ns)
+                rescanned += 1
+        except OSError as e:
+            if folder == root:
+                raise
+            log.warning(f"Skipping folder {folder}: {str(e)}")
+            continue
+
+        refreshed[folder] = listing
+        if recursive:
+            folders.extend(os.path.join(folder, name) for name in listing["dirs"])
+
+    log.debug(f"Snapshot of {root}: rescanned {rescanned} of {len(refreshed)} folder(s)")
+    if rescanned:
+        if not recursive:
+            # Keep sub folders from earlier recursive runs
+            refreshed = {**cached, **refreshed}
+        save_snapshot(root, refreshed)
+    return refreshed
+
+
+def iter_snapshot_files(root: str, recursive: bool = False) -> Iterator[SnapshotFile]:
+    """Yield the files in a folder from its refreshed snapshot
+
+    Args:
+        root: Folder to list
+        recursive: Include files in sub folders
+
+    Yields:
+        tuple: (path, size, mtime, ctime) for each file
+    """
+    root = os.path.abspath(root)
+    dirs = refresh_snapshot(root, recursive=recursive)
+    folders = dirs if recursive else {root: dirs[root]}
+    for folder, listing in folders.items():
+        for name, size, mtime, ctime in listing["files"]:
+            yield os.path.join(folder, name), size, mtime, ctime
+
+
+def clear_snapshots() -> int:
+    """Delete all saved snapshots
+
+    Returns:
+        int: Number of snapshots deleted
+    """
+    if not DEFAULT_SNAPSHOT_DIR.exists():
+        return 0
+
+    removed = 0
+    for path in DEFAULT_SNAPSHOT_DIR.glob("*.json"):
+        path.unlink()
+        removed += 1
+    return removed
@@ -0,0 +1,117 @@
+"""ID3 tagging for downloaded MP3 files"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .timings import timed
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TAGGING_WORKERS = 4
+
+ARTWORK_MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+
+def find_artwork(metadata: Dict[str, Any]) -> Optional[Path]:
+    """Find the thumbnail file yt-dlp wrote for a download
+
+    Args:
+        metadata: Metadata dictionary from yt-dlp
+
+    Returns:
+        Path or None: Path of the last written thumbnail, if any
+    """
+    for thumbnail in reversed(metadata.get("thumbnails") or []):
+        filepath = thumbnail.get("filepath")
+        if filepath and Path(filepath).suffix.lower() in ARTWORK_MIME_TYPES:
+            if Path(filepath).exists():
+                return Path(filepath)
+    return None
+
+
+@timed("tag")
+def tag_mp3_file(file_path: Path, metadata: Dict[str, Any], artwork: Optional[Path] = None) -> bool:
+    """Add ID3 tags to an MP3 file
+
+    All frames are set on one ID3 tag and written with a single save, including
+    files that have no ID3 header yet.
+
+    Args:
+        file_path: Path to the MP3 file
+        metadata: Metadata dictionary from yt-dlp
+        artwork: Cover image to embed (default: the thumbnail yt-dlp wrote, if any)
+
+    Returns:
+        bool: True if the file was tagged
+    """
+    from mutagen.id3 import APIC, ID3, TALB, TDRC, TIT2, TPE1, ID3NoHeaderError
+
+    try:
+        # Try to load existing tags or start a new tag
+        try:
+            audio = ID3(file_path)
+        except ID3NoHeaderError:
+            audio = ID3()
+
+        # Add available metadata (encoding 3 is UTF-8)
+        if metadata.get("title"):
+            audio.setall("TIT2", [TIT2(encoding=3, text=metadata["title"])])
+        if metadata.get("artist") or metadata.get("uploader"):
+            artist = metadata.get("artist") or metadata.get("uploader")
+            audio.setall("TPE1", [TPE1(encoding=3, text=artist)])
+        if metadata.get("album"):
+            audio.setall("TALB", [TALB(encoding=3, text=metadata["album"])])
+        if metadata.get("upload_date"):
+            # Convert YYYYMMDD to YYYY
+            date = metadata["upload_date"]
+            audio.setall("TDRC", [TDRC(encoding=3, text=date[:4] if len(date) >= 4 else date)])
+
+        artwork = artwork or find_artwork(metadata)
+        if artwork:
+            audio.setall(
+                "APIC",
+                [
+                    APIC(
+                        encoding=3,
+                        mime=ARTWORK_MIME_TYPES.get(artwork.suffix.lower(), "image/jpeg"),
+                        type=3,  # Front cover
+                        desc="Cover",
+                        data=artwork.read_bytes(),
+                    )
+                ],
+            )
+
+        audio.save(file_path)
+        log.debug(f"Tagged MP3 file: {file_path.name}")
+        return True
+    except Exception as e:
+        log.warning(f"Could not tag MP3 file {file_path.name}: {str(e)}")
+        return False
+
+
+def tag_mp3_files(
+    files: Iterable[Tuple[Path, Dict[str, Any]]], workers: int = DEFAULT_TAGGING_WORKERS
+) -> int:
+    """Tag many MP3 files in a thread pool
+
+    Args:
+        files: (file path, yt-dlp metadata) pairs
+        workers: Maximum number of files tagged at once
+
+    Returns:
+        int: Number of files tagged successfully
+    """
+    files = list(files)
+    if len(files) <= 1 or workers <= 1:
+        return sum(tag_mp3_file(file_path, metadata) for file_path, metadata in files)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mac-utils-tag") as executor:
+        results = executor.map(lambda item: tag_mp3_file(*item), files)
+        return sum(results)
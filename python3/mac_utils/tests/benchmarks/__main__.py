@@ -0,0 +1,105 @@
+"""Run the benchmark suite, record the results and check them against a baseline
+
+Run with: python -m mac_utils.tests.benchmarks [--quick] [--only NAME] [--save-baseline]
+
+Exits with status 1 if a benchmark regressed against the baseline.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from mac_utils.tests.benchmarks import (
+    bench_e2e,
+    bench_files,
+    bench_history,
+    bench_progress,
+    bench_tagging,
+    bench_urls,
+)
+from mac_utils.tests.benchmarks.harness import (
+    DEFAULT_BASELINE_FILE,
+    DEFAULT_RESULTS_FILE,
+    DEFAULT_THRESHOLD,
+    Results,
+    find_regressions,
+    format_duration,
+    load_results,
+    save_results,
+)
+
+log = logging.getLogger(__name__)
+
+BENCHMARKS = {
+    "history": bench_history,
+    "files": bench_files,
+    "urls": bench_urls,
+    "tagging": bench_tagging,
+    "progress": bench_progress,
+    "e2e": bench_e2e,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmarks
+
+    Args:
+        argv: Command line arguments (default: sys.argv[1:])
+
+    Returns:
+        int: Exit status - 1 if there were regressions
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Use the smallest fixtures only")
+    parser.add_argument(
+        "--only", action="append", choices=BENCHMARKS, help="Benchmark to run (repeatable)"
+    )
+    parser.add_argument("--output", type=Path, default=DEFAULT_RESULTS_FILE, help="Results file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_FILE)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store the results as the new baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown before a benchmark counts as a regression (0.25 = 25%%)",
+    )
+    args = parser.parse_args(argv)
+
+    results: Results = {}
+    for name in args.only or BENCHMARKS:
+        log.info(f"Running {name} benchmarks...")
+        results.update(BENCHMARKS[name].collect(quick=args.quick))
+
+    baseline = load_results(args.baseline) or {}
+    for name, seconds in results.items():
+        line = f"{name:<40} {format_duration(seconds):>12}"
+        if baseline.get(name):
+            line += f"  ({(seconds / baseline[name] - 1) * 100:+.0f}% vs baseline)"
+        log.info(line)
+
+    save_results(results, args.output)
+    log.info(f"Results saved to {args.output}")
+
+    if args.save_baseline:
+        # Keep baseline entries of benchmarks that weren't run this time
+        save_results({**baseline, **results}, args.baseline)
+        log.info(f"Baseline saved to {args.baseline}")
+        return 0
+    if not baseline:
+        log.info("No baseline to compare with; store one with --save-baseline")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    for name, (before, after) in regressions.items():
+        log.error(f"Regression in {name}: {format_duration(before)} -> {format_duration(after)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    # force: importing mac_utils.main configures logging already
+    logging.basicConfig(level=logging.INFO, format="%(message)s", force=True)
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Benchmark whole downloads offline: download, transcode, tag, history and move
+
+Run with: python -m mac_utils.tests.benchmarks --only e2e
+
+Uses the harness in ``mac_utils.tests.e2e``. MP3 workloads are skipped when ffmpeg
+isn't installed.
+"""
+
+import logging
+from typing import Callable, Dict, List, Tuple
+
+from mac_utils.tests.benchmarks.harness import Results, format_duration
+from mac_utils.tests.e2e.harness import OfflineEnvironment, RunReport, ffmpeg_available
+
+log = logging.getLogger(__name__)
+
+ITEM_COUNT = 20
+QUICK_ITEM_COUNT = 3
+
+
+def record(results: Results, workload: str, reports: List[RunReport]) -> None:
+    """Add the throughput and mean stage latencies of a workload's runs"""
+    items = sum(report.items for report in reports)
+    size = sum(report.bytes for report in reports)
+    seconds = sum(report.seconds for report in reports)
+    if not items:
+        raise RuntimeError(f"The {workload} workload downloaded nothing")
+
+    results[f"e2e.{workload}.per_item"] = seconds / items
+    results[f"e2e.{workload}.per_mib"] = seconds / (size / 1024 / 1024)
+    stages: Dict[str, List[float]] = {}
+    for report in reports:
+        for stage, mean in report.stages.items():
+            stages.setdefault(stage, []).append(mean)
+    for stage, means in stages.items():
+        results[f"e2e.{workload}.stage_{stage}"] = sum(means) / len(means)
+
+    log.info(
+        f"{workload}: {items / seconds:.2f} items/s, {size / seconds / 1024 / 1024:.2f} MiB/s, "
+        + ", ".join(
+            f"{stage} {format_duration(results[f'e2e.{workload}.stage_{stage}'])}"
+            for stage in stages
+        )
+    )
+
+
+def run_videos(env: OfflineEnvironment, count: int) -> List[RunReport]:
+    """Download videos one dl-video command at a time"""
+    return [env.run(["dl-video", env.add_video(f"Video {i}")]) for i in range(count)]
+
+
+def run_songs(env: OfflineEnvironment, count: int) -> List[RunReport]:
+    """Download songs one dl-song command at a time"""
+    return [env.run(["dl-song", env.add_song(f"Song {i}")]) for i in range(count)]
+
+
+def run_likes(env: OfflineEnvironment, count: int) -> List[RunReport]:
+    """Download a user's likes in one dl-sc-user-likes command"""
+    env.add_likes("bench-user", count)
+    return [env.run(["dl-sc-user-likes", "bench-user"])]
+
+
+def collect(quick: bool = False) -> Results:
+    """Measure dl-video, dl-song and dl-sc-user-likes against the local media server
+
+    Args:
+        quick: Download fewer items
+
+    Returns:
+        dict: Seconds per item, seconds per MiB and mean seconds per stage run, by
+            workload
+    """
+    count = QUICK_ITEM_COUNT if quick else ITEM_COUNT
+    workloads: List[Tuple[str, Callable]] = [("dl_video", run_videos)]
+    if ffmpeg_available():
+        workloads += [("dl_song", run_songs), ("likes", run_likes)]
+    else:
+        log.warning("ffmpeg not found, skipping the MP3 workloads")
+
+    results: Results = {}
+    for workload, run in workloads:
+        with OfflineEnvironment() as env:
+            record(results, workload, run(env, count))
+    return results
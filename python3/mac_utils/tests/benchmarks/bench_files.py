@@ -0,0 +1,80 @@
+"""Benchmark sorting folders of different sizes with order-files
+
+Run with: python -m mac_utils.tests.benchmarks --only files
+"""
+
+import logging
+import os
+import random
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from mac_utils import util
+from mac_utils.tests.benchmarks.harness import Results, measure
+
+log = logging.getLogger(__name__)
+
+SIZES = (100, 50_000)
+QUICK_SIZES = (100,)
+SUFFIXES = (".mp3", ".mp4", ".jpg", ".txt")
+FILES_PER_FOLDER = 1_000
+
+
+def generate_folder(root: Path, count: int, seed: int = 0) -> None:
+    """Fill a folder with files of varied names, sizes, types and dates
+
+    Files are spread over sub folders of ``FILES_PER_FOLDER`` files each.
+
+    Args:
+        root: Folder to fill
+        count: Number of files
+        seed: Random seed
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        folder = root / f"folder-{i // FILES_PER_FOLDER}" if i >= FILES_PER_FOLDER else root
+        folder.mkdir(exist_ok=True)
+        file_path = folder / f"file-{rng.randrange(10**9):09d}{rng.choice(SUFFIXES)}"
+        file_path.write_bytes(b"x" * rng.randrange(1, 2048))
+        mtime = 1_600_000_000 + rng.randrange(10**8)
+        os.utime(file_path, (mtime, mtime))
+
+
+def collect(quick: bool = False) -> Results:
+    """Measure full sorts, top-N sorts and sorts from the snapshot index
+
+    Args:
+        quick: Only use the smallest folder
+
+    Returns:
+        dict: Seconds per sort by benchmark name
+    """
+    results = {}
+    for count in QUICK_SIZES if quick else SIZES:
+        log.info(f"Generating a folder of {count:,} files...")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir) / "files"
+            root.mkdir()
+            generate_folder(root, count)
+            folder = str(root)
+
+            for sort_by in util.SORT_KEYS:
+                results[f"files.sort_{sort_by}[{count}]"] = measure(
+                    lambda: util.sort_files_by(folder, "all", sort_by, recursive=True)
+                )
+            results[f"files.top10_size[{count}]"] = measure(
+                lambda: util.sort_files_by(
+                    folder, "all", "size", recursive=True, top=10, reverse=True
+                )
+            )
+
+            with patch("mac_utils.snapshots.DEFAULT_SNAPSHOT_DIR", Path(temp_dir) / "snapshots"):
+                # The first run builds the index; measure the runs that reuse it
+                util.sort_files_by(folder, "all", "size", recursive=True, use_index=True)
+                results[f"files.indexed_size[{count}]"] = measure(
+                    lambda: util.sort_files_by(
+                        folder, "all", "size", recursive=True, use_index=True
+                    )
+                )
+    return results
@@ -0,0 +1,94 @@
+"""Benchmark download history lookups against histories of different sizes
+
+Run with: python -m mac_utils.tests.benchmarks --only history
+"""
+
+import logging
+import tempfile
+from contextlib import closing, contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List
+from unittest.mock import patch
+
+from mac_utils import history_manager
+from mac_utils.tests.benchmarks.harness import Results, measure
+
+log = logging.getLogger(__name__)
+
+SIZES = (1_000, 100_000, 1_000_000)
+QUICK_SIZES = (1_000,)
+LOOKUPS = 1_000
+
+
+def history_url(i: int) -> str:
+    """URL of the i-th synthetic download, alternating YouTube and SoundCloud"""
+    if i % 2:
+        return f"https://soundcloud.com/artist-{i % 997}/track-{i}"
+    return f"https://www.youtube.com/watch?v={i:011d}"
+
+
+@contextmanager
+def temporary_history(count: int) -> Iterator[List[str]]:
+    """Point the history store at a temporary database with synthetic records
+
+    Args:
+        count: Number of records
+
+    Yields:
+        list: URLs of the records
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        history_dir = Path(temp_dir)
+        with (
+            patch.object(history_manager, "DEFAULT_HISTORY_DIR", history_dir),
+            patch.object(history_manager, "DEFAULT_HISTORY_FILE", history_dir / "history.db"),
+            patch.object(history_manager, "LEGACY_HISTORY_FILE", history_dir / "history.json"),
+        ):
+            timestamp = datetime.now().isoformat()
+            urls = [history_url(i) for i in range(count)]
+            records = [
+                {"url": url, "title": f"Song {i}", "media_type": "mp3", "timestamp": timestamp}
+                for i, url in enumerate(urls)
+            ]
+            with closing(history_manager.connect()) as conn, conn:
+                history_manager._insert_records(conn, records)
+
+            history_manager.history_index.invalidate()
+            try:
+                yield urls
+            finally:
+                history_manager.history_index.invalidate()
+
+
+def collect(quick: bool = False) -> Results:
+    """Measure index builds and lookups
+
+    Args:
+        quick: Only use the smallest history
+
+    Returns:
+        dict: Seconds per operation by benchmark name
+    """
+    results = {}
+    for count in QUICK_SIZES if quick else SIZES:
+        log.info(f"Building a history of {count:,} records...")
+        with temporary_history(count) as urls:
+            step = max(1, count // LOOKUPS)
+            hits = [url.replace("www.", "m.") for url in urls[::step][:LOOKUPS]]
+            misses = [history_url(count + i) for i in range(LOOKUPS)]
+
+            def build_index() -> None:
+                history_manager.history_index.invalidate()
+                history_manager.is_downloaded(urls[0])
+
+            def lookup(batch: List[str]) -> None:
+                for url in batch:
+                    history_manager.is_downloaded(url)
+
+            results[f"history.build_index[{count}]"] = measure(
+                build_index, repeat=1 if count >= 1_000_000 else 3
+            )
+            results[f"history.lookup_hit[{count}]"] = measure(lambda: lookup(hits)) / len(hits)
+            results[f"history.lookup_miss[{count}]"] = measure(lambda: lookup(misses)) / LOOKUPS
+    return results
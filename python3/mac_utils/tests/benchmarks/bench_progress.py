@@ -0,0 +1,85 @@
+"""Benchmark the yt-dlp progress hook under a stream of updates
+
+Run with: python -m mac_utils.tests.benchmarks.bench_progress [--count N] [--downloads N]
+or as part of the suite: python -m mac_utils.tests.benchmarks --only progress
+"""
+
+import argparse
+import io
+import logging
+import time
+
+from mac_utils.progress import ProgressReporter
+from mac_utils.tests.benchmarks.harness import Results
+
+log = logging.getLogger(__name__)
+
+DEFAULT_COUNT = 200_000
+QUICK_COUNT = 20_000
+DEFAULT_DOWNLOADS = 4
+
+
+class Terminal(io.StringIO):
+    """In-memory stream that reports itself as a terminal, so bars are drawn"""
+
+    def isatty(self) -> bool:
+        return True
+
+
+def run(count: int = DEFAULT_COUNT, downloads: int = DEFAULT_DOWNLOADS) -> float:
+    """Feed progress updates for concurrent downloads through a reporter
+
+    Args:
+        count: Number of hook calls
+        downloads: Number of downloads the updates are spread over
+
+    Returns:
+        float: Microseconds spent per hook call
+    """
+    stream = Terminal()
+    reporter = ProgressReporter(stream)
+    total = 50 * 1024 * 1024
+    updates = [
+        {
+            "status": "downloading",
+            "filename": f"/tmp/download-{i % downloads}.webm",
+            "downloaded_bytes": i * total // count,
+            "total_bytes": total,
+            "speed": 5 * 1024 * 1024.0,
+            "eta": 10,
+        }
+        for i in range(count)
+    ]
+
+    started = time.perf_counter()
+    for update in updates:
+        reporter.hook(update)
+    elapsed = time.perf_counter() - started
+
+    per_call = elapsed / count * 1e6
+    log.info(f"{count:,} updates for {downloads} download(s) in {elapsed:.2f}s")
+    log.info(f"{per_call:.2f} µs per hook call, {len(stream.getvalue()):,} bytes written")
+    return per_call
+
+
+def collect(quick: bool = False) -> Results:
+    """Measure the cost of a hook call
+
+    Args:
+        quick: Make fewer calls
+
+    Returns:
+        dict: Seconds per hook call by benchmark name
+    """
+    return {"progress.hook": run(QUICK_COUNT if quick else DEFAULT_COUNT) / 1e6}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="Number of hook calls")
+    parser.add_argument(
+        "--downloads", type=int, default=DEFAULT_DOWNLOADS, help="Concurrent downloads"
+    )
+    args = parser.parse_args()
+    run(args.count, args.downloads)
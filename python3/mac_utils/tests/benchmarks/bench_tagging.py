@@ -0,0 +1,91 @@
+"""Benchmark ID3 tagging of generated MP3 files
+
+Run with: python -m mac_utils.tests.benchmarks --only tagging
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from mac_utils import util
+from mac_utils.tests.benchmarks.harness import Results, measure
+
+log = logging.getLogger(__name__)
+
+FILE_COUNT = 50
+QUICK_FILE_COUNT = 10
+AUDIO_SIZE = 4 * 1024 * 1024  # about four minutes at 128 kbps
+ARTWORK_SIZE = 100 * 1024
+
+# MPEG-1 layer III frame header; mutagen only needs the file to look like an MP3
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x64"
+
+
+def generate_mp3s(folder: Path, count: int) -> List[Tuple[Path, Dict[str, Any]]]:
+    """Write untagged MP3 files, each with a thumbnail as yt-dlp leaves them
+
+    Args:
+        folder: Folder to write to
+        count: Number of files
+
+    Returns:
+        list: (file path, yt-dlp metadata) pairs
+    """
+    audio = MP3_FRAME_HEADER + os.urandom(AUDIO_SIZE)
+    artwork = b"\xff\xd8\xff\xe0" + os.urandom(ARTWORK_SIZE)
+    files = []
+    for i in range(count):
+        file_path = folder / f"Song {i}.mp3"
+        file_path.write_bytes(audio)
+        thumbnail = folder / f"Song {i}.jpg"
+        thumbnail.write_bytes(artwork)
+        metadata = {
+            "title": f"Song {i}",
+            "uploader": "Artist",
+            "album": "Album",
+            "upload_date": "20240101",
+            "thumbnails": [{"filepath": str(thumbnail)}],
+        }
+        files.append((file_path, metadata))
+    return files
+
+
+def collect(quick: bool = False) -> Results:
+    """Measure tagging one file at a time and in a thread pool
+
+    Args:
+        quick: Tag fewer files
+
+    Returns:
+        dict: Seconds per tagged file by benchmark name
+    """
+    count = QUICK_FILE_COUNT if quick else FILE_COUNT
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        originals = Path(temp_dir) / "originals"
+        originals.mkdir()
+        files = generate_mp3s(originals, count)
+        work = Path(temp_dir) / "work"
+
+        def reset() -> None:
+            # Tag untagged copies each run, like fresh downloads
+            shutil.rmtree(work, ignore_errors=True)
+            shutil.copytree(originals, work)
+
+        def tag_serially() -> None:
+            for file_path, metadata in files:
+                util.tag_mp3_file(work / file_path.name, metadata)
+
+        def tag_in_pool() -> None:
+            util.tag_mp3_files([(work / file_path.name, metadata) for file_path, metadata in files])
+
+        for name, tag in (("tag_mp3_file", tag_serially), ("tag_mp3_files", tag_in_pool)):
+            best = float("inf")
+            for _ in range(3):
+                reset()
+                best = min(best, measure(tag, repeat=1))
+            results[f"tagging.{name}[{count}]"] = best / count
+    return results
@@ -0,0 +1,111 @@
+"""Benchmark URL canonicalization and validation over a generated corpus
+
+Run with: python -m mac_utils.tests.benchmarks.bench_urls [--count N]
+or as part of the suite: python -m mac_utils.tests.benchmarks --only urls
+"""
+
+import argparse
+import logging
+import random
+import string
+import time
+from typing import List
+
+from mac_utils.main import validate_url
+from mac_utils.tests.benchmarks.harness import Results, measure
+from mac_utils.urls import canonical_key
+from mac_utils.util import clean_url
+
+log = logging.getLogger(__name__)
+
+DEFAULT_COUNT = 1_000_000
+SUITE_COUNT = 100_000
+QUICK_SUITE_COUNT = 10_000
+
+# Shapes of the URLs users paste, weighted roughly by how often they show up
+URL_TEMPLATES = [
+    ("https://www.youtube.com/watch?v={id}", 30),
+    ("https://youtu.be/{id}?si={token}", 15),
+    ("https://m.youtube.com/watch?v={id}&list=PL{token}&index=3", 10),
+    (r"https://www.youtube.com/watch\?v\={id}", 5),
+    ("https://www.youtube.com/shorts/{id}", 5),
+    ("https://www.youtube.com/playlist?list=PL{token}", 5),
+    ("https://soundcloud.com/{user}/{track}?si={token}&utm_source=clipboard", 20),
+    ("https://soundcloud.com/{user}/sets/{track}", 5),
+    ("https://example.com/{user}/{track}#{token}", 5),
+]
+
+
+def generate_corpus(count: int, seed: int = 0) -> List[str]:
+    """Generate a reproducible list of URLs
+
+    Args:
+        count: Number of URLs
+        seed: Random seed
+
+    Returns:
+        list: Generated URLs
+    """
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "-_"
+    templates, weights = zip(*URL_TEMPLATES)
+    return [
+        template.format(
+            id="".join(rng.choices(alphabet, k=11)),
+            token="".join(rng.choices(alphabet, k=16)),
+            user=f"artist-{rng.randrange(10_000)}",
+            track=f"track-{rng.randrange(100_000)}",
+        )
+        for template in rng.choices(templates, weights=weights, k=count)
+    ]
+
+
+def run(count: int = DEFAULT_COUNT) -> float:
+    """Canonicalize a corpus and report the throughput
+
+    Args:
+        count: Number of URLs in the corpus
+
+    Returns:
+        float: URLs canonicalized per second
+    """
+    corpus = generate_corpus(count)
+    started = time.perf_counter()
+    keys = {canonical_key(url) for url in corpus}
+    elapsed = time.perf_counter() - started
+
+    rate = count / elapsed
+    log.info(f"Canonicalized {count:,} URLs into {len(keys):,} keys in {elapsed:.2f}s")
+    log.info(f"{rate:,.0f} URLs/s ({elapsed / count * 1e6:.2f} µs per URL)")
+    return rate
+
+
+def collect(quick: bool = False) -> Results:
+    """Measure canonicalization, validation and cleaning of each URL
+
+    Args:
+        quick: Use a smaller corpus
+
+    Returns:
+        dict: Seconds per URL by benchmark name
+    """
+    count = QUICK_SUITE_COUNT if quick else SUITE_COUNT
+    corpus = generate_corpus(count)
+
+    def clean_all() -> None:
+        for url in corpus:
+            clean_url(url, "YouTube")
+
+    return {
+        "urls.canonical_key": measure(lambda: [canonical_key(url) for url in corpus]) / count,
+        "urls.validate_url": measure(lambda: [validate_url(url) for url in corpus]) / count,
+        "urls.clean_url": measure(clean_all) / count,
+    }
+
+
+if __name__ == "__main__":
+    # force: importing mac_utils.main configures logging already
+    logging.basicConfig(level=logging.INFO, format="%(message)s", force=True)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="Number of URLs")
+    run(parser.parse_args().count)
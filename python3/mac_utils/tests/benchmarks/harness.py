@@ -0,0 +1,116 @@
+"""Timing, result files and regression checks shared by the benchmarks
+
+Every benchmark module exposes ``collect(quick) -> {name: seconds per operation}``.
+Results are written as JSON and compared with a stored baseline; a benchmark
+more than ``DEFAULT_THRESHOLD`` slower than its baseline is a regression.
+"""
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+# python3/.benchmarks, next to pyproject.toml
+DEFAULT_RESULTS_DIR = Path(__file__).resolve().parents[3] / ".benchmarks"
+DEFAULT_RESULTS_FILE = DEFAULT_RESULTS_DIR / "results.json"
+DEFAULT_BASELINE_FILE = DEFAULT_RESULTS_DIR / "baseline.json"
+DEFAULT_THRESHOLD = 0.25  # 25% slower than the baseline
+
+Results = Dict[str, float]
+
+
+def measure(func: Callable[[], object], number: int = 1, repeat: int = 3) -> float:
+    """Time a function, keeping the best of several runs
+
+    Args:
+        func: Function to time
+        number: Calls per run
+        repeat: Number of runs
+
+    Returns:
+        float: Seconds per call in the fastest run
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds per operation with a readable unit"""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.2f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def save_results(results: Results, path: Path) -> None:
+    """Write results with details of the machine they were measured on
+
+    Args:
+        results: Seconds per operation by benchmark name
+        path: JSON file to write (replaced atomically)
+    """
+    data = {
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_results(path: Path) -> Optional[Results]:
+    """Read results written by ``save_results``
+
+    Args:
+        path: JSON file to read
+
+    Returns:
+        dict or None: Seconds per operation by benchmark name, None if the file
+            doesn't exist
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)["results"]
+    except FileNotFoundError:
+        return None
+
+
+def find_regressions(
+    results: Results, baseline: Results, threshold: float = DEFAULT_THRESHOLD
+) -> Dict[str, Tuple[float, float]]:
+    """Find benchmarks that got slower than their baseline
+
+    Benchmarks missing from either side are ignored.
+
+    Args:
+        results: New results
+        baseline: Results to compare with
+        threshold: Allowed slowdown as a fraction, e.g. 0.25 for 25%
+
+    Returns:
+        dict: (baseline, new) seconds per operation of each regressed benchmark
+    """
+    return {
+        name: (baseline[name], seconds)
+        for name, seconds in results.items()
+        if baseline.get(name) and seconds > baseline[name] * (1 + threshold)
+    }
@@ -0,0 +1,452 @@
+"""Offline end-to-end download harness
+
+Serves generated media from a local HTTP server and routes YouTube and SoundCloud
+URLs to a fake yt-dlp extractor that points at it, so the whole pipeline -
+download, transcode, tag, history, move - runs without network access. The CLI
+is driven through the typer app, and the duration of each pipeline stage is recorded.
+
+Example:
+    with OfflineEnvironment() as env:
+        url = env.add_video("Test Video")
+        report = env.run(["dl-video", url])
+        print(report.items_per_second, report.stages)
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import wave
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from functools import partial, wraps
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, cast
+from unittest.mock import patch
+
+import yt_dlp
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.utils import ExtractorError
+
+from mac_utils import config_manager, history_manager, jobs, snapshots, util
+
+AUDIO_SECONDS = 5
+AUDIO_SAMPLE_RATE = 44_100
+VIDEO_SIZE = 2 * 1024 * 1024
+ARTWORK = b"\xff\xd8\xff\xe0" + bytes(1024)
+
+# Stages reported by OfflineEnvironment.run
+STAGES = ("download", "postprocess", "tag", "history", "move")
+
+
+def ffmpeg_available() -> bool:
+    """Check whether ffmpeg is installed, which MP3 downloads need for transcoding"""
+    return shutil.which("ffmpeg") is not None
+
+
+def write_wav(path: Path, seconds: float = AUDIO_SECONDS) -> None:
+    """Write a mono 16-bit WAV file of noise
+
+    Args:
+        path: File to write
+        seconds: Length of the audio
+    """
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(AUDIO_SAMPLE_RATE)
+        f.writeframes(os.urandom(int(seconds * AUDIO_SAMPLE_RATE) * 2))
+
+
+@dataclass
+class MediaItem:
+    """A media file served by the harness"""
+
+    media_id: str
+    title: str
+    file_name: str
+    ext: str
+    is_video: bool
+
+
+class StageTimings:
+    """Thread-safe durations of pipeline stages"""
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the body of a with block as one run of a stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.durations[name].append(elapsed)
+
+    def mean(self) -> Dict[str, float]:
+        """Mean seconds per run of each stage that ran"""
+        with self._lock:
+            return {name: sum(runs) / len(runs) for name, runs in self.durations.items()}
+
+
+@dataclass
+class RunReport:
+    """Outcome of one CLI run"""
+
+    args: List[str]
+    items: int  # files added to the Music and Downloads folders
+    bytes: int  # bytes served by the media server
+    seconds: float
+    stages: Dict[str, float] = field(default_factory=dict)  # mean seconds per stage run
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
+class MediaRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the media folder quietly and counts the bytes sent
+
+    Supports open-ended ranges (``Range: bytes=N-``), which yt-dlp sends to resume a
+    partial file.
+    """
+
+    def send_head(self) -> Any:
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        path = Path(self.translate_path(self.path))
+        if not match or not path.is_file():
+            return super().send_head()
+
+        size = path.stat().st_size
+        start = int(match[1])
+        if start >= size:
+            self.send_error(416)
+            return None
+        f = open(path, "rb")
+        f.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(str(path)))
+        self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        self.send_header("Content-Length", str(size - start))
+        self.end_headers()
+        return f
+
+    def copyfile(self, source: Any, outputfile: Any) -> None:
+        before = source.tell()
+        super().copyfile(source, outputfile)
+        cast("MediaServer", self.server).count_bytes(source.tell() - before)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class MediaServer(ThreadingHTTPServer):
+    """Local HTTP server for generated media"""
+
+    daemon_threads = True
+
+    def __init__(self, root: Path) -> None:
+        super().__init__(("127.0.0.1", 0), partial(MediaRequestHandler, directory=str(root)))
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def count_bytes(self, count: int) -> None:
+        with self._lock:
+            self.bytes_sent += count
+
+    def url(self, file_name: str) -> str:
+        """URL of a file in the served folder"""
+        return f"http://127.0.0.1:{self.server_address[1]}/{file_name}"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class FakeMediaIE(InfoExtractor):
+    """Extractor for YouTube and SoundCloud URLs that serves items of a catalog
+
+    Set ``catalog``, ``server`` and ``media_dir`` on the instance before use.
+    """
+
+    IE_NAME = "fakemedia"
+    _VALID_URL = (
+        r"https?://(?:(?:www|m)\.)?(?:youtube\.com/watch\?v=(?P<youtube>[\w-]{11})"
+        r"|soundcloud\.com/(?P<soundcloud>[\w-]+(?:/[\w-]+)?))"
+    )
+
+    catalog: Dict[str, MediaItem]
+    server: MediaServer
+    media_dir: Path
+
+    def _real_extract(self, url: str) -> Dict[str, Any]:
+        match = self._match_valid_url(url)
+        media_id = match["youtube"] or match["soundcloud"]
+
+        if media_id.endswith("/likes"):
+            user = media_id.split("/", 1)[0]
+            entries = [
+                self.url_result(f"https://soundcloud.com/{item.media_id}", ie=self.ie_key())
+                for item in self.catalog.values()
+                if item.media_id.startswith(f"{user}/") and not item.is_video
+            ]
+            return self.playlist_result(entries, f"{user}-likes", f"Likes from {user}")
+
+        item = self.catalog.get(media_id)
+        if item is None:
+            raise ExtractorError(f"{media_id} is not in the catalog", expected=True)
+
+        media_format = {
+            "format_id": item.ext,
+            "url": self.server.url(item.file_name),
+            "ext": item.ext,
+            "protocol": "http",
+            "filesize": (self.media_dir / item.file_name).stat().st_size,
+        }
+        if item.is_video:
+            media_format.update(vcodec="avc1", acodec="mp4a", width=1280, height=720)
+        else:
+            media_format.update(vcodec="none", acodec="pcm_s16le", abr=705)
+
+        return {
+            "id": item.media_id.replace("/", "-"),
+            "title": item.title,
+            "uploader": "Fake Artist",
+            "upload_date": "20240101",
+            "webpage_url": url,
+            "formats": [media_format],
+            "thumbnails": [{"id": "0", "url": self.server.url("cover.jpg")}],
+        }
+
+
+class OfflineEnvironment:
+    """Temporary home, history, config, Music and Downloads folders with a media server
+
+    Inside the with block, ``yt_dlp.YoutubeDL`` only knows the fake extractor and
+    downloads land in a temporary working directory. Nothing outside the temporary
+    directory is read or written.
+    """
+
+    def __init__(self, audio_seconds: float = AUDIO_SECONDS, video_size: int = VIDEO_SIZE) -> None:
+        """
+        Args:
+            audio_seconds: Length of generated songs
+            video_size: Size of generated videos in bytes
+        """
+        self.audio_seconds = audio_seconds
+        self.video_size = video_size
+        self.catalog: Dict[str, MediaItem] = {}
+        self.timings = StageTimings()
+        self._stack = ExitStack()
+        self._server: Optional[MediaServer] = None
+
+    def __enter__(self) -> "OfflineEnvironment":
+        root = Path(self._stack.enter_context(tempfile.TemporaryDirectory()))
+        self.media_dir = root / "media"
+        self.home = root / "home"
+        self.work_dir = root / "work"
+        self.music_dir = root / "Music"
+        self.downloads_dir = self.home / "Downloads"
+        for folder in (self.media_dir, self.work_dir, self.music_dir, self.downloads_dir):
+            folder.mkdir(parents=True)
+        (self.media_dir / "cover.jpg").write_bytes(ARTWORK)
+
+        try:
+            self._patch_environment()
+            self._server = MediaServer(self.media_dir)
+            self._server.start()
+            self._stack.callback(self._server.stop)
+        except BaseException:
+            self._stack.close()
+            raise
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        history_manager.history_index.invalidate()
+        self._stack.close()
+
+    def _patch_environment(self) -> None:
+        """Point every path and network dependency of the pipeline at the sandbox"""
+        state_dir = self.home / ".mac-utils"
+        patches: List[ContextManager[Any]] = [
+            patch.object(history_manager, "DEFAULT_HISTORY_DIR", state_dir),
+            patch.object(history_manager, "DEFAULT_HISTORY_FILE", state_dir / "history.db"),
+            patch.object(history_manager, "LEGACY_HISTORY_FILE", state_dir / "history.json"),
+            patch.object(config_manager, "DEFAULT_CONFIG_DIR", state_dir),
+            patch.object(config_manager, "DEFAULT_CONFIG_FILE", state_dir / "config.yaml"),
+            patch.object(config_manager, "config_store", config_manager.ConfigStore()),
+            patch.object(snapshots, "DEFAULT_SNAPSHOT_DIR", state_dir / "snapshots"),
+            patch.object(jobs, "DEFAULT_JOBS_FILE", state_dir / "jobs.json"),
+            patch.object(jobs, "journal", jobs.JobJournal()),
+            patch.object(util, "COOKIE_CACHE_FILE", state_dir / "cookies-cache.json"),
+            patch("mac_utils.util.resolve_browser_cookies", return_value=None),
+            patch("mac_utils.music.resolve_browser_cookies", return_value=None),
+            patch("mac_utils.util.get_itunes_music_folder", return_value=str(self.music_dir)),
+            patch.object(Path, "home", return_value=self.home),
+            patch("yt_dlp.YoutubeDL", self._youtube_dl_class()),
+        ]
+        # Pipeline stages outside yt-dlp
+        for target, stage in (
+            ("mac_utils.util.tag_mp3_files", "tag"),
+            ("mac_utils.history_manager.add_to_history", "history"),
+            ("mac_utils.util.record_downloads", "history"),
+            ("mac_utils.util.move_files", "move"),
+            ("mac_utils.video.move_files", "move"),
+        ):
+            module, name = target.rsplit(".", 1)
+            original = getattr(__import__(module, fromlist=[name]), name)
+            patches.append(patch(target, self._timed(stage, original)))
+
+        for patcher in patches:
+            self._stack.enter_context(patcher)
+        history_manager.history_index.invalidate()
+
+        cwd = os.getcwd()
+        os.chdir(self.work_dir)
+        self._stack.callback(os.chdir, cwd)
+
+    def _timed(self, stage: str, func: Callable) -> Callable:
+        """Time calls of a function into the current run's timings"""
+
+        @wraps(func)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            with self.timings.stage(stage):
+                return func(*args, **kwargs)
+
+        return timed
+
+    def _youtube_dl_class(self) -> type:
+        """Build a YoutubeDL that only uses the fake extractor and times its stages"""
+        env = self
+
+        class OfflineYoutubeDL(yt_dlp.YoutubeDL):
+            def __init__(self, params: Optional[dict] = None, auto_init: bool = True) -> None:
+                super().__init__(params, auto_init=False)
+                extractor = FakeMediaIE()
+                extractor.catalog = env.catalog
+                extractor.server = env._server
+                extractor.media_dir = env.media_dir
+                self.add_info_extractor(extractor)
+
+            def dl(self, *args: Any, **kwargs: Any) -> Any:
+                with env.timings.stage("download"):
+                    return super().dl(*args, **kwargs)
+
+            def post_process(self, *args: Any, **kwargs: Any) -> Any:
+                with env.timings.stage("postprocess"):
+                    return super().post_process(*args, **kwargs)
+
+        return OfflineYoutubeDL
+
+    def _add(self, media_id: str, title: str, is_video: bool) -> MediaItem:
+        """Generate a media file and add it to the catalog"""
+        ext = "mp4" if is_video else "wav"
+        file_name = f"{media_id.replace('/', '-')}.{ext}"
+        if is_video:
+            # Videos aren't post-processed, so their content doesn't have to be valid
+            (self.media_dir / file_name).write_bytes(os.urandom(self.video_size))
+        else:
+            write_wav(self.media_dir / file_name, self.audio_seconds)
+        item = MediaItem(media_id, title, file_name, ext, is_video)
+        self.catalog[media_id] = item
+        return item
+
+    def add_video(self, title: str) -> str:
+        """Add a YouTube video
+
+        Args:
+            title: Video title
+
+        Returns:
+            str: URL of the video
+        """
+        media_id = f"v{len(self.catalog):010d}"
+        self._add(media_id, title, is_video=True)
+        return f"https://www.youtube.com/watch?v={media_id}"
+
+    def add_song(self, title: str, user: str = "fake-artist") -> str:
+        """Add a SoundCloud track
+
+        Args:
+            title: Track title
+            user: User the track belongs to
+
+        Returns:
+            str: URL of the track
+        """
+        media_id = f"{user}/track-{len(self.catalog)}"
+        self._add(media_id, title, is_video=False)
+        return f"https://soundcloud.com/{media_id}"
+
+    def add_likes(self, user: str, count: int) -> List[str]:
+        """Add tracks to a user's SoundCloud likes
+
+        Args:
+            user: SoundCloud username
+            count: Number of tracks
+
+        Returns:
+            list: URLs of the tracks
+        """
+        return [self.add_song(f"{user} like {i}", user=user) for i in range(count)]
+
+    def library_files(self) -> List[Path]:
+        """Files in the Music and Downloads folders"""
+        return sorted(
+            path
+            for folder in (self.music_dir, self.downloads_dir)
+            for path in folder.iterdir()
+            if path.is_file()
+        )
+
+    def run(self, args: List[str]) -> RunReport:
+        """Run a mac-utils command
+
+        Args:
+            args: Command line arguments, e.g. ["dl-video", url]
+
+        Returns:
+            RunReport: Items added, bytes served, duration and stage latencies
+
+        Raises:
+            RuntimeError: The command failed
+        """
+        from mac_utils.main import app
+
+        self.timings = StageTimings()
+        files_before = len(self.library_files())
+        bytes_before = self._server.bytes_sent
+
+        started = time.perf_counter()
+        try:
+            # Without standalone mode, exceptions propagate and exit codes are returned
+            exit_code = app(args, prog_name="mac-utils", standalone_mode=False)
+        except Exception as e:
+            raise RuntimeError(f"mac-utils {' '.join(args)} failed: {e!r}") from e
+        seconds = time.perf_counter() - started
+
+        if isinstance(exit_code, int) and exit_code != 0:
+            raise RuntimeError(f"mac-utils {' '.join(args)} exited with {exit_code}")
+        return RunReport(
+            args=args,
+            items=len(self.library_files()) - files_before,
+            bytes=self._server.bytes_sent - bytes_before,
+            seconds=seconds,
+            stages=self.timings.mean(),
+        )
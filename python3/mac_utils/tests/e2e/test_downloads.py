@@ -0,0 +1,108 @@
+import logging
+import unittest
+
+from mutagen.id3 import ID3
+
+from mac_utils import history_manager, jobs
+from mac_utils.tests.e2e.harness import OfflineEnvironment, ffmpeg_available
+
+log = logging.getLogger(__name__)
+
+requires_ffmpeg = unittest.skipUnless(ffmpeg_available(), "MP3 downloads need ffmpeg")
+
+
+class E2ETestCase(unittest.TestCase):
+    def setUp(self):
+        self.env = OfflineEnvironment(audio_seconds=1, video_size=256 * 1024)
+        self.env.__enter__()
+        self.addCleanup(self.env.__exit__, None, None, None)
+
+
+class TestDlVideo(E2ETestCase):
+    def test_download_and_move(self):
+        url = self.env.add_video("Test Video")
+
+        report = self.env.run(["dl-video", url])
+
+        self.assertEqual(report.items, 1)
+        video = self.env.downloads_dir / "Test Video.mp4"
+        served = self.env.media_dir / self.env.catalog[url[-11:]].file_name
+        self.assertEqual(video.read_bytes(), served.read_bytes())
+        self.assertGreaterEqual(report.bytes, served.stat().st_size)
+        self.assertTrue(history_manager.is_downloaded(url))
+        for stage in ("download", "postprocess", "history", "move"):
+            self.assertIn(stage, report.stages)
+
+    def test_partial_download_is_resumed(self):
+        url = self.env.add_video("Test Video")
+        served = self.env.media_dir / self.env.catalog[url[-11:]].file_name
+        size = served.stat().st_size
+        # An earlier run from another directory was interrupted halfway
+        other_dir = self.env.home / "elsewhere"
+        other_dir.mkdir()
+        part = other_dir / "Test Video.mp4.part"
+        part.write_bytes(served.read_bytes()[: size // 2])
+        with jobs.journal.track(url, "video", other_dir):
+            jobs.journal.progress_hook(
+                {
+                    "status": "downloading",
+                    "filename": str(other_dir / "Test Video.mp4"),
+                    "tmpfilename": str(part),
+                    "downloaded_bytes": size // 2,
+                    "total_bytes": size,
+                }
+            )
+
+        report = self.env.run(["dl-video", url])
+
+        self.assertEqual(report.items, 1)
+        self.assertEqual(
+            (self.env.downloads_dir / "Test Video.mp4").read_bytes(), served.read_bytes()
+        )
+        self.assertEqual(report.bytes, size - size // 2)
+        self.assertFalse(part.exists())
+        self.assertEqual(jobs.journal.jobs(), {})
+
+    def test_second_run_is_skipped(self):
+        url = self.env.add_video("Test Video")
+        self.env.run(["dl-video", url])
+
+        report = self.env.run(["dl-video", url])
+
+        self.assertEqual(report.items, 0)
+        self.assertEqual(report.bytes, 0)
+
+
+@requires_ffmpeg
+class TestDlSong(E2ETestCase):
+    def test_download_transcode_tag_and_move(self):
+        url = self.env.add_song("Test Song")
+
+        report = self.env.run(["dl-song", url])
+
+        self.assertEqual(report.items, 1)
+        song = self.env.music_dir / "Test Song.mp3"
+        tags = ID3(song)
+        self.assertEqual(str(tags["TIT2"]), "Test Song")
+        self.assertEqual(str(tags["TPE1"]), "Fake Artist")
+        self.assertTrue(tags.getall("APIC"))
+        # Nothing is left behind in the working directory
+        self.assertEqual(list(self.env.work_dir.iterdir()), [])
+        for stage in ("download", "postprocess", "tag", "history", "move"):
+            self.assertIn(stage, report.stages)
+
+
+@requires_ffmpeg
+class TestDlScUserLikes(E2ETestCase):
+    def test_download_likes(self):
+        urls = self.env.add_likes("fake-user", 3)
+        self.env.add_song("Not liked", user="someone-else")
+
+        report = self.env.run(["dl-sc-user-likes", "fake-user"])
+
+        self.assertEqual(report.items, 3)
+        self.assertTrue(all(history_manager.is_downloaded(url) for url in urls))
+
+
+if __name__ == "__main__":
+    unittest.main()
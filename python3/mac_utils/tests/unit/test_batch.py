@@ -0,0 +1,150 @@
+import io
+import logging
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import ANY, call, patch
+
+from mac_utils import batch
+
+log = logging.getLogger(__name__)
+
+
+class TestReadUrls(unittest.TestCase):
+    def test_read_urls_from_file(self):
+        """Test that blank lines, comments and duplicates are skipped"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            url_file = Path(temp_dir) / "urls.txt"
+            url_file.write_text(
+                "# nightly sync\n"
+                "https://soundcloud.com/artist/one\n"
+                "\n"
+                "  https://soundcloud.com/artist/two  \n"
+                "https://soundcloud.com/artist/one\n"
+            )
+
+            urls = batch.read_urls(str(url_file))
+
+        self.assertEqual(
+            urls, ["https://soundcloud.com/artist/one", "https://soundcloud.com/artist/two"]
+        )
+
+    def test_read_urls_drops_other_links_to_the_same_video(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            url_file = Path(temp_dir) / "urls.txt"
+            url_file.write_text(
+                "https://youtu.be/dQw4w9WgXcQ\n"
+                "https://www.youtube.com/watch?v=dQw4w9WgXcQ&si=tracking\n"
+                "https://www.youtube.com/watch?v=9bZkp7q19f0\n"
+            )
+
+            urls = batch.read_urls(str(url_file))
+
+        self.assertEqual(
+            urls, ["https://youtu.be/dQw4w9WgXcQ", "https://www.youtube.com/watch?v=9bZkp7q19f0"]
+        )
+
+    @patch("sys.stdin", io.StringIO("https://soundcloud.com/artist/one\n"))
+    def test_read_urls_from_stdin(self):
+        self.assertEqual(batch.read_urls("-"), ["https://soundcloud.com/artist/one"])
+
+    def test_read_urls_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            batch.read_urls("/invalid/path/urls.txt")
+
+
+class TestDownloadBatch(unittest.TestCase):
+    def setUp(self):
+        self.jobs = [(f"https://soundcloud.com/artist/{i}", "SoundCloud") for i in range(3)]
+
+    @patch("mac_utils.batch.move_mp3_files_to_music_folder")
+    @patch("mac_utils.batch.yt_dlp_download")
+    def test_downloads_run_concurrently(self, mock_yt_dlp_download, mock_move_files):
+        """Test that all workers download at the same time"""
+        # Every download waits for the others; a serial run would time out here
+        barrier = threading.Barrier(len(self.jobs), timeout=5)
+
+        def download(url, *args, **kwargs):
+            barrier.wait()
+            return [Path(f"{url.rsplit('/', 1)[-1]}.mp3")]
+
+        mock_yt_dlp_download.side_effect = download
+
+        failures = batch.download_batch(self.jobs, "mp3", workers=len(self.jobs))
+
+        self.assertEqual(failures, {})
+        # All workers share one downloader session
+        sessions = {c.kwargs["session"] for c in mock_yt_dlp_download.call_args_list}
+        self.assertEqual(len(sessions), 1)
+        mock_yt_dlp_download.assert_has_calls(
+            [
+                call(
+                    url,
+                    "SoundCloud",
+                    "mp3",
+                    dry_run=False,
+                    output_dir=None,
+                    force=False,
+                    session=ANY,
+                )
+                for url, _ in self.jobs
+            ],
+            any_order=True,
+        )
+        # The files reported by the downloads are moved, without rescanning the directory
+        mock_move_files.assert_called_once()
+        self.assertEqual(
+            sorted(mock_move_files.call_args.kwargs["files"]),
+            [Path("0.mp3"), Path("1.mp3"), Path("2.mp3")],
+        )
+
+    @patch("mac_utils.batch.move_mp3_files_to_music_folder")
+    @patch("mac_utils.batch.yt_dlp_download")
+    def test_failures_are_collected(self, mock_yt_dlp_download, mock_move_files):
+        """Test that one failed download doesn't stop the rest of the batch"""
+        failed_url = self.jobs[1][0]
+
+        def download(url, *args, **kwargs):
+            if url == failed_url:
+                raise Exception("Download failed")
+            return [Path("track.mp3")]
+
+        mock_yt_dlp_download.side_effect = download
+
+        failures = batch.download_batch(self.jobs, "mp3", workers=2)
+
+        self.assertEqual(list(failures), [failed_url])
+        self.assertEqual(mock_yt_dlp_download.call_count, len(self.jobs))
+        mock_move_files.assert_called_once()
+
+    @patch("mac_utils.batch.move_video_files_to_downloads")
+    @patch("mac_utils.batch.move_mp3_files_to_music_folder")
+    @patch("mac_utils.batch.yt_dlp_download")
+    def test_dry_run_moves_nothing(self, mock_yt_dlp_download, mock_move_mp3, mock_move_video):
+        mock_yt_dlp_download.return_value = []
+        batch.download_batch(self.jobs, "video", dry_run=True)
+
+        self.assertEqual(mock_yt_dlp_download.call_count, len(self.jobs))
+        mock_move_mp3.assert_not_called()
+        mock_move_video.assert_not_called()
+
+    @patch("mac_utils.batch.move_video_files_to_downloads")
+    @patch("mac_utils.batch.move_mp3_files_to_music_folder")
+    @patch("mac_utils.batch.yt_dlp_download")
+    def test_output_dir_downloads_are_left_there(
+        self, mock_yt_dlp_download, mock_move_mp3, mock_move_video
+    ):
+        mock_yt_dlp_download.return_value = [Path("track.mp3")]
+        batch.download_batch(self.jobs, "mp3", output_dir="out")
+
+        mock_move_mp3.assert_not_called()
+        mock_move_video.assert_not_called()
+
+    def test_invalid_worker_count(self):
+        with self.assertRaises(ValueError):
+            batch.download_batch(self.jobs, "mp3", workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from mac_utils.tests.benchmarks import __main__ as suite
+from mac_utils.tests.benchmarks import harness
+
+log = logging.getLogger(__name__)
+
+
+class TestHarness(unittest.TestCase):
+    def test_results_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "results" / "results.json"
+            harness.save_results({"urls.canonical_key": 4e-6}, path)
+
+            self.assertEqual(harness.load_results(path), {"urls.canonical_key": 4e-6})
+            self.assertIsNone(harness.load_results(Path(temp_dir) / "missing.json"))
+
+    def test_find_regressions(self):
+        baseline = {"fast": 1.0, "slow": 1.0, "removed": 1.0}
+        results = {"fast": 1.2, "slow": 1.5, "added": 9.0}
+
+        self.assertEqual(harness.find_regressions(results, baseline, 0.25), {"slow": (1.0, 1.5)})
+
+
+class TestSuite(unittest.TestCase):
+    def test_regression_fails_the_run(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results_file = Path(temp_dir) / "results.json"
+            baseline_file = Path(temp_dir) / "baseline.json"
+            args = ["--quick", "--only", "progress", "--output", str(results_file)]
+            args += ["--baseline", str(baseline_file)]
+
+            self.assertEqual(suite.main(args + ["--save-baseline"]), 0)
+            self.assertIn("progress.hook", harness.load_results(baseline_file))
+
+            # Pretend the baseline was much faster
+            harness.save_results({"progress.hook": 1e-12}, baseline_file)
+            self.assertEqual(suite.main(args), 1)
+            self.assertTrue(results_file.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
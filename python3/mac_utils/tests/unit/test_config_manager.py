@@ -0,0 +1,161 @@
+import logging
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import yaml
+
+from mac_utils import config_manager
+
+log = logging.getLogger(__name__)
+
+
+class ConfigTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_dir = Path(self.temp_dir.name)
+        self.config_file = self.config_dir / "config.yaml"
+        for name, value in (
+            ("DEFAULT_CONFIG_DIR", self.config_dir),
+            ("DEFAULT_CONFIG_FILE", self.config_file),
+            ("config_store", config_manager.ConfigStore()),
+        ):
+            patcher = patch(f"mac_utils.config_manager.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write_config(self, values: dict) -> None:
+        """Write the config file and make sure its mtime differs from the cached one"""
+        self.config_file.write_text(yaml.safe_dump(values))
+        stat = self.config_file.stat()
+        os.utime(self.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        config_manager.config_store.invalidate()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestLoadConfig(ConfigTestCase):
+    def test_defaults_without_file(self):
+        self.assertEqual(config_manager.get_config(), config_manager.Config())
+        self.assertEqual(config_manager.load_config(), config_manager.DEFAULT_CONFIG)
+
+    def test_parsed_once(self):
+        self.write_config({"retry_count": 5})
+
+        with patch("mac_utils.config_manager.yaml.safe_load", wraps=yaml.safe_load) as mock_load:
+            for _ in range(10):
+                self.assertEqual(config_manager.get_config_value("retry_count"), 5)
+                config_manager.load_config()
+
+        mock_load.assert_called_once()
+
+    def test_changed_file_is_reloaded(self):
+        self.write_config({"retry_count": 5})
+        self.assertEqual(config_manager.get_config().retry_count, 5)
+
+        self.write_config({"retry_count": 7})
+
+        self.assertEqual(config_manager.get_config().retry_count, 7)
+
+    def test_file_is_rechecked_after_interval(self):
+        self.write_config({"retry_count": 5})
+        self.assertEqual(config_manager.get_config().retry_count, 5)
+        self.config_file.write_text(yaml.safe_dump({"retry_count": 7}))
+        stat = self.config_file.stat()
+        os.utime(self.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        # Within the interval the cached value is used without checking the file
+        self.assertEqual(config_manager.get_config().retry_count, 5)
+        with patch("mac_utils.config_manager.CONFIG_RECHECK_INTERVAL", 0):
+            self.assertEqual(config_manager.get_config().retry_count, 7)
+
+    def test_invalid_values_fall_back_to_defaults(self):
+        self.write_config({"retry_count": "many", "batch_workers": 0, "show_progress": "no"})
+
+        with self.assertLogs("mac_utils.config_manager", level="WARNING") as logs:
+            config = config_manager.get_config()
+
+        self.assertEqual(config.retry_count, 3)
+        self.assertEqual(config.batch_workers, 4)
+        self.assertFalse(config.show_progress)
+        self.assertEqual(len(logs.records), 2)
+
+    def test_unknown_keys_are_kept(self):
+        self.write_config({"custom": "value"})
+
+        self.assertEqual(config_manager.get_config_value("custom"), "value")
+        self.assertEqual(config_manager.get_config_value("missing", "default"), "default")
+
+    def test_unreadable_file(self):
+        self.config_file.write_text("- not\n- a mapping\n")
+
+        with self.assertLogs("mac_utils.config_manager", level="WARNING"):
+            self.assertEqual(config_manager.get_config(), config_manager.Config())
+
+
+class TestSetConfigValue(ConfigTestCase):
+    def test_set_value(self):
+        config_manager.set_config_value("retry_count", "5")
+        config_manager.set_config_value("output_dir", "/tmp/downloads")
+
+        self.assertEqual(yaml.safe_load(self.config_file.read_text())["retry_count"], 5)
+        self.assertEqual(config_manager.get_config().output_dir, "/tmp/downloads")
+
+    def test_invalid_value(self):
+        with self.assertRaises(ValueError):
+            config_manager.set_config_value("show_progress", "maybe")
+        self.assertFalse(self.config_file.exists())
+
+
+class TestParseConfigValue(unittest.TestCase):
+    def test_conversions(self):
+        parse = config_manager.parse_config_value
+        self.assertEqual(parse("retry_delay", "0"), 0)
+        self.assertIs(parse("skip_duplicates", "Yes"), True)
+        self.assertIs(parse("show_progress", "off"), False)
+        self.assertIsNone(parse("output_dir", ""))
+        self.assertEqual(parse("custom", "value"), "value")
+
+    def test_invalid(self):
+        parse = config_manager.parse_config_value
+        for key, value in (
+            ("retry_count", "0"),
+            ("retry_count", "1.5"),
+            ("retry_count", True),
+            ("show_progress", "maybe"),
+            ("log_level", ""),
+        ):
+            with self.subTest(key=key, value=value), self.assertRaises(ValueError):
+                parse(key, value)
+
+
+class TestSubscribe(ConfigTestCase):
+    def test_listeners_are_notified_of_changes(self):
+        listener = MagicMock()
+        unsubscribe = config_manager.subscribe(listener)
+        config_manager.get_config()
+
+        config_manager.set_config_value("retry_count", 5)
+        config_manager.set_config_value("retry_count", 5)  # unchanged
+        self.write_config({"retry_count": 6})
+        config_manager.get_config()
+        unsubscribe()
+        config_manager.set_config_value("retry_count", 7)
+
+        changes = [(old.retry_count, new.retry_count) for (old, new), _ in listener.call_args_list]
+        self.assertEqual(changes, [(3, 5), (5, 6)])
+
+    def test_failing_listener(self):
+        config_manager.subscribe(MagicMock(side_effect=RuntimeError("boom")))
+
+        with self.assertLogs("mac_utils.config_manager", level="WARNING"):
+            config_manager.set_config_value("retry_count", 5)
+
+        self.assertEqual(config_manager.get_config().retry_count, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
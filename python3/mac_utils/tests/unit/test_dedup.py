@@ -0,0 +1,235 @@
+import logging
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from mac_utils import dedup, history_manager, urls, util
+from mac_utils.tests.unit.test_history_manager import HistoryTestCase
+from mac_utils.tests.unit.test_jobs import use_temp_journal
+
+log = logging.getLogger(__name__)
+
+SONG_INFO = {"id": "dQw4w9WgXcQ", "extractor_key": "Youtube", "title": "Test Song"}
+
+
+class DedupTestCase(HistoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.files_dir = tempfile.TemporaryDirectory()
+        self.files_path = Path(self.files_dir.name)
+
+    def make_file(self, name: str, data: bytes) -> Path:
+        file_path = self.files_path / name
+        file_path.write_bytes(data)
+        return file_path
+
+    def tearDown(self):
+        self.files_dir.cleanup()
+        super().tearDown()
+
+
+class TestGetMediaId(unittest.TestCase):
+    def test_full_and_flat_info(self):
+        self.assertEqual(dedup.get_media_id(SONG_INFO), "youtube:dQw4w9WgXcQ")
+        flat_entry = {"_type": "url", "ie_key": "Soundcloud", "id": "12345"}
+        self.assertEqual(dedup.get_media_id(flat_entry), "soundcloud:12345")
+        self.assertEqual(
+            dedup.get_media_id({"ie_key": "Vimeo", "id": "76979871"}), "vimeo:76979871"
+        )
+        self.assertIsNone(dedup.get_media_id({"title": "No ID"}))
+
+    def test_soundcloud_ids_match_url_keys(self):
+        """Test that a track has the same key in the media index, history and journal"""
+        url = "https://soundcloud.com/Artist/Track?si=123"
+        full_info = {
+            "id": "1588847423",
+            "extractor_key": "Soundcloud",
+            "webpage_url": "https://soundcloud.com/artist/track",
+        }
+        flat_entry = {"_type": "url", "ie_key": "Soundcloud", "id": "1588847423", "url": url}
+        self.assertEqual(dedup.get_media_id(full_info), urls.canonical_key(url))
+        self.assertEqual(dedup.get_media_id(flat_entry), urls.canonical_key(url))
+
+
+class TestContentHash(DedupTestCase):
+    def test_same_content_same_hash(self):
+        data = os.urandom(5000)
+        one = self.make_file("one.mp4", data)
+        two = self.make_file("two.mp4", data)
+        other = self.make_file("other.mp4", os.urandom(5000))
+
+        self.assertEqual(dedup.content_hash(one), dedup.content_hash(two))
+        self.assertNotEqual(dedup.content_hash(one), dedup.content_hash(other))
+
+    def test_large_files_are_sampled(self):
+        """Test that only the start, middle and end of a large file are read"""
+        data = bytearray(os.urandom(100_000))
+        one = self.make_file("one.mp4", bytes(data))
+        # A change outside the sampled chunks doesn't change the hash...
+        data[20_000] ^= 0xFF
+        two = self.make_file("two.mp4", bytes(data))
+        # ...a change inside them does
+        data[50_000] ^= 0xFF
+        three = self.make_file("three.mp4", bytes(data))
+
+        hashes = [dedup.content_hash(path, chunk_size=1000) for path in (one, two, three)]
+
+        self.assertEqual(hashes[0], hashes[1])
+        self.assertNotEqual(hashes[0], hashes[2])
+
+    def test_id3_tags_are_ignored(self):
+        """Test that re-tagging an MP3 does not change its content hash"""
+        audio = b"\xff\xfb\x90\x64" + os.urandom(4000)
+        untagged = self.make_file("untagged.mp3", audio)
+        util.tag_mp3_file(self.make_file("tagged.mp3", audio), SONG_INFO)
+        tagged = self.files_path / "tagged.mp3"
+
+        self.assertNotEqual(tagged.read_bytes(), audio)
+        self.assertEqual(dedup.content_hash(tagged), dedup.content_hash(untagged))
+
+
+class TestMediaIndex(DedupTestCase):
+    def test_record_and_find_media(self):
+        song = self.make_file("song.mp3", b"audio")
+
+        dedup.record_downloads([(song, SONG_INFO)], "https://youtu.be/dQw4w9WgXcQ")
+
+        record = dedup.find_media("youtube:dQw4w9WgXcQ")
+        self.assertEqual(record["url"], "https://youtu.be/dQw4w9WgXcQ")
+        self.assertEqual(record["file_path"], str(song))
+        self.assertEqual(record["content_hash"], dedup.content_hash(song))
+        self.assertIsNone(dedup.find_media("youtube:other"))
+
+    def test_drop_duplicate_files(self):
+        library_song = self.make_file("library.mp3", b"same audio")
+        dedup.record_downloads([(library_song, SONG_INFO)], "https://youtu.be/dQw4w9WgXcQ")
+        duplicate = self.make_file("repost.mp3", b"same audio")
+        new_song = self.make_file("new.mp3", b"other audio")
+
+        unique = dedup.drop_duplicate_files([duplicate, new_song, library_song])
+
+        self.assertEqual(unique, [new_song, library_song])
+        self.assertFalse(duplicate.exists())
+        self.assertTrue(library_song.exists())
+
+    def test_missing_library_file_is_not_a_duplicate(self):
+        library_song = self.make_file("library.mp3", b"same audio")
+        dedup.record_downloads([(library_song, SONG_INFO)], "https://youtu.be/dQw4w9WgXcQ")
+        library_song.unlink()
+        download = self.make_file("download.mp3", b"same audio")
+
+        self.assertEqual(dedup.drop_duplicate_files([download]), [download])
+
+    def test_deleted_files_are_not_found(self):
+        """Test that media removed from the library can be downloaded again"""
+        song = self.make_file("song.mp3", b"audio")
+        dedup.record_downloads([(song, SONG_INFO)], "https://youtu.be/dQw4w9WgXcQ")
+        song.unlink()
+
+        self.assertIsNone(dedup.find_media("youtube:dQw4w9WgXcQ"))
+
+    def test_clear_history_clears_media(self):
+        song = self.make_file("song.mp3", b"audio")
+        dedup.record_downloads([(song, SONG_INFO)], "https://youtu.be/dQw4w9WgXcQ")
+
+        history_manager.clear_history()
+
+        self.assertIsNone(dedup.find_media("youtube:dQw4w9WgXcQ"))
+        self.assertIsNone(dedup.find_duplicate_file(self.make_file("copy.mp3", b"audio")))
+
+    def test_update_file_paths(self):
+        song = self.make_file("song.mp3", b"audio")
+        dedup.record_downloads([(song, SONG_INFO)], "https://youtu.be/dQw4w9WgXcQ")
+        moved = self.files_path / "Music" / "song.mp3"
+        moved.parent.mkdir()
+        song.rename(moved)
+
+        dedup.update_file_paths([(song, moved)])
+
+        self.assertEqual(dedup.find_media("youtube:dQw4w9WgXcQ")["file_path"], str(moved))
+
+
+@patch("mac_utils.util.get_config_value", side_effect=lambda key, default: default)
+class TestMoveDuplicates(DedupTestCase):
+    def setUp(self):
+        super().setUp()
+        library_song = self.make_file("library.mp3", b"same audio")
+        dedup.record_downloads([(library_song, SONG_INFO)], "https://youtu.be/dQw4w9WgXcQ")
+        self.download = self.make_file("download.mp3", b"same audio")
+        self.music_folder = self.files_path / "Music"
+        self.music_folder.mkdir()
+
+    def test_duplicate_is_not_moved(self, mock_config):
+        util.move_mp3_files_to_music_folder(str(self.music_folder), files=[self.download])
+
+        self.assertEqual(list(self.music_folder.iterdir()), [])
+        self.assertFalse(self.download.exists())
+
+    def test_forced_download_is_moved(self, mock_config):
+        """Test that a song downloaded again with --force reaches the library"""
+        util.move_mp3_files_to_music_folder(
+            str(self.music_folder), files=[self.download], force=True
+        )
+
+        self.assertEqual(list(self.music_folder.iterdir()), [self.music_folder / "download.mp3"])
+
+
+class TestDuplicateFilter(DedupTestCase):
+    def setUp(self):
+        super().setUp()
+        use_temp_journal(self)
+
+    def test_filter(self):
+        duplicate_filter = dedup.DuplicateFilter()
+        dedup.record_downloads(
+            [(self.make_file("song.mp3", b"audio"), SONG_INFO)], "https://youtu.be/dQw4w9WgXcQ"
+        )
+
+        # Disabled until a download starts
+        self.assertIsNone(duplicate_filter(SONG_INFO))
+
+        duplicate_filter.reset()
+        self.assertIsNone(duplicate_filter({**SONG_INFO, "id": "new"}))
+        self.assertIn("already in the library", duplicate_filter(SONG_INFO, incomplete=True))
+        self.assertEqual(len(duplicate_filter.skipped), 1)
+        # The complete info of the same item doesn't count it twice
+        self.assertIsNotNone(duplicate_filter({**SONG_INFO, "duration": 212}))
+        self.assertEqual(len(duplicate_filter.skipped), 1)
+
+        duplicate_filter.reset(enabled=False)
+        self.assertIsNone(duplicate_filter(SONG_INFO))
+        self.assertEqual(duplicate_filter.skipped, [])
+
+    @patch("mac_utils.util.get_config_value", side_effect=lambda key, default: default)
+    @patch("mac_utils.util.get_yt_dl_options")
+    @patch("yt_dlp.YoutubeDL")
+    def test_download_skips_known_media(self, mock_YoutubeDL, mock_get_options, mock_config):
+        """Test that a download of known media from a new URL is skipped"""
+        dedup.record_downloads(
+            [(self.make_file("song.mp3", b"audio"), SONG_INFO)], "https://youtu.be/dQw4w9WgXcQ"
+        )
+        mock_get_options.return_value = {"outtmpl": "%(title)s.%(ext)s"}
+        ydl_instance = MagicMock()
+        mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
+
+        def extract_info(url, download):
+            # yt-dlp asks the match filter before downloading
+            match_filter = mock_YoutubeDL.call_args.args[0]["match_filter"]
+            self.assertIsNotNone(match_filter(SONG_INFO))
+            return SONG_INFO
+
+        ydl_instance.extract_info.side_effect = extract_info
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123"
+
+        files = util.yt_dlp_download(url, "YouTube", "mp3")
+
+        self.assertEqual(files, [])
+        # The new URL is added to history, pointing at the existing file
+        record = history_manager.get_download_info(url)
+        self.assertEqual(record["file_path"], str(self.files_path / "song.mp3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
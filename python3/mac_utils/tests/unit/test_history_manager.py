@@ -0,0 +1,233 @@
+import json
+import logging
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+from pathlib import Path
+from unittest.mock import patch
+
+from mac_utils import history_manager
+
+log = logging.getLogger(__name__)
+
+
+class HistoryTestCase(unittest.TestCase):
+    """Point the history store at a temporary directory"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.history_dir = Path(self.temp_dir.name)
+        self.patchers = [
+            patch.object(history_manager, "DEFAULT_HISTORY_DIR", self.history_dir),
+            patch.object(history_manager, "DEFAULT_HISTORY_FILE", self.history_dir / "history.db"),
+            patch.object(history_manager, "LEGACY_HISTORY_FILE", self.history_dir / "history.json"),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        history_manager.history_index.invalidate()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.temp_dir.cleanup()
+
+
+class TestAddToHistory(HistoryTestCase):
+    def test_add_and_lookup(self):
+        """Test that added downloads can be looked up by URL"""
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        history_manager.add_to_history(url, "Test Song", "mp3", "Test Song.mp3")
+
+        self.assertTrue(history_manager.is_downloaded(url))
+        info = history_manager.get_download_info(url)
+        self.assertEqual(info["title"], "Test Song")
+        self.assertEqual(info["media_type"], "mp3")
+        self.assertEqual(info["file_path"], "Test Song.mp3")
+        self.assertIn("timestamp", info)
+
+    def test_unknown_url(self):
+        """Test that unknown URLs are not reported as downloaded"""
+        self.assertFalse(history_manager.is_downloaded("https://soundcloud.com/artist/track"))
+        self.assertIsNone(history_manager.get_download_info("https://soundcloud.com/a/b"))
+
+    def test_load_history_keeps_insertion_order(self):
+        """Test that history is returned oldest first"""
+        for i in range(3):
+            history_manager.add_to_history(f"https://soundcloud.com/a/{i}", f"Track {i}", "mp3")
+
+        history = history_manager.load_history()
+        self.assertEqual([record["title"] for record in history], ["Track 0", "Track 1", "Track 2"])
+
+    def test_clear_history(self):
+        """Test that clearing history removes all records"""
+        url = "https://soundcloud.com/artist/track"
+        history_manager.add_to_history(url, "Track", "mp3")
+
+        history_manager.clear_history()
+
+        self.assertEqual(history_manager.load_history(), [])
+        self.assertFalse(history_manager.is_downloaded(url))
+
+
+class TestMigrateLegacyHistory(HistoryTestCase):
+    def test_legacy_json_is_migrated_once(self):
+        """Test that the legacy JSON history is imported and renamed"""
+        legacy_records = [
+            {
+                "url": "https://soundcloud.com/artist/track",
+                "title": "Track",
+                "media_type": "mp3",
+                "file_path": None,
+                "timestamp": "2024-01-01T00:00:00",
+            }
+        ]
+        legacy_file = self.history_dir / "history.json"
+        legacy_file.write_text(json.dumps(legacy_records))
+
+        self.assertEqual(history_manager.load_history(), legacy_records)
+        self.assertFalse(legacy_file.exists())
+        self.assertTrue((self.history_dir / "history.json.migrated").exists())
+
+        # A second load must not duplicate the migrated records
+        self.assertEqual(len(history_manager.load_history()), 1)
+
+    def test_corrupt_legacy_json_is_skipped(self):
+        """Test that an unreadable legacy file does not break the history store"""
+        legacy_file = self.history_dir / "history.json"
+        legacy_file.write_text("not json")
+
+        self.assertEqual(history_manager.load_history(), [])
+        self.assertTrue(legacy_file.exists())
+
+    def test_legacy_json_that_is_not_a_list_is_set_aside(self):
+        """Test that a legacy file with the wrong shape is renamed instead of failing"""
+        legacy_file = self.history_dir / "history.json"
+        legacy_file.write_text(json.dumps({"url": "https://soundcloud.com/artist/track"}))
+
+        self.assertEqual(history_manager.load_history(), [])
+        self.assertFalse(legacy_file.exists())
+        self.assertTrue((self.history_dir / "history.json.invalid").exists())
+        history_manager.add_to_history("https://soundcloud.com/artist/track", "Track", "mp3")
+        self.assertEqual(len(history_manager.load_history()), 1)
+
+    def test_only_inserted_records_are_counted(self):
+        """Test that records without a URL are neither migrated nor counted"""
+        legacy_file = self.history_dir / "history.json"
+        legacy_file.write_text(
+            json.dumps([{"url": "https://soundcloud.com/artist/track"}, {"title": "No URL"}, "x"])
+        )
+
+        with closing(sqlite3.connect(self.history_dir / "history.db")) as conn:
+            conn.executescript(history_manager._SCHEMA)
+            self.assertEqual(history_manager.migrate_legacy_history(conn), 1)
+
+    def test_file_migrated_by_another_process_is_skipped(self):
+        """Test that the file is re-checked once the write lock is held"""
+        legacy_file = self.history_dir / "history.json"
+        legacy_file.write_text(json.dumps([{"url": "https://soundcloud.com/artist/track"}]))
+
+        with closing(sqlite3.connect(self.history_dir / "history.db")) as conn:
+            conn.executescript(history_manager._SCHEMA)
+            # The other process renames the file after the first check
+            with patch.object(Path, "exists", side_effect=[True, False]):
+                self.assertEqual(history_manager.migrate_legacy_history(conn), 0)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM downloads").fetchone()[0], 0)
+        self.assertTrue(legacy_file.exists())
+
+
+class TestHistoryIndex(HistoryTestCase):
+    def test_short_link_matches_history(self):
+        history_manager.add_to_history(
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "Test Song", "mp3"
+        )
+        self.assertTrue(history_manager.is_downloaded("https://youtu.be/dQw4w9WgXcQ?t=42"))
+
+    def test_lookups_share_one_load(self):
+        """Test that repeated lookups are answered from memory"""
+        history_manager.add_to_history("https://soundcloud.com/a/1", "Track 1", "mp3")
+        history_manager.history_index.invalidate()
+
+        with patch.object(
+            history_manager, "load_history", wraps=history_manager.load_history
+        ) as mock_load:
+            for _ in range(10):
+                self.assertTrue(history_manager.is_downloaded("https://soundcloud.com/a/1"))
+                self.assertIsNotNone(
+                    history_manager.get_download_info("https://soundcloud.com/a/1")
+                )
+            history_manager.add_to_history("https://soundcloud.com/a/2", "Track 2", "mp3")
+            self.assertTrue(history_manager.is_downloaded("https://www.soundcloud.com/a/2/"))
+
+        mock_load.assert_called_once()
+
+    def test_external_write_invalidates_index(self):
+        """Test that records written by another process are picked up"""
+        self.assertFalse(history_manager.is_downloaded("https://soundcloud.com/a/1"))
+
+        conn = sqlite3.connect(self.history_dir / "history.db")
+        with conn:
+            conn.execute(
+                "INSERT INTO downloads (url, title, media_type) VALUES (?, ?, ?)",
+                ("https://soundcloud.com/a/1", "Track 1", "mp3"),
+            )
+        conn.close()
+
+        self.assertTrue(history_manager.is_downloaded("https://soundcloud.com/a/1"))
+
+    def test_external_write_after_own_insert_is_not_absorbed(self):
+        """Test that a write racing this process's insert still reloads the index"""
+        self.assertFalse(history_manager.is_downloaded("https://soundcloud.com/a/1"))
+        file_stamp = history_manager.HistoryIndex.file_stamp
+        calls = []
+
+        def racing_file_stamp():
+            calls.append(None)
+            if len(calls) == 3:
+                # Another process writes between this process's commit and its stamp
+                with closing(sqlite3.connect(self.history_dir / "history.db")) as conn, conn:
+                    conn.execute(
+                        "INSERT INTO downloads (url, title, media_type) VALUES (?, ?, ?)",
+                        ("https://soundcloud.com/a/2", "Track 2", "mp3"),
+                    )
+            return file_stamp()
+
+        with patch.object(history_manager.HistoryIndex, "file_stamp", racing_file_stamp):
+            history_manager.add_to_history("https://soundcloud.com/a/1", "Track 1", "mp3")
+
+        self.assertTrue(history_manager.is_downloaded("https://soundcloud.com/a/1"))
+        self.assertTrue(history_manager.is_downloaded("https://soundcloud.com/a/2"))
+
+    def test_first_download_is_reported(self):
+        """Test that the earliest record is returned for repeated downloads"""
+        history_manager.add_to_history("https://soundcloud.com/a/1", "First", "mp3")
+        history_manager.add_to_history("https://soundcloud.com/a/1", "Second", "mp3")
+        history_manager.history_index.invalidate()
+
+        self.assertEqual(
+            history_manager.get_download_info("https://soundcloud.com/a/1")["title"], "First"
+        )
+
+
+class TestShowHistory(HistoryTestCase):
+    def test_show_history_most_recent_first(self):
+        """Test that show_history lists the newest records first and honours the limit"""
+        for i in range(3):
+            history_manager.add_to_history(f"https://soundcloud.com/a/{i}", f"Track {i}", "mp3")
+
+        with self.assertLogs("mac_utils.history_manager", level="INFO") as cm:
+            history_manager.show_history(limit=1)
+
+        output = "\n".join(cm.output)
+        self.assertIn("3 total downloads", output)
+        self.assertIn("Track 2", output)
+        self.assertNotIn("Track 0", output)
+
+    def test_show_empty_history(self):
+        with self.assertLogs("mac_utils.history_manager", level="INFO") as cm:
+            history_manager.show_history()
+        self.assertTrue(any("empty" in msg for msg in cm.output))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from mac_utils import jobs
+
+log = logging.getLogger(__name__)
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def use_temp_journal(test_case: unittest.TestCase) -> jobs.JobJournal:
+    """Point the shared job journal at a temporary file for the rest of a test
+
+    Tests that download through ``util.yt_dlp_download`` would otherwise read
+    ``~/.mac-utils/jobs.json``, and could delete stale partial files it lists.
+
+    Returns:
+        JobJournal: The journal now used by downloads
+    """
+    temp_dir = tempfile.TemporaryDirectory()
+    test_case.addCleanup(temp_dir.cleanup)
+    journal_file = Path(temp_dir.name) / "jobs.json"
+    journal = jobs.JobJournal(journal_file)
+    for patcher in (
+        patch.object(jobs, "DEFAULT_JOBS_FILE", journal_file),
+        patch.object(jobs, "journal", journal),
+    ):
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
+    return journal
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class JournalTestCase(unittest.TestCase):
+    """Journal in a temporary directory with a fake clock"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        self.work_dir = self.root / "work"
+        self.work_dir.mkdir()
+        self.journal_file = self.root / "state" / "jobs.json"
+        self.clock = FakeClock()
+        self.journal = self.new_journal()
+
+    def new_journal(self):
+        """A journal reading the same file, as in the next run of mac-utils"""
+        return jobs.JobJournal(self.journal_file, save_interval=5, clock=self.clock)
+
+    def downloading(self, name, downloaded, total=1000, work_dir=None):
+        filename = (work_dir or self.work_dir) / name
+        return {
+            "status": "downloading",
+            "filename": str(filename),
+            "tmpfilename": str(filename) + ".part",
+            "downloaded_bytes": downloaded,
+            "total_bytes": total,
+        }
+
+    def interrupted_download(self, name="video.mp4", downloaded=400, work_dir=None):
+        """Journal a download that stops halfway, leaving its .part file"""
+        work_dir = work_dir or self.work_dir
+        (work_dir / f"{name}.part").write_bytes(bytes(downloaded))
+        with self.assertRaises(ConnectionError):
+            with self.journal.track(URL, "video", work_dir):
+                self.journal.progress_hook(self.downloading(name, downloaded, work_dir=work_dir))
+                raise ConnectionError
+
+
+class TestProgressHook(JournalTestCase):
+    def test_offsets_are_saved_periodically(self):
+        (self.work_dir / "video.mp4.part").write_bytes(bytes(300))
+        with self.journal.track(URL, "video", self.work_dir):
+            self.journal.progress_hook(self.downloading("video.mp4", 100))
+            self.journal.progress_hook(self.downloading("video.mp4", 200))
+            saved = self.new_journal().jobs()
+            part = saved["youtube:dQw4w9WgXcQ"]["parts"][str(self.work_dir / "video.mp4")]
+            self.assertEqual(part["downloaded_bytes"], 100)
+
+            self.clock.now += 5
+            self.journal.progress_hook(self.downloading("video.mp4", 300))
+            saved = self.new_journal().jobs()
+            part = saved["youtube:dQw4w9WgXcQ"]["parts"][str(self.work_dir / "video.mp4")]
+            self.assertEqual(part["downloaded_bytes"], 300)
+            self.assertEqual(part["total_bytes"], 1000)
+
+    def test_completed_download_is_forgotten(self):
+        with self.journal.track(URL, "video", self.work_dir):
+            self.journal.progress_hook(self.downloading("video.mp4", 100))
+            self.journal.progress_hook(
+                {"status": "finished", "filename": str(self.work_dir / "video.mp4")}
+            )
+
+        self.assertEqual(self.new_journal().jobs(), {})
+
+    def test_hook_outside_a_job_is_ignored(self):
+        self.journal.progress_hook(self.downloading("video.mp4", 100))
+
+        self.assertEqual(self.journal.jobs(), {})
+        self.assertFalse(self.journal_file.exists())
+
+    def test_failed_download_is_kept(self):
+        self.interrupted_download()
+
+        job = self.new_journal().jobs()["youtube:dQw4w9WgXcQ"]
+        self.assertEqual(job["url"], URL)
+        self.assertEqual(job["work_dir"], str(self.work_dir.resolve()))
+
+    def test_finish(self):
+        self.interrupted_download()
+
+        self.journal.finish(URL)
+
+        self.assertEqual(self.new_journal().jobs(), {})
+
+
+class TestResume(JournalTestCase):
+    def test_partial_files_follow_the_download(self):
+        old_dir = self.root / "old"
+        old_dir.mkdir()
+        self.interrupted_download(work_dir=old_dir)
+        (old_dir / "video.mp4.ytdl").write_text("{}")
+        (old_dir / "video.mp4.part-Frag3").write_bytes(b"x")
+
+        journal = self.new_journal()
+        with journal.track(URL, "video", self.work_dir):
+            pass
+
+        self.assertEqual(list(old_dir.iterdir()), [])
+        work_dir = self.work_dir.resolve()
+        self.assertEqual(
+            sorted(path.name for path in work_dir.iterdir()),
+            ["video.mp4.part", "video.mp4.part-Frag3", "video.mp4.ytdl"],
+        )
+        part = journal.jobs()["youtube:dQw4w9WgXcQ"]["parts"][str(work_dir / "video.mp4")]
+        self.assertEqual(part["tmpfilename"], str(work_dir / "video.mp4.part"))
+
+    def test_existing_partial_file_is_not_overwritten(self):
+        old_dir = self.root / "old"
+        old_dir.mkdir()
+        self.interrupted_download(work_dir=old_dir)
+        (self.work_dir / "video.mp4.part").write_bytes(b"other")
+
+        with self.new_journal().track(URL, "video", self.work_dir):
+            pass
+
+        self.assertTrue((old_dir / "video.mp4.part").exists())
+        self.assertEqual((self.work_dir / "video.mp4.part").read_bytes(), b"other")
+
+
+class TestCleanStale(JournalTestCase):
+    def test_old_jobs_are_removed_with_their_files(self):
+        self.interrupted_download()
+
+        self.clock.now += jobs.STALE_JOB_AGE + 1
+        journal = self.new_journal()
+
+        self.assertEqual(journal.jobs(), {})
+        self.assertFalse((self.work_dir / "video.mp4.part").exists())
+        self.assertEqual(json.loads(self.journal_file.read_text())["jobs"], {})
+
+    def test_jobs_without_partial_files_are_dropped(self):
+        self.interrupted_download()
+        (self.work_dir / "video.mp4.part").unlink()
+
+        self.assertEqual(self.new_journal().jobs(), {})
+
+    def test_unreadable_journal_is_ignored(self):
+        self.journal_file.parent.mkdir()
+        self.journal_file.write_text("{not json")
+
+        self.assertEqual(self.new_journal().jobs(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
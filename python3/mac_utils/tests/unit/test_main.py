@@ -1,6 +1,19 @@
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
-from mac_utils.main import validate_url
+import typer
+
+from mac_utils.main import app, validate_url
+
+# Cumulative import time budget for the CLI entry point, in seconds
+STARTUP_BUDGET_SECONDS = 1.0
+HEAVY_MODULES = ["yt_dlp", "mutagen"]
+CLI_ENTRY_POINT = "from mac_utils.main import app; app(prog_name='mac-utils')"
 
 
 class TestValidateUrl(unittest.TestCase):
@@ -26,12 +39,18 @@ class TestValidateUrl(unittest.TestCase):
         self.assertEqual(media_company, "YouTube")
 
     def test_valid_youtube_short_url(self):
-        """Test YouTube short URL (youtu.be) - currently not supported by validation"""
+        """Test YouTube short URL (youtu.be)"""
         url = "https://youtu.be/dQw4w9WgXcQ"
         is_valid, media_company = validate_url(url)
-        # Note: youtu.be URLs are not currently validated by the simple pattern
-        self.assertFalse(is_valid)
-        self.assertIsNone(media_company)
+        self.assertTrue(is_valid)
+        self.assertEqual(media_company, "YouTube")
+
+    def test_valid_youtube_mobile_url(self):
+        """Test YouTube mobile URL (m.youtube.com)"""
+        url = "https://m.youtube.com/watch?v=dQw4w9WgXcQ"
+        is_valid, media_company = validate_url(url)
+        self.assertTrue(is_valid)
+        self.assertEqual(media_company, "YouTube")
 
     def test_valid_soundcloud_url(self):
         """Test valid SoundCloud URL"""
@@ -77,5 +96,75 @@ class TestValidateUrl(unittest.TestCase):
         self.assertEqual(media_company, "YouTube")
 
 
+class TestDlBatchWorkers(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.urls_file = Path(self.temp_dir.name) / "urls.txt"
+        self.urls_file.write_text("https://soundcloud.com/artist/track\n")
+
+    def run_batch(self, *args: str):
+        with patch("mac_utils.batch.download_batch", return_value=[]) as mock_download:
+            app(["dl-batch", str(self.urls_file), *args], standalone_mode=False)
+        return mock_download.call_args.kwargs["workers"]
+
+    def test_explicit_workers(self):
+        self.assertEqual(self.run_batch("--workers", "1"), 1)
+
+    def test_default_workers_from_config(self):
+        with patch("mac_utils.main.get_config_value", return_value=3):
+            self.assertEqual(self.run_batch(), 3)
+
+    def test_workers_below_one_are_rejected(self):
+        with self.assertRaises(typer.BadParameter):
+            self.run_batch("--workers", "0")
+
+
+class TestStartupTime(unittest.TestCase):
+    """Non-download commands must not import yt-dlp or mutagen"""
+
+    def setUp(self):
+        self.temp_home = tempfile.TemporaryDirectory()
+
+    def run_cli(self, *args: str) -> dict[str, int]:
+        """Run the CLI with `-X importtime` and return cumulative import times in microseconds"""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CLI_ENTRY_POINT, *args],
+            cwd=Path(__file__).parents[3],
+            env={**os.environ, "HOME": self.temp_home.name},
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        import_times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, module = line.split("|")
+            import_times[module.strip()] = int(cumulative)
+        return import_times
+
+    def assert_starts_quickly(self, *args: str):
+        import_times = self.run_cli(*args)
+
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, import_times, f"{module} imported by: {' '.join(args)}")
+        self.assertLess(import_times["mac_utils.main"] / 1_000_000, STARTUP_BUDGET_SECONDS)
+
+    def test_help(self):
+        self.assert_starts_quickly("--help")
+
+    def test_config_show(self):
+        self.assert_starts_quickly("config", "--show")
+
+    def test_history(self):
+        self.assert_starts_quickly("history")
+
+    def tearDown(self):
+        self.temp_home.cleanup()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,150 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from mac_utils import history_manager, metrics, timings, util
+from mac_utils.main import app
+from mac_utils.tests.unit.test_history_manager import HistoryTestCase
+
+log = logging.getLogger(__name__)
+
+
+class MetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+
+class TestCounters(MetricsTestCase):
+    def test_inc_by_labels(self):
+        metrics.inc("downloads", media_type="mp3")
+        metrics.inc("downloads", media_type="mp3")
+        metrics.inc("downloads", media_type="video")
+        metrics.inc("bytes_downloaded", 2048)
+
+        self.assertEqual(metrics.value("downloads", media_type="mp3"), 2)
+        self.assertEqual(metrics.value("downloads", media_type="video"), 1)
+        self.assertEqual(metrics.value("downloads"), 0)
+        self.assertEqual(metrics.value("bytes_downloaded"), 2048)
+
+    def test_progress_hook_counts_transferred_bytes(self):
+        for downloaded in (100, 400, 700):
+            metrics.progress_hook(
+                {"status": "downloading", "filename": "song.webm", "downloaded_bytes": downloaded}
+            )
+        metrics.progress_hook(
+            {"status": "finished", "filename": "song.webm", "downloaded_bytes": 1000}
+        )
+
+        self.assertEqual(metrics.value("bytes_downloaded"), 900)
+
+    def test_progress_hook_skips_earlier_runs(self):
+        """Test that resumed bytes and files already on disk aren't counted again"""
+        # Resumed at 600 of 1000 bytes
+        metrics.progress_hook(
+            {"status": "downloading", "filename": "video.mp4", "downloaded_bytes": 600}
+        )
+        metrics.progress_hook(
+            {"status": "finished", "filename": "video.mp4", "downloaded_bytes": 1000}
+        )
+        # Already downloaded
+        metrics.progress_hook({"status": "finished", "filename": "song.webm", "total_bytes": 500})
+
+        self.assertEqual(metrics.value("bytes_downloaded"), 400)
+
+    def test_unused_counters_are_zero(self):
+        samples = metrics.collect()
+
+        names = [name for name, _, _ in samples]
+        for name in metrics.COUNTERS:
+            self.assertIn((name, {}, 0), samples)
+        self.assertIn("last_run_timestamp_seconds", names)
+
+
+class TestFormats(MetricsTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.inc("skipped", reason="history")
+        metrics.inc("bytes_downloaded", 123456789)
+        self.stages = {
+            "tag": {"count": 2, "total": 0.5, "mean": 0.25, "max": 0.3},
+            "move": {"count": 1, "total": 0.1, "mean": 0.1, "max": 0.1},
+        }
+
+    def test_prometheus_families_are_grouped(self):
+        text = metrics.format_prometheus(metrics.collect(self.stages, wall_seconds=2.5))
+        lines = text.splitlines()
+
+        self.assertIn('mac_utils_skipped{reason="history"} 1', lines)
+        self.assertIn("mac_utils_bytes_downloaded 123456789", lines)
+        self.assertIn("mac_utils_run_duration_seconds 2.5", lines)
+        # Each family is listed once, with all of its samples right after its TYPE line
+        self.assertEqual(text.count("# TYPE mac_utils_stage_seconds gauge"), 1)
+        start = lines.index("# TYPE mac_utils_stage_seconds gauge")
+        self.assertEqual(
+            lines[start + 1 : start + 3],
+            [
+                'mac_utils_stage_seconds{stage="tag"} 0.5',
+                'mac_utils_stage_seconds{stage="move"} 0.1',
+            ],
+        )
+
+    def test_label_values_are_escaped(self):
+        text = metrics.format_prometheus([("skipped", {"reason": 'a "b"\n'}, 1)])
+
+        self.assertIn('mac_utils_skipped{reason="a \\"b\\"\\n"} 1', text)
+
+    def test_write_metrics_replaces_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            prom_file = Path(temp_dir) / "textfile" / "mac_utils.prom"
+            json_file = Path(temp_dir) / "metrics.json"
+
+            prom_file.parent.mkdir()
+            prom_file.write_text("stale\n")
+            metrics.write_metrics(prom_file, self.stages, 1.0)
+            metrics.write_metrics(json_file, self.stages, 1.0, command="dl-song")
+
+            self.assertNotIn("stale", prom_file.read_text())
+            self.assertIn("# TYPE mac_utils_downloads gauge", prom_file.read_text())
+            snapshot = json.loads(json_file.read_text())
+            self.assertEqual(snapshot["command"], "dl-song")
+            self.assertIn(
+                {"name": "skipped", "labels": {"reason": "history"}, "value": 1},
+                snapshot["metrics"],
+            )
+            # No temporary files are left next to the metrics
+            self.assertEqual([p.name for p in prom_file.parent.iterdir()], ["mac_utils.prom"])
+
+
+class TestDownloadMetrics(MetricsTestCase, HistoryTestCase):
+    def setUp(self):
+        HistoryTestCase.setUp(self)
+        MetricsTestCase.setUp(self)
+
+    def test_history_hits_are_counted(self):
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        history_manager.add_to_history(url, "Test Song", "mp3", "Test Song.mp3")
+
+        self.assertEqual(util.yt_dlp_download(url, "youtube", "mp3"), [])
+
+        self.assertEqual(metrics.value("skipped", reason="history"), 1)
+        self.assertEqual(metrics.value("downloads", media_type="mp3"), 0)
+
+    def test_metrics_file_option(self):
+        self.addCleanup(timings.reset)
+        self.addCleanup(timings.disable)
+        path = self.history_dir / "metrics.json"
+        metrics.inc("retries")
+
+        app(["--metrics-file", str(path), "history", "--show"], standalone_mode=False)
+
+        snapshot = json.loads(path.read_text())
+        self.assertEqual(snapshot["command"], "history")
+        # Counters start from zero for each run
+        self.assertIn({"name": "retries", "labels": {}, "value": 0}, snapshot["metrics"])
+
+
+if __name__ == "__main__":
+    unittest.main()
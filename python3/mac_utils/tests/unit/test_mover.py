@@ -0,0 +1,177 @@
+import logging
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from mac_utils import mover
+
+log = logging.getLogger(__name__)
+
+
+class MoverTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_dir = Path(self.temp_dir.name) / "source"
+        self.source_dir.mkdir()
+        self.dest_dir = Path(self.temp_dir.name) / "dest"
+        self.dest_dir.mkdir()
+
+    def make_file(self, name: str, data: bytes = b"data") -> Path:
+        file_path = self.source_dir / name
+        file_path.write_bytes(data)
+        return file_path
+
+    def root_entries(self):
+        """Names in the parent of the destination, where copies are staged"""
+        return sorted(path.name for path in Path(self.temp_dir.name).iterdir())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestMoveFile(MoverTestCase):
+    def test_same_device_rename(self):
+        source = self.make_file("song.mp3")
+        progress = []
+
+        dest = mover.move_file(source, self.dest_dir, progress=lambda *args: progress.append(args))
+
+        self.assertEqual(dest, self.dest_dir / "song.mp3")
+        self.assertEqual(dest.read_bytes(), b"data")
+        self.assertFalse(source.exists())
+        self.assertEqual(progress, [(source, 4, 4)])
+
+    @patch("mac_utils.mover.same_device", return_value=False)
+    def test_cross_device_copy(self, mock_same_device):
+        """Test that files on another filesystem are copied in chunks, synced and unlinked"""
+        data = os.urandom(10_000)
+        source = self.make_file("video.mp4", data)
+        os.utime(source, (1_000_000, 1_000_000))
+        progress = []
+
+        with patch("mac_utils.mover.os.fsync", wraps=os.fsync) as mock_fsync:
+            dest = mover.move_file(
+                source,
+                self.dest_dir,
+                chunk_size=4096,
+                progress=lambda *args: progress.append(args),
+            )
+
+        self.assertEqual(dest.read_bytes(), data)
+        self.assertFalse(source.exists())
+        mock_fsync.assert_called_once()
+        self.assertEqual([moved for _, moved, _ in progress], [4096, 8192, 10_000])
+        self.assertEqual(dest.stat().st_mtime, 1_000_000)
+        self.assertEqual(list(self.dest_dir.iterdir()), [dest])
+        self.assertEqual(self.root_entries(), ["dest", "source"])
+
+    @patch("mac_utils.mover.same_device", return_value=False)
+    def test_cross_device_copy_is_staged_outside_destination(self, mock_same_device):
+        """Test that a watched destination never sees a partial or empty file"""
+        source = self.make_file("song.mp3", os.urandom(10_000))
+        seen = []
+
+        mover.move_file(
+            source,
+            self.dest_dir,
+            chunk_size=4096,
+            progress=lambda *args: seen.append(list(self.dest_dir.iterdir())),
+        )
+
+        self.assertEqual(seen, [[], [], []])
+
+    @patch("mac_utils.mover.same_device", return_value=False)
+    def test_failed_copy_keeps_source(self, mock_same_device):
+        source = self.make_file("video.mp4")
+
+        with patch("mac_utils.mover.os.fsync", side_effect=OSError("No space left on device")):
+            with self.assertRaises(OSError):
+                mover.move_file(source, self.dest_dir)
+
+        self.assertTrue(source.exists())
+        self.assertEqual(list(self.dest_dir.iterdir()), [])
+        self.assertEqual(self.root_entries(), ["dest", "source"])
+
+    @patch("mac_utils.mover.same_device", return_value=False)
+    def test_source_that_cant_be_deleted_is_still_moved(self, mock_same_device):
+        source = self.make_file("video.mp4")
+        moved = []
+
+        with patch.object(Path, "unlink", side_effect=PermissionError("Permission denied")):
+            with self.assertLogs("mac_utils.mover", level="WARNING"):
+                result = mover.move_files(
+                    [source], self.dest_dir, on_moved=lambda *args: moved.append(args)
+                )
+
+        self.assertEqual(result, [self.dest_dir / "video.mp4"])
+        self.assertEqual(moved, [(source, self.dest_dir / "video.mp4")])
+        self.assertEqual((self.dest_dir / "video.mp4").read_bytes(), b"data")
+
+    def test_renamed_source_that_cant_be_deleted_is_still_moved(self):
+        source = self.make_file("song.mp3")
+
+        with patch("mac_utils.mover.os.unlink", side_effect=PermissionError("Permission denied")):
+            with self.assertLogs("mac_utils.mover", level="WARNING"):
+                dest = mover.move_file(source, self.dest_dir)
+
+        self.assertEqual(dest, self.dest_dir / "song.mp3")
+        self.assertEqual(dest.read_bytes(), b"data")
+
+    def test_collisions_are_renamed(self):
+        (self.dest_dir / "song.mp3").write_bytes(b"existing")
+        (self.dest_dir / "song (1).mp3").write_bytes(b"existing")
+
+        dest = mover.move_file(self.make_file("song.mp3"), self.dest_dir)
+
+        self.assertEqual(dest, self.dest_dir / "song (2).mp3")
+        self.assertEqual((self.dest_dir / "song.mp3").read_bytes(), b"existing")
+
+    @patch("mac_utils.mover.os.link", side_effect=PermissionError("Operation not permitted"))
+    def test_filesystem_without_hard_links(self, mock_link):
+        (self.dest_dir / "song.mp3").write_bytes(b"existing")
+
+        dest = mover.move_file(self.make_file("song.mp3"), self.dest_dir)
+
+        self.assertEqual(dest, self.dest_dir / "song (1).mp3")
+        self.assertEqual(dest.read_bytes(), b"data")
+        self.assertEqual((self.dest_dir / "song.mp3").read_bytes(), b"existing")
+
+
+class TestMoveFiles(MoverTestCase):
+    def test_parallel_move(self):
+        files = [self.make_file(f"song{i}.mp3") for i in range(8)]
+
+        moved = mover.move_files(files, self.dest_dir, workers=4)
+
+        self.assertEqual(moved, [self.dest_dir / f"song{i}.mp3" for i in range(8)])
+        self.assertEqual(list(self.source_dir.iterdir()), [])
+
+    def test_same_names_never_overwrite(self):
+        """Test that files with the same name moved at once all survive"""
+        files = []
+        for i in range(6):
+            folder = self.source_dir / str(i)
+            folder.mkdir()
+            (folder / "song.mp3").write_bytes(str(i).encode())
+            files.append(folder / "song.mp3")
+
+        moved = mover.move_files(files, self.dest_dir, workers=6)
+
+        self.assertEqual(len(set(moved)), 6)
+        contents = sorted(path.read_bytes() for path in self.dest_dir.iterdir())
+        self.assertEqual(contents, [str(i).encode() for i in range(6)])
+
+    def test_failures_are_logged_and_skipped(self):
+        files = [self.make_file("song.mp3"), self.source_dir / "missing.mp3"]
+
+        with self.assertLogs("mac_utils.mover", level="ERROR"):
+            moved = mover.move_files(files, self.dest_dir)
+
+        self.assertEqual(moved, [self.dest_dir / "song.mp3"])
+        self.assertFalse((self.dest_dir / "missing.mp3").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
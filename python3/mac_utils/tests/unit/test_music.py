@@ -1,8 +1,9 @@
 import logging
 import unittest
-from unittest.mock import patch
+from pathlib import Path
+from unittest.mock import MagicMock, call, patch
 
-from mac_utils import music
+from mac_utils import metrics, music
 
 log = logging.getLogger(__name__)
 
@@ -42,6 +43,15 @@ class TestDownloadMp3(unittest.TestCase):
         # Verify files were moved to Music folder
         mock_move_files.assert_called_once()
 
+    @patch("mac_utils.music.move_mp3_files_to_music_folder")
+    @patch("mac_utils.music.yt_dlp_download")
+    def test_download_mp3_output_dir(self, mock_yt_dlp_download, mock_move_files):
+        """Test that MP3s downloaded to a custom output directory are left there"""
+        music.download_mp3("https://soundcloud.com/artist/track", "SoundCloud", output_dir="out")
+
+        mock_yt_dlp_download.assert_called_once()
+        mock_move_files.assert_not_called()
+
     @patch("mac_utils.music.move_mp3_files_to_music_folder")
     @patch("mac_utils.music.yt_dlp_download")
     def test_download_mp3_download_fails(self, mock_yt_dlp_download, mock_move_files):
@@ -57,62 +67,197 @@ class TestDownloadMp3(unittest.TestCase):
         # Verify move was not called since download failed
         mock_move_files.assert_not_called()
 
+    @patch("mac_utils.music.move_mp3_files_to_music_folder")
+    @patch("mac_utils.music.yt_dlp_download")
+    def test_download_mp3_moves_downloaded_files(self, mock_yt_dlp_download, mock_move_files):
+        """Test that only the files reported by the download are moved"""
+        mock_yt_dlp_download.return_value = [Path("Test Song.mp3")]
+
+        music.download_mp3("https://soundcloud.com/artist/track", "SoundCloud")
+
+        mock_move_files.assert_called_once_with(files=[Path("Test Song.mp3")], force=False)
+
+    @patch("mac_utils.music.move_mp3_files_to_music_folder")
+    @patch("mac_utils.music.yt_dlp_download")
+    def test_forced_download_keeps_duplicates(self, mock_yt_dlp_download, mock_move_files):
+        """Test that --force also keeps a song whose audio is already in the library"""
+        mock_yt_dlp_download.return_value = [Path("Test Song.mp3")]
+
+        music.download_mp3("https://soundcloud.com/artist/track", "SoundCloud", force=True)
+
+        mock_move_files.assert_called_once_with(files=[Path("Test Song.mp3")], force=True)
+
+
+class TestIterPlaylistEntries(unittest.TestCase):
+    @patch("mac_utils.music.resolve_browser_cookies", return_value=None)
+    @patch("yt_dlp.YoutubeDL")
+    def test_entries_are_streamed(self, mock_YoutubeDL, mock_cookies):
+        """Test that entry URLs are yielded as the playlist is enumerated"""
+        enumerated = []
+
+        def entries():
+            for i in range(3):
+                enumerated.append(i)
+                yield {"_type": "url", "url": f"https://soundcloud.com/artist/{i}"}
+
+        ydl_instance = MagicMock()
+        ydl_instance.extract_info.return_value = {"_type": "playlist", "entries": entries()}
+        mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
+
+        entry_urls = music.iter_playlist_entries("https://soundcloud.com/user/likes")
+
+        self.assertEqual(next(entry_urls), "https://soundcloud.com/artist/0")
+        # Later entries are not fetched until they are needed
+        self.assertEqual(enumerated, [0])
+        self.assertEqual(
+            list(entry_urls), ["https://soundcloud.com/artist/1", "https://soundcloud.com/artist/2"]
+        )
+        ydl_instance.extract_info.assert_called_once_with(
+            "https://soundcloud.com/user/likes", download=False, process=False
+        )
+        self.assertEqual(mock_YoutubeDL.call_args.args[0]["extract_flat"], "in_playlist")
+
+    @patch("mac_utils.music.resolve_browser_cookies", return_value=None)
+    @patch("yt_dlp.YoutubeDL")
+    def test_single_video(self, mock_YoutubeDL, mock_cookies):
+        ydl_instance = MagicMock()
+        ydl_instance.extract_info.return_value = {"id": "xyz", "title": "Song"}
+        mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
+
+        url = "https://www.youtube.com/watch?v=xyz"
+        self.assertEqual(list(music.iter_playlist_entries(url)), [url])
+
+
+class TestDownloadPlaylist(unittest.TestCase):
+    def setUp(self):
+        self.entry_urls = [f"https://soundcloud.com/artist/{i}" for i in range(4)]
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    @patch("mac_utils.music.move_mp3_files_to_music_folder")
+    @patch("mac_utils.music.yt_dlp_download")
+    @patch("mac_utils.music.is_downloaded")
+    @patch("mac_utils.music.iter_playlist_entries")
+    def test_entries_downloaded_incrementally(
+        self, mock_iter_entries, mock_is_downloaded, mock_yt_dlp_download, mock_move_files
+    ):
+        """Test that new entries are downloaded and moved one at a time"""
+        mock_iter_entries.return_value = iter(self.entry_urls)
+        mock_is_downloaded.side_effect = lambda url: url.endswith(("/0", "/2"))
+        mock_yt_dlp_download.side_effect = lambda url, *args, **kwargs: [
+            Path(f"{url.rsplit('/', 1)[-1]}.mp3")
+        ]
+
+        music.download_playlist("https://soundcloud.com/user/likes", "SoundCloud")
+
+        downloaded = [c.args[0] for c in mock_yt_dlp_download.call_args_list]
+        self.assertEqual(downloaded, [self.entry_urls[1], self.entry_urls[3]])
+        # Every entry is downloaded with the same session
+        sessions = {c.kwargs["session"] for c in mock_yt_dlp_download.call_args_list}
+        self.assertEqual(len(sessions), 1)
+        mock_move_files.assert_has_calls(
+            [call(files=[Path("1.mp3")], force=False), call(files=[Path("3.mp3")], force=False)]
+        )
+        self.assertEqual(metrics.value("skipped", reason="history"), 2)
+
+    @patch("mac_utils.music.move_mp3_files_to_music_folder")
+    @patch("mac_utils.music.yt_dlp_download")
+    @patch("mac_utils.music.is_downloaded")
+    @patch("mac_utils.music.iter_playlist_entries")
+    def test_failed_entry_does_not_stop_playlist(
+        self, mock_iter_entries, mock_is_downloaded, mock_yt_dlp_download, mock_move_files
+    ):
+        mock_iter_entries.return_value = iter(self.entry_urls)
+        mock_is_downloaded.return_value = False
+        mock_yt_dlp_download.side_effect = [Exception("Video unavailable"), [], [], []]
+
+        with self.assertLogs("mac_utils.music", level="INFO") as cm:
+            music.download_playlist("https://soundcloud.com/user/likes", "SoundCloud")
+
+        self.assertEqual(mock_yt_dlp_download.call_count, len(self.entry_urls))
+        self.assertEqual(mock_move_files.call_count, len(self.entry_urls) - 1)
+        self.assertTrue(any("3 downloaded, 0 already in history, 1 failed" in m for m in cm.output))
+
+    @patch("mac_utils.music.move_mp3_files_to_music_folder")
+    @patch("mac_utils.music.yt_dlp_download")
+    @patch("mac_utils.music.is_downloaded")
+    @patch("mac_utils.music.iter_playlist_entries")
+    def test_output_dir_entries_are_not_moved(
+        self, mock_iter_entries, mock_is_downloaded, mock_yt_dlp_download, mock_move_files
+    ):
+        mock_iter_entries.return_value = iter(self.entry_urls)
+        mock_is_downloaded.return_value = False
+        mock_yt_dlp_download.return_value = [Path("song.mp3")]
+
+        music.download_playlist("https://soundcloud.com/user/likes", "SoundCloud", output_dir="out")
+
+        self.assertEqual(mock_yt_dlp_download.call_count, len(self.entry_urls))
+        mock_move_files.assert_not_called()
 
-class TestDownloadYoutubePlaylist(unittest.TestCase):
     @patch("mac_utils.music.move_mp3_files_to_music_folder")
     @patch("mac_utils.music.yt_dlp_download")
-    def test_download_youtube_playlist(self, mock_yt_dlp_download, mock_move_files):
+    @patch("mac_utils.music.is_downloaded")
+    @patch("mac_utils.music.iter_playlist_entries")
+    def test_force_ignores_history(
+        self, mock_iter_entries, mock_is_downloaded, mock_yt_dlp_download, mock_move_files
+    ):
+        mock_iter_entries.return_value = iter(self.entry_urls)
+        mock_yt_dlp_download.return_value = []
+
+        with self.assertLogs("mac_utils.music", level="INFO") as cm:
+            music.download_playlist(
+                "https://soundcloud.com/user/likes", "SoundCloud", dry_run=True, force=True
+            )
+
+        mock_is_downloaded.assert_not_called()
+        self.assertEqual(mock_yt_dlp_download.call_count, len(self.entry_urls))
+        mock_move_files.assert_not_called()
+        # Nothing was downloaded, so entries are reported as planned
+        self.assertTrue(any("4 would be downloaded" in m for m in cm.output))
+        self.assertFalse(any("4 downloaded" in m for m in cm.output))
+
+
+class TestDownloadYoutubePlaylist(unittest.TestCase):
+    @patch("mac_utils.music.download_playlist")
+    def test_download_youtube_playlist(self, mock_download_playlist):
         """Test downloading YouTube playlist"""
         url = "https://www.youtube.com/playlist?list=PLtest123"
 
         music.download_youtube_playlist(url)
 
-        # Verify yt_dlp_download was called with correct parameters
-        mock_yt_dlp_download.assert_called_once_with(
-            url, "YouTube", "mp3", dry_run=False, output_dir=None, force=False
+        # Verify the playlist is downloaded entry by entry
+        mock_download_playlist.assert_called_once_with(
+            url, "YouTube", dry_run=False, output_dir=None, force=False
         )
 
-        # Verify files were moved to Music folder
-        mock_move_files.assert_called_once()
-
 
 class TestDownloadSoundcloudUserLikes(unittest.TestCase):
-    @patch("mac_utils.music.move_mp3_files_to_music_folder")
-    @patch("mac_utils.music.yt_dlp_download")
-    def test_download_soundcloud_user_likes(self, mock_yt_dlp_download, mock_move_files):
+    @patch("mac_utils.music.download_playlist")
+    def test_download_soundcloud_user_likes(self, mock_download_playlist):
         """Test downloading SoundCloud user likes"""
         username = "test_user"
         expected_url = "https://soundcloud.com/test_user/likes"
 
         music.download_soundcloud_user_likes(username)
 
-        # Verify yt_dlp_download was called with correct URL
-        mock_yt_dlp_download.assert_called_once_with(
-            expected_url, "SoundCloud", "mp3", dry_run=False, output_dir=None, force=False
+        # Verify the likes playlist is downloaded with the correct URL
+        mock_download_playlist.assert_called_once_with(
+            expected_url, "SoundCloud", dry_run=False, output_dir=None, force=False
         )
 
-        # Verify files were moved to Music folder
-        mock_move_files.assert_called_once()
-
-    @patch("mac_utils.music.move_mp3_files_to_music_folder")
-    @patch("mac_utils.music.yt_dlp_download")
-    def test_download_soundcloud_user_likes_with_special_chars(
-        self, mock_yt_dlp_download, mock_move_files
-    ):
+    @patch("mac_utils.music.download_playlist")
+    def test_download_soundcloud_user_likes_with_special_chars(self, mock_download_playlist):
         """Test downloading SoundCloud user likes with special characters in username"""
         username = "test-user_123"
         expected_url = "https://soundcloud.com/test-user_123/likes"
 
         music.download_soundcloud_user_likes(username)
 
-        # Verify yt_dlp_download was called with correct URL
-        mock_yt_dlp_download.assert_called_once_with(
-            expected_url, "SoundCloud", "mp3", dry_run=False, output_dir=None, force=False
+        # Verify the likes playlist is downloaded with the correct URL
+        mock_download_playlist.assert_called_once_with(
+            expected_url, "SoundCloud", dry_run=False, output_dir=None, force=False
         )
 
-        # Verify files were moved to Music folder
-        mock_move_files.assert_called_once()
-
 
 if __name__ == "__main__":
     unittest.main()
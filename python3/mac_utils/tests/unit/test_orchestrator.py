@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import threading
+import time
+import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import ANY, patch
+
+from mac_utils import orchestrator
+
+log = logging.getLogger(__name__)
+
+
+class ConcurrencyTracker:
+    """Fake download that records how many downloads run at once per media company"""
+
+    def __init__(self, duration: float = 0.05):
+        self.duration = duration
+        self.lock = threading.Lock()
+        self.active: Counter = Counter()
+        self.peak: Counter = Counter()
+        self.peak_total = 0
+
+    def __call__(self, url, media_company, media_type, **kwargs):
+        with self.lock:
+            self.active[media_company] += 1
+            self.peak[media_company] = max(self.peak[media_company], self.active[media_company])
+            self.peak_total = max(self.peak_total, sum(self.active.values()))
+        time.sleep(self.duration)
+        with self.lock:
+            self.active[media_company] -= 1
+        return [Path(f"{url.rsplit('/', 1)[-1]}.mp3")]
+
+
+class TestDownloadOrchestrator(unittest.TestCase):
+    def setUp(self):
+        self.urls = [f"https://www.youtube.com/watch?v={i}" for i in range(6)] + [
+            f"https://soundcloud.com/artist/{i}" for i in range(6)
+        ]
+
+    @patch("mac_utils.batch.move_mp3_files_to_music_folder")
+    @patch("mac_utils.orchestrator.yt_dlp_download")
+    def test_per_host_limits(self, mock_yt_dlp_download, mock_move_files):
+        """Test that each media company stays within its own concurrency cap"""
+        tracker = ConcurrencyTracker()
+        mock_yt_dlp_download.side_effect = tracker
+        downloader = orchestrator.DownloadOrchestrator({"YouTube": 2, "SoundCloud": 3})
+
+        failures = asyncio.run(downloader.download_many(self.urls, "mp3"))
+        downloader.shutdown()
+
+        self.assertEqual(failures, {})
+        self.assertEqual(mock_yt_dlp_download.call_count, len(self.urls))
+        self.assertEqual(tracker.peak["YouTube"], 2)
+        self.assertEqual(tracker.peak["SoundCloud"], 3)
+        # Different hosts download at the same time
+        self.assertGreater(tracker.peak_total, 3)
+        mock_move_files.assert_called_once()
+        self.assertEqual(len(mock_move_files.call_args.kwargs["files"]), len(self.urls))
+
+    @patch("mac_utils.batch.move_mp3_files_to_music_folder")
+    @patch("mac_utils.orchestrator.yt_dlp_download")
+    def test_failures_are_collected(self, mock_yt_dlp_download, mock_move_files):
+        """Test that invalid URLs and download errors are reported per URL"""
+
+        def download(url, *args, **kwargs):
+            if url.endswith("/1"):
+                raise Exception("Download failed")
+            return [Path("track.mp3")]
+
+        mock_yt_dlp_download.side_effect = download
+        downloader = orchestrator.DownloadOrchestrator({"YouTube": 1, "SoundCloud": 1})
+        urls = ["https://soundcloud.com/artist/0", "https://soundcloud.com/artist/1"]
+
+        failures = asyncio.run(
+            downloader.download_many(urls + ["https://example.com/video"], "mp3")
+        )
+        downloader.shutdown()
+
+        self.assertEqual(
+            sorted(failures), ["https://example.com/video", "https://soundcloud.com/artist/1"]
+        )
+        self.assertIsInstance(failures["https://example.com/video"], ValueError)
+        self.assertEqual(mock_yt_dlp_download.call_count, 2)
+
+    @patch("mac_utils.batch.move_video_files_to_downloads")
+    @patch("mac_utils.orchestrator.yt_dlp_download")
+    def test_download_passes_options(self, mock_yt_dlp_download, mock_move_files):
+        downloader = orchestrator.DownloadOrchestrator()
+
+        asyncio.run(
+            downloader.download(
+                "https://www.youtube.com/watch?v=xyz", "video", dry_run=True, force=True
+            )
+        )
+        downloader.shutdown()
+
+        mock_yt_dlp_download.assert_called_once_with(
+            "https://www.youtube.com/watch?v=xyz",
+            "YouTube",
+            "video",
+            dry_run=True,
+            output_dir=None,
+            force=True,
+            session=ANY,
+        )
+
+    @patch("mac_utils.orchestrator.yt_dlp_download", return_value=[])
+    def test_shared_executor_is_left_running(self, mock_yt_dlp_download):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            downloader = orchestrator.DownloadOrchestrator(executor=executor)
+            asyncio.run(downloader.download("https://www.youtube.com/watch?v=xyz", "video"))
+            downloader.shutdown()
+
+            self.assertEqual(executor.submit(lambda: "still running").result(), "still running")
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            orchestrator.DownloadOrchestrator({"YouTube": 0, "SoundCloud": 1})
+
+
+class TestGetHostLimits(unittest.TestCase):
+    @patch("mac_utils.orchestrator.get_config_value")
+    def test_limits_from_config(self, mock_get_config_value):
+        mock_get_config_value.side_effect = lambda key, default: {
+            "youtube_concurrency": 1,
+            "soundcloud_concurrency": 8,
+        }[key]
+
+        self.assertEqual(orchestrator.get_host_limits(), {"YouTube": 1, "SoundCloud": 8})
+
+
+if __name__ == "__main__":
+    unittest.main()
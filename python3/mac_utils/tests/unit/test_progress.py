@@ -0,0 +1,155 @@
+import io
+import logging
+import unittest
+from unittest.mock import patch
+
+from mac_utils import progress, util
+
+log = logging.getLogger(__name__)
+
+
+class FakeTerminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def downloading(filename, downloaded, total=1000, **extra):
+    return {
+        "status": "downloading",
+        "filename": filename,
+        "downloaded_bytes": downloaded,
+        "total_bytes": total,
+        **extra,
+    }
+
+
+class ReporterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stream = FakeTerminal()
+        self.clock = FakeClock()
+        self.reporter = progress.ProgressReporter(self.stream, interval=0.5, clock=self.clock)
+
+
+class TestProgressReporter(ReporterTestCase):
+    def test_redraws_are_throttled(self):
+        with patch.object(self.reporter, "_draw", wraps=self.reporter._draw) as mock_draw:
+            for downloaded in range(0, 1000, 10):
+                self.reporter.hook(downloading("/tmp/song.webm", downloaded))
+            self.clock.now += 0.5
+            self.reporter.hook(downloading("/tmp/song.webm", 1000))
+
+        self.assertEqual(mock_draw.call_count, 2)
+        self.assertIn("100.0%", self.stream.getvalue())
+
+    def test_one_line_per_download(self):
+        self.reporter.hook(downloading("/tmp/one.webm", 500))
+        self.reporter.hook(downloading("/tmp/two.webm", 250))
+
+        self.assertEqual(len(self.reporter.lines()), 2)
+        self.clock.now += 1
+        self.reporter.hook(downloading("/tmp/two.webm", 750))
+
+        output = self.stream.getvalue()
+        # The second draw moves back up over the first one's single line
+        self.assertIn("\x1b[1F", output)
+        last_draw = output.rsplit("\x1b[J", 1)[1]
+        self.assertEqual(last_draw.count("\n"), 2)
+        self.assertIn("one.webm", last_draw)
+        self.assertIn(" 75.0%", last_draw)
+
+    def test_finished_download_is_cleared(self):
+        self.reporter.hook(downloading("/tmp/song.webm", 500))
+        self.reporter.hook({"status": "finished", "filename": "/tmp/song.webm"})
+
+        self.assertEqual(self.reporter.lines(), [])
+        self.assertTrue(self.stream.getvalue().endswith("\x1b[1F\x1b[J"))
+
+    def test_nothing_drawn_when_not_a_terminal(self):
+        stream = io.StringIO()
+        reporter = progress.ProgressReporter(stream)
+
+        reporter.hook(downloading("/tmp/song.webm", 500))
+
+        self.assertEqual(stream.getvalue(), "")
+        self.assertEqual(len(reporter.lines()), 1)
+
+
+class TestProgressLogHandler(ReporterTestCase):
+    def setUp(self):
+        super().setUp()
+        self.logger = logging.getLogger("mac_utils.tests.progress_log")
+        self.logger.propagate = False
+        handler = progress.ProgressLogHandler(self.stream, reporter=self.reporter)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.removeHandler, handler)
+
+    def test_records_are_written_above_the_bars(self):
+        self.reporter.hook(downloading("/tmp/song.webm", 500))
+        bars = self.stream.getvalue()
+        line = self.reporter.lines()[0]
+
+        self.logger.warning("Retrying other.webm")
+
+        self.assertEqual(
+            self.stream.getvalue()[len(bars) :],
+            f"\x1b[1F\x1b[JRetrying other.webm\n\x1b[J{line}\n",
+        )
+
+    def test_records_without_bars_are_written_as_is(self):
+        self.logger.warning("No downloads")
+
+        self.assertEqual(self.stream.getvalue(), "No downloads\n")
+
+
+class TestFormatLine(unittest.TestCase):
+    def test_known_size(self):
+        state = progress.DownloadState("song.webm")
+        state.downloaded, state.total, state.speed, state.eta = 420, 1000, 1536, 3725
+
+        line = progress.format_line(state)
+
+        self.assertIn("[########------------]", line)
+        self.assertIn(" 42.0%", line)
+        self.assertIn("1.5KiB/s", line)
+        self.assertIn("ETA 1:02:05", line)
+
+    def test_unknown_size(self):
+        state = progress.DownloadState("x" * 100)
+        state.downloaded = 3 * 1024 * 1024
+
+        line = progress.format_line(state)
+
+        self.assertIn("3.0MiB", line)
+        self.assertIn("--/s", line)
+        self.assertIn("ETA --:--", line)
+        self.assertTrue(line.startswith("x" * (progress.NAME_WIDTH - 1) + "…"))
+
+
+class TestShowProgressConfig(unittest.TestCase):
+    @patch("mac_utils.util.get_config_value", return_value=False)
+    def test_config_disables_progress(self, mock_config):
+        options = util.get_yt_dl_options("video")
+
+        self.assertNotIn("progress_hooks", options)
+        self.assertTrue(options["noprogress"])
+        mock_config.assert_called_once_with("show_progress", True)
+
+    @patch("mac_utils.util.get_config_value", return_value=False)
+    def test_argument_overrides_config(self, mock_config):
+        options = util.get_yt_dl_options("video", show_progress=True)
+
+        self.assertEqual(options["progress_hooks"], [util.yt_dl_progress_hook])
+        mock_config.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
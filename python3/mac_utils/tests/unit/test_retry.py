@@ -0,0 +1,93 @@
+import logging
+import unittest
+from unittest.mock import patch
+
+from yt_dlp.utils import DownloadError, ExtractorError, UnsupportedError
+
+from mac_utils import retry
+
+log = logging.getLogger(__name__)
+
+
+class TestIsRetryable(unittest.TestCase):
+    def test_transient_errors(self):
+        for error in [
+            Exception("Download failed"),
+            TimeoutError("The read operation timed out"),
+            ConnectionResetError("Connection reset by peer"),
+            DownloadError("ERROR: HTTP Error 503: Service Unavailable"),
+            ExtractorError("Unable to download webpage"),
+        ]:
+            self.assertTrue(retry.is_retryable(error), repr(error))
+
+    def test_fatal_errors(self):
+        for error in [
+            DownloadError("ERROR: [youtube] xyz: Video unavailable"),
+            DownloadError("ERROR: [youtube] xyz: Private video. Sign in if you've been granted"),
+            DownloadError("ERROR: HTTP Error 404: Not Found"),
+            ExtractorError("This track was removed", expected=True),
+            UnsupportedError("https://example.com/video"),
+            ValueError("Media type must be either 'mp3' or 'video'"),
+        ]:
+            self.assertFalse(retry.is_retryable(error), repr(error))
+
+    def test_wrapped_expected_error_is_fatal(self):
+        """Test that DownloadError is classified by the error it wraps"""
+        cause = ExtractorError("Sorry, this track is gone", expected=True)
+        error = DownloadError("ERROR: Sorry, this track is gone", exc_info=(None, cause, None))
+        self.assertFalse(retry.is_retryable(error))
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_exponential_backoff(self):
+        policy = retry.RetryPolicy(max_attempts=6, base_delay=2, max_delay=10, jitter=0)
+        self.assertEqual([policy.backoff(attempt) for attempt in range(1, 6)], [2, 4, 8, 10, 10])
+
+    def test_jitter_bounds(self):
+        policy = retry.RetryPolicy(base_delay=4, jitter=0.5)
+        delays = [policy.backoff(1) for _ in range(100)]
+        self.assertTrue(all(2 <= delay <= 4 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_stops_after_max_attempts(self):
+        policy = retry.RetryPolicy(max_attempts=3, jitter=0)
+        error = Exception("Download failed")
+        self.assertEqual(policy.next_delay(1, error, elapsed=0), 2)
+        self.assertEqual(policy.next_delay(2, error, elapsed=0), 4)
+        self.assertIsNone(policy.next_delay(3, error, elapsed=0))
+
+    def test_stops_on_fatal_error(self):
+        policy = retry.RetryPolicy(max_attempts=3)
+        self.assertIsNone(policy.next_delay(1, DownloadError("Video unavailable"), elapsed=0))
+
+    def test_stops_when_budget_exceeded(self):
+        policy = retry.RetryPolicy(max_attempts=5, base_delay=10, jitter=0, max_elapsed=30)
+        error = Exception("Download failed")
+        self.assertEqual(policy.next_delay(1, error, elapsed=15), 10)
+        self.assertIsNone(policy.next_delay(2, error, elapsed=25))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            retry.RetryPolicy(max_attempts=0)
+        with self.assertRaises(ValueError):
+            retry.RetryPolicy(jitter=2)
+
+    @patch("mac_utils.retry.get_config_value")
+    def test_from_config(self, mock_get_config_value):
+        config = {"retry_count": 5, "retry_delay": 1, "retry_max_delay": 8, "retry_max_elapsed": 60}
+        mock_get_config_value.side_effect = lambda key, default: config[key]
+
+        policy = retry.RetryPolicy.from_config()
+        self.assertEqual(policy.max_attempts, 5)
+        self.assertEqual(policy.base_delay, 1)
+        self.assertEqual(policy.max_delay, 8)
+        self.assertEqual(policy.max_elapsed, 60)
+
+        # Explicit arguments take precedence over config
+        policy = retry.RetryPolicy.from_config(max_attempts=2, base_delay=0)
+        self.assertEqual(policy.max_attempts, 2)
+        self.assertEqual(policy.base_delay, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
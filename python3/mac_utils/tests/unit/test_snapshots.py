@@ -0,0 +1,138 @@
+import logging
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from mac_utils import snapshots, util
+from mac_utils.main import app
+
+log = logging.getLogger(__name__)
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_dir = Path(self.temp_dir.name) / "snapshots"
+        patcher = patch("mac_utils.snapshots.DEFAULT_SNAPSHOT_DIR", self.snapshot_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.root = Path(self.temp_dir.name) / "media"
+        (self.root / "albums").mkdir(parents=True)
+        (self.root / "song.mp3").write_bytes(b"x" * 10)
+        (self.root / "albums" / "track.mp3").write_bytes(b"x" * 20)
+        (self.root / "albums" / "cover.jpg").write_bytes(b"x" * 30)
+
+    def bump_mtime(self, folder: Path) -> None:
+        """Make sure a folder's mtime differs from the one in the snapshot"""
+        stat = folder.stat()
+        os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def listed(self, recursive: bool = True) -> list:
+        return sorted(
+            os.path.relpath(path, self.root)
+            for path, *_ in snapshots.iter_snapshot_files(str(self.root), recursive=recursive)
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestRefreshSnapshot(SnapshotTestCase):
+    def test_lists_files(self):
+        self.assertEqual(self.listed(), ["albums/cover.jpg", "albums/track.mp3", "song.mp3"])
+        self.assertEqual(self.listed(recursive=False), ["song.mp3"])
+        self.assertTrue(snapshots.snapshot_path(str(self.root)).exists())
+
+    def test_unchanged_folders_are_not_rescanned(self):
+        snapshots.refresh_snapshot(str(self.root), recursive=True)
+
+        with patch("mac_utils.snapshots.scan_dir") as mock_scan_dir:
+            self.assertEqual(len(self.listed()), 3)
+        mock_scan_dir.assert_not_called()
+
+    def test_only_changed_folders_are_rescanned(self):
+        snapshots.refresh_snapshot(str(self.root), recursive=True)
+        (self.root / "albums" / "new.mp3").touch()
+        self.bump_mtime(self.root / "albums")
+
+        with patch("mac_utils.snapshots.scan_dir", wraps=snapshots.scan_dir) as mock_scan_dir:
+            files = self.listed()
+
+        self.assertIn("albums/new.mp3", files)
+        self.assertEqual(
+            [scan.args[0] for scan in mock_scan_dir.call_args_list], [str(self.root / "albums")]
+        )
+
+    def test_removed_folders_are_dropped(self):
+        snapshots.refresh_snapshot(str(self.root), recursive=True)
+        for file_path in (self.root / "albums").iterdir():
+            file_path.unlink()
+        (self.root / "albums").rmdir()
+        self.bump_mtime(self.root)
+
+        self.assertEqual(self.listed(), ["song.mp3"])
+        self.assertEqual(len(snapshots.load_snapshot(str(self.root))), 1)
+
+    def test_unreadable_snapshot_is_rebuilt(self):
+        path = snapshots.snapshot_path(str(self.root))
+        path.parent.mkdir(parents=True)
+        path.write_text("{not json")
+
+        with self.assertLogs("mac_utils.snapshots", level="WARNING"):
+            self.assertEqual(len(self.listed()), 3)
+
+    def test_missing_root(self):
+        with self.assertRaises(OSError):
+            snapshots.refresh_snapshot(str(self.root / "missing"))
+
+    def test_clear_snapshots(self):
+        snapshots.refresh_snapshot(str(self.root))
+        self.assertEqual(snapshots.clear_snapshots(), 1)
+        self.assertEqual(snapshots.clear_snapshots(), 0)
+
+
+class TestSortFilesByIndex(SnapshotTestCase):
+    def test_matches_direct_scan(self):
+        """Test that answers from the index match a fresh scan"""
+        for sort_by in util.SORT_KEYS:
+            direct = util.sort_files_by(str(self.root), "all", sort_by, recursive=True)
+            indexed = util.sort_files_by(
+                str(self.root), "all", sort_by, recursive=True, use_index=True
+            )
+            self.assertEqual([f.path for f in indexed], [f.path for f in direct])
+            self.assertEqual([f.size for f in indexed], [f.path.stat().st_size for f in direct])
+
+    def test_file_type_filter(self):
+        indexed = util.sort_files_by(
+            str(self.root), "mp3", "size", recursive=True, top=1, reverse=True, use_index=True
+        )
+        self.assertEqual([f.name for f in indexed], ["track.mp3"])
+
+
+class TestOrderFilesCommand(SnapshotTestCase):
+    def test_clear_snapshots_option(self):
+        snapshots.refresh_snapshot(str(self.root))
+        args = ["order-files", "--path", str(self.root), "--file-type", "all", "--order-by", "name"]
+
+        with patch("mac_utils.snapshots.scan_dir", wraps=snapshots.scan_dir) as mock_scan_dir:
+            app([*args, "--use-index", "--clear-snapshots"], standalone_mode=False)
+
+        # The saved snapshot was thrown away, so the folder was scanned again
+        self.assertEqual([scan.args[0] for scan in mock_scan_dir.call_args_list], [str(self.root)])
+        self.assertTrue(snapshots.snapshot_path(str(self.root)).exists())
+
+    def test_snapshots_are_kept_by_default(self):
+        snapshots.refresh_snapshot(str(self.root))
+        args = ["order-files", "--path", str(self.root), "--file-type", "all", "--order-by", "name"]
+
+        with patch("mac_utils.snapshots.scan_dir") as mock_scan_dir:
+            app([*args, "--use-index"], standalone_mode=False)
+
+        mock_scan_dir.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
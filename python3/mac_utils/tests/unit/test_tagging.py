@@ -0,0 +1,115 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from mutagen.id3 import ID3
+
+from mac_utils import tagging
+
+log = logging.getLogger(__name__)
+
+# A single silent MPEG-1 Layer III frame is enough for mutagen to treat the file as MP3
+MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+class TaggingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir_path = Path(self.temp_dir.name)
+        self.metadata = {
+            "title": "Test Song",
+            "uploader": "Test Artist",
+            "album": "Test Album",
+            "upload_date": "20230101",
+        }
+
+    def make_mp3(self, name: str = "song.mp3") -> Path:
+        file_path = self.temp_dir_path / name
+        file_path.write_bytes(MP3_FRAME * 4)
+        return file_path
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestTagMp3File(TaggingTestCase):
+    def test_tags_untagged_file_with_one_save(self):
+        """Test that a file without an ID3 header is tagged with a single write"""
+        file_path = self.make_mp3()
+
+        with patch.object(ID3, "save", autospec=True, side_effect=ID3.save) as mock_save:
+            self.assertTrue(tagging.tag_mp3_file(file_path, self.metadata))
+
+        mock_save.assert_called_once()
+        tags = ID3(file_path)
+        self.assertEqual(str(tags["TIT2"]), "Test Song")
+        self.assertEqual(str(tags["TPE1"]), "Test Artist")
+        self.assertEqual(str(tags["TALB"]), "Test Album")
+        self.assertEqual(str(tags["TDRC"]), "2023")
+
+    def test_retags_existing_tags(self):
+        file_path = self.make_mp3()
+        tagging.tag_mp3_file(file_path, self.metadata)
+
+        tagging.tag_mp3_file(file_path, {"title": "New Title", "artist": "New Artist"})
+
+        tags = ID3(file_path)
+        self.assertEqual(str(tags["TIT2"]), "New Title")
+        self.assertEqual(str(tags["TPE1"]), "New Artist")
+        self.assertEqual(len(tags.getall("TIT2")), 1)
+
+    def test_embeds_thumbnail_artwork(self):
+        """Test that the thumbnail yt-dlp wrote is embedded as the front cover"""
+        file_path = self.make_mp3()
+        thumbnail = self.temp_dir_path / "song.jpg"
+        thumbnail.write_bytes(b"\xff\xd8\xff\xe0fake-jpeg")
+        metadata = {
+            **self.metadata,
+            "thumbnails": [{"url": "https://example.com/a.jpg"}, {"filepath": str(thumbnail)}],
+        }
+
+        tagging.tag_mp3_file(file_path, metadata)
+
+        cover = ID3(file_path).getall("APIC")[0]
+        self.assertEqual(cover.mime, "image/jpeg")
+        self.assertEqual(cover.type, 3)
+        self.assertEqual(cover.data, thumbnail.read_bytes())
+
+    def test_missing_file_is_reported(self):
+        with self.assertLogs("mac_utils.tagging", level="WARNING"):
+            self.assertFalse(
+                tagging.tag_mp3_file(self.temp_dir_path / "missing.mp3", self.metadata)
+            )
+
+
+class TestFindArtwork(TaggingTestCase):
+    def test_ignores_unwritten_thumbnails(self):
+        metadata = {"thumbnails": [{"filepath": str(self.temp_dir_path / "missing.jpg")}]}
+        self.assertIsNone(tagging.find_artwork(metadata))
+        self.assertIsNone(tagging.find_artwork({}))
+
+
+class TestTagMp3Files(TaggingTestCase):
+    def test_tags_many_files(self):
+        files = [(self.make_mp3(f"song{i}.mp3"), {"title": f"Song {i}"}) for i in range(5)]
+
+        tagged = tagging.tag_mp3_files(files, workers=3)
+
+        self.assertEqual(tagged, 5)
+        for file_path, metadata in files:
+            self.assertEqual(str(ID3(file_path)["TIT2"]), metadata["title"])
+
+    def test_failures_are_counted(self):
+        files = [
+            (self.make_mp3(), {"title": "Song"}),
+            (self.temp_dir_path / "missing.mp3", {"title": "Missing"}),
+        ]
+
+        with self.assertLogs("mac_utils.tagging", level="WARNING"):
+            self.assertEqual(tagging.tag_mp3_files(files), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
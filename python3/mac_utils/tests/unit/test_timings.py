@@ -0,0 +1,114 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from mac_utils import timings
+from mac_utils.main import app
+from mac_utils.tests.unit.test_history_manager import HistoryTestCase
+
+log = logging.getLogger(__name__)
+
+
+class TimingsTestCase(unittest.TestCase):
+    """Start every test with timing enabled and nothing recorded"""
+
+    def setUp(self):
+        timings.reset()
+        timings.enable()
+        self.addCleanup(timings.reset)
+        self.addCleanup(timings.disable)
+
+
+class TestSpans(TimingsTestCase):
+    def test_disabled_spans_record_nothing(self):
+        timings.disable()
+
+        with timings.span("stage"):
+            pass
+        timings.timed("stage")(lambda: None)()
+
+        self.assertEqual(timings.summary(), {})
+
+    def test_span_and_timed(self):
+        @timings.timed("decorated")
+        def work(value):
+            return value * 2
+
+        with timings.span("block"):
+            pass
+        self.assertEqual(work(2), 4)
+        self.assertEqual(work(3), 6)
+
+        stages = timings.summary()
+        self.assertEqual(stages["block"]["count"], 1)
+        self.assertEqual(stages["decorated"]["count"], 2)
+        self.assertGreaterEqual(stages["decorated"]["max"], stages["decorated"]["mean"])
+
+    def test_span_records_on_error(self):
+        with self.assertRaises(ValueError):
+            with timings.span("failing"):
+                raise ValueError
+
+        self.assertEqual(timings.summary()["failing"]["count"], 1)
+
+
+class TestHooks(TimingsTestCase):
+    def test_progress_hook_records_finished_transfers(self):
+        timings.progress_hook({"status": "downloading", "elapsed": 1.0})
+        timings.progress_hook({"status": "finished", "elapsed": 2.5})
+
+        self.assertEqual(timings.summary()["yt-dlp.transfer"]["total"], 2.5)
+
+    def test_postprocessor_hook(self):
+        timings.postprocessor_hook({"status": "started", "postprocessor": "ExtractAudio"})
+        timings.postprocessor_hook({"status": "finished", "postprocessor": "ExtractAudio"})
+        # A finish without a start is ignored
+        timings.postprocessor_hook({"status": "finished", "postprocessor": "MoveFiles"})
+
+        self.assertEqual(list(timings.summary()), ["yt-dlp.postprocess.ExtractAudio"])
+
+
+class TestReport(unittest.TestCase):
+    def test_format_report_sorts_slowest_first(self):
+        stages = {
+            "fast": {"count": 1, "total": 0.1, "mean": 0.1, "max": 0.1},
+            "slow": {"count": 2, "total": 0.8, "mean": 0.4, "max": 0.5},
+        }
+
+        report = timings.format_report(stages, wall_seconds=1.0)
+
+        self.assertLess(report.index("slow"), report.index("fast"))
+        self.assertIn("80%", report)
+        self.assertIn("Total (wall clock)", report)
+
+    def test_write_json_appends_lines(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "timings" / "runs.jsonl"
+            stages = {"stage": {"count": 1, "total": 0.1, "mean": 0.1, "max": 0.1}}
+
+            timings.write_json(path, stages, command="dl-video")
+            timings.write_json(path, {}, command="dl-song")
+
+            lines = [json.loads(line) for line in path.read_text().splitlines()]
+            self.assertEqual([line["command"] for line in lines], ["dl-video", "dl-song"])
+            self.assertEqual(lines[0]["stages"], stages)
+
+
+class TestTimingsOption(HistoryTestCase):
+    def test_timings_json_option(self):
+        self.addCleanup(timings.reset)
+        self.addCleanup(timings.disable)
+        path = self.history_dir / "timings.jsonl"
+
+        app(["--timings-json", str(path), "history", "--show"], standalone_mode=False)
+
+        line = json.loads(path.read_text())
+        self.assertEqual(line["command"], "history")
+        self.assertIn("wall_seconds", line)
+        self.assertFalse(timings.is_enabled())
+
+
+if __name__ == "__main__":
+    unittest.main()
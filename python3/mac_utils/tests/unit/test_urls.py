@@ -0,0 +1,113 @@
+import logging
+import unittest
+
+from mac_utils import urls
+
+log = logging.getLogger(__name__)
+
+
+class TestParseUrl(unittest.TestCase):
+    def test_youtube_videos(self):
+        for url in [
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "http://youtube.com/watch?v=dQw4w9WgXcQ&list=PL123&index=4",
+            "https://m.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+            "https://music.youtube.com/watch?v=dQw4w9WgXcQ&si=tracking",
+            r"https://www.youtube.com/watch\?v\=dQw4w9WgXcQ",
+            "https://youtu.be/dQw4w9WgXcQ?si=tracking",
+            "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+            "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+            " https://WWW.YOUTUBE.COM/watch?v=dQw4w9WgXcQ#t=10 ",
+        ]:
+            parsed = urls.parse_url(url)
+            self.assertEqual(
+                parsed,
+                urls.CanonicalUrl(
+                    "YouTube",
+                    "video",
+                    "youtube:dQw4w9WgXcQ",
+                    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+                ),
+                url,
+            )
+
+    def test_youtube_playlist(self):
+        parsed = urls.parse_url("https://www.youtube.com/playlist?list=PLtest123&si=abc")
+        self.assertEqual(parsed.kind, "playlist")
+        self.assertEqual(parsed.key, "youtube:playlist:PLtest123")
+        self.assertEqual(parsed.url, "https://www.youtube.com/playlist?list=PLtest123")
+
+    def test_soundcloud(self):
+        cases = {
+            "https://soundcloud.com/Artist/Track?si=abc&utm_source=clipboard": (
+                "track",
+                "soundcloud:artist/track",
+            ),
+            "https://m.soundcloud.com/artist/track/": ("track", "soundcloud:artist/track"),
+            "https://soundcloud.com/artist/sets/album": ("set", "soundcloud:artist/sets/album"),
+            "https://soundcloud.com/artist/likes": ("user", "soundcloud:artist/likes"),
+            "https://soundcloud.com/artist": ("user", "soundcloud:artist"),
+        }
+        for url, (kind, key) in cases.items():
+            parsed = urls.parse_url(url)
+            self.assertEqual(
+                (parsed.media_company, parsed.kind, parsed.key), ("SoundCloud", kind, key)
+            )
+
+    def test_unrecognised(self):
+        for url in [
+            "",
+            "youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://example.com/watch?v=dQw4w9WgXcQ",
+            "https://www.youtube.com/watch?v=short",
+            "https://www.youtube.com/@channel",
+            "https://soundcloud.com/discover",
+            "https://notyoutube.com/watch?v=dQw4w9WgXcQ",
+        ]:
+            self.assertIsNone(urls.parse_url(url), url)
+
+
+class TestDetectMediaCompany(unittest.TestCase):
+    def test_any_page_on_a_known_host(self):
+        self.assertEqual(urls.detect_media_company("https://www.youtube.com/@channel"), "YouTube")
+        self.assertEqual(urls.detect_media_company("https://youtu.be/dQw4w9WgXcQ"), "YouTube")
+        self.assertEqual(urls.detect_media_company("https://soundcloud.com/a/b"), "SoundCloud")
+
+    def test_unknown_hosts(self):
+        for url in ["https://example.com/video", "https://youtube.com/", "youtube.com/watch"]:
+            self.assertIsNone(urls.detect_media_company(url), url)
+
+
+class TestCanonicalKey(unittest.TestCase):
+    def test_falls_back_to_normalized_url(self):
+        self.assertEqual(
+            urls.canonical_key("https://WWW.Example.com/Some/Path/#frag"),
+            "https://example.com/Some/Path",
+        )
+
+    def test_equivalent_spellings_share_a_key(self):
+        expected = "https://youtube.com/watch?v=xyz"
+        for url in [
+            "https://www.youtube.com/watch?v=xyz",
+            "https://YouTube.com/watch?v=xyz/",
+            r"https://www.youtube.com/watch\?v\=xyz",
+            " https://youtube.com/watch?v=xyz#t=10 ",
+        ]:
+            self.assertEqual(urls.canonical_key(url), expected, url)
+
+    def test_media_urls_use_canonical_keys(self):
+        """Test that different links to the same video share a key"""
+        for url in [
+            "https://youtu.be/dQw4w9WgXcQ",
+            "https://m.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123&si=abc",
+            "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+        ]:
+            self.assertEqual(urls.canonical_key(url), "youtube:dQw4w9WgXcQ", url)
+        self.assertEqual(
+            urls.canonical_key("https://soundcloud.com/Artist/Track?si=123"),
+            "soundcloud:artist/track",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,14 @@
 import logging
+import os
 import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, call, patch
 
-from mac_utils import util
+from mac_utils import metrics, util
+from mac_utils.tests.unit.test_jobs import use_temp_journal
 
 log = logging.getLogger(__name__)
 
@@ -19,7 +23,23 @@ class TestGetItunesMusicFolder(unittest.TestCase):
         self.assertEqual(result, expected_path, "Returned path should match the expected path")
 
 
-class TestGetYtDLOptions(unittest.TestCase):
+class CookieCacheTestCase(unittest.TestCase):
+    """Keep the browser cookie cache out of the user's home directory"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = Path(self.temp_dir.name) / "cookies-cache.json"
+        self.cache_patcher = patch.object(util, "COOKIE_CACHE_FILE", self.cache_file)
+        self.cache_patcher.start()
+        util.clear_cookie_cache()
+
+    def tearDown(self):
+        util.clear_cookie_cache()
+        self.cache_patcher.stop()
+        self.temp_dir.cleanup()
+
+
+class TestGetYtDLOptions(CookieCacheTestCase):
     def test_get_mp3_options(self):
         media_type = "mp3"
         options = util.get_yt_dl_options(media_type)
@@ -30,11 +50,16 @@ class TestGetYtDLOptions(unittest.TestCase):
         self.assertEqual(options["outtmpl"], "%(title)s.%(ext)s")
 
         # Test postprocessors
-        self.assertEqual(len(options["postprocessors"]), 1)
+        self.assertEqual(len(options["postprocessors"]), 2)
         self.assertEqual(options["postprocessors"][0]["key"], "FFmpegExtractAudio")
         self.assertEqual(options["postprocessors"][0]["preferredcodec"], "mp3")
         self.assertEqual(options["postprocessors"][0]["preferredquality"], "192")
 
+        # Thumbnails are downloaded as JPEG for cover art
+        self.assertTrue(options["writethumbnail"])
+        self.assertEqual(options["postprocessors"][1]["key"], "FFmpegThumbnailsConvertor")
+        self.assertEqual(options["postprocessors"][1]["format"], "jpg")
+
         # Test cookiesfrombrowser exists
         self.assertIn(
             "cookiesfrombrowser", options, "cookiesfrombrowser should be present for MP3 downloads"
@@ -61,7 +86,68 @@ class TestGetYtDLOptions(unittest.TestCase):
             util.get_yt_dl_options(media_type)
 
 
+class TestResolveBrowserCookies(CookieCacheTestCase):
+    @patch("yt_dlp.parse_options")
+    def test_cookies_resolved_once(self, mock_parse_options):
+        """Test that repeated option building parses the browser cookies once"""
+        mock_parse_options.return_value.ydl_opts = {
+            "cookiesfrombrowser": ("chrome", None, None, None)
+        }
+
+        for _ in range(3):
+            options = util.get_yt_dl_options("mp3")
+
+        mock_parse_options.assert_called_once_with(["--cookies-from-browser", "chrome"])
+        self.assertEqual(options["cookiesfrombrowser"], ("chrome", None, None, None))
+
+    @patch("yt_dlp.parse_options")
+    def test_negative_result_cached(self, mock_parse_options):
+        """Test that a missing browser is only reported once"""
+        mock_parse_options.side_effect = Exception("Chrome not found")
+
+        with self.assertLogs("mac_utils.util", level="WARNING") as cm:
+            for _ in range(3):
+                options = util.get_yt_dl_options("mp3")
+
+        mock_parse_options.assert_called_once()
+        self.assertNotIn("cookiesfrombrowser", options)
+        self.assertEqual(len([msg for msg in cm.output if "Could not load" in msg]), 1)
+
+    @patch("yt_dlp.parse_options")
+    def test_disk_cache_shared_between_processes(self, mock_parse_options):
+        """Test that a fresh process reuses the resolution stored on disk"""
+        mock_parse_options.return_value.ydl_opts = {
+            "cookiesfrombrowser": ("chrome", None, None, None)
+        }
+        util.resolve_browser_cookies("chrome")
+        # Simulate a new process: only the on-disk cache survives
+        util._cookie_cache.clear()
+
+        cookies = util.resolve_browser_cookies("chrome")
+
+        mock_parse_options.assert_called_once()
+        self.assertEqual(cookies, ("chrome", None, None, None))
+        self.assertTrue(self.cache_file.exists())
+
+    @patch("yt_dlp.parse_options")
+    def test_expired_entries_resolved_again(self, mock_parse_options):
+        mock_parse_options.return_value.ydl_opts = {
+            "cookiesfrombrowser": ("chrome", None, None, None)
+        }
+
+        util.resolve_browser_cookies("chrome", ttl=0, persist=False)
+        with patch("mac_utils.util.time.time", return_value=util.time.time() + 1):
+            util.resolve_browser_cookies("chrome", ttl=0, persist=False)
+
+        self.assertEqual(mock_parse_options.call_count, 2)
+        self.assertFalse(self.cache_file.exists())
+
+
 class TestGetJsonConfig(unittest.TestCase):
+    def setUp(self):
+        util._json_config_cache.clear()
+        self.addCleanup(util._json_config_cache.clear)
+
     @patch(
         "builtins.open",
         new_callable=unittest.mock.mock_open,
@@ -80,6 +166,32 @@ class TestGetJsonConfig(unittest.TestCase):
         assert isinstance(app_data["installed"]["apps"], list)
         assert isinstance(app_data["system"]["apps"], list)
 
+    def test_parsed_once(self):
+        with patch("mac_utils.util.json.load", wraps=util.json.load) as mock_load:
+            first = util.get_json_config("my-apps")
+            first["installed"]["apps"].append("Changed")
+            second = util.get_json_config("my-apps")
+
+        mock_load.assert_called_once()
+        # Each caller gets its own copy
+        self.assertNotIn("Changed", second["installed"]["apps"])
+
+    def test_reparsed_when_changed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = Path(temp_dir) / "config" / "test.json"
+            config_file.parent.mkdir()
+            config_file.write_text('{"value": 1}')
+            with patch("mac_utils.util.__file__", str(Path(temp_dir) / "util.py")):
+                self.assertEqual(util.get_json_config("test"), {"value": 1})
+                config_file.write_text('{"value": 2}')
+                stat = config_file.stat()
+                os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+                self.assertEqual(util.get_json_config("test"), {"value": 2})
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            util.get_json_config("missing")
+
 
 class TestYtDlProgressHook(unittest.TestCase):
     def test_yt_dl_progress_hook_finished(self):
@@ -126,14 +238,16 @@ class TestOpenApps(unittest.TestCase):
         mock_get_json_config.return_value = {
             "installed": {"apps": ["App1", "App2"], "path": "/path/to/installed/apps"}
         }
+        mock_open_app.return_value = 0
 
-        util.open_apps("installed")
+        results = util.open_apps("installed")
 
         expected_calls = [
-            call("/path/to/installed/apps", "App1"),
-            call("/path/to/installed/apps", "App2"),
+            call("/path/to/installed/apps", "App1", timeout=util.DEFAULT_APP_TIMEOUT),
+            call("/path/to/installed/apps", "App2", timeout=util.DEFAULT_APP_TIMEOUT),
         ]
-        mock_open_app.assert_has_calls(expected_calls)
+        mock_open_app.assert_has_calls(expected_calls, any_order=True)
+        self.assertEqual(results, {"App1": 0, "App2": 0})
 
     @patch("mac_utils.util.get_json_config")
     @patch("mac_utils.util.open_app")
@@ -144,20 +258,83 @@ class TestOpenApps(unittest.TestCase):
                 "path": "/path/to/system/apps",
             }
         }
+        mock_open_app.return_value = 0
 
         util.open_apps("system")
 
         expected_calls = [
-            call("/path/to/system/apps", "SystemApp1"),
-            call("/path/to/system/apps", "SystemApp2"),
+            call("/path/to/system/apps", "SystemApp1", timeout=util.DEFAULT_APP_TIMEOUT),
+            call("/path/to/system/apps", "SystemApp2", timeout=util.DEFAULT_APP_TIMEOUT),
         ]
-        mock_open_app.assert_has_calls(expected_calls)
+        mock_open_app.assert_has_calls(expected_calls, any_order=True)
+
+    @patch("mac_utils.util.get_json_config")
+    def test_full_profile(self, mock_get_json_config):
+        mock_get_json_config.return_value = {
+            "installed": {"apps": ["App1"], "full": ["App1", "App2"], "path": "/Applications"}
+        }
+
+        self.assertEqual(
+            util.get_app_list("installed", "full"),
+            [("/Applications", "App1"), ("/Applications", "App2")],
+        )
+        with self.assertRaises(ValueError):
+            util.get_app_list("installed", "missing")
 
     def test_invalid_type(self):
         with self.assertRaises(ValueError):
             util.open_apps("invalid_type")
 
 
+class TestLaunchApps(unittest.TestCase):
+    """Launch apps with a stub ``open`` executable on PATH"""
+
+    OPEN_STUB = """#!/bin/sh
+case "$1" in
+    *Slow*) sleep 5 ;;
+    *Broken*) echo "Unable to find application named Broken" >&2; exit 1 ;;
+    *) sleep 0.3 ;;
+esac
+"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        stub = Path(self.temp_dir.name) / "open"
+        stub.write_text(self.OPEN_STUB)
+        stub.chmod(0o755)
+        path_patcher = patch.dict(
+            os.environ, {"PATH": f"{self.temp_dir.name}{os.pathsep}{os.environ['PATH']}"}
+        )
+        path_patcher.start()
+        self.addCleanup(path_patcher.stop)
+
+    def test_apps_open_concurrently(self):
+        """Test that launch time is bounded by the slowest app, not the sum"""
+        apps = [("/Applications", f"App{i}") for i in range(5)]
+
+        started_at = time.monotonic()
+        results = util.launch_apps(apps)
+        elapsed = time.monotonic() - started_at
+
+        self.assertEqual(results, {f"App{i}": 0 for i in range(5)})
+        self.assertLess(elapsed, 1.2)
+
+    def test_failures_and_timeouts_are_reported(self):
+        apps = [("/Applications", "App"), ("/Applications", "Broken"), ("/Applications", "Slow")]
+
+        with self.assertLogs("mac_utils.util", level="WARNING") as cm:
+            started_at = time.monotonic()
+            results = util.launch_apps(apps, timeout=1)
+            elapsed = time.monotonic() - started_at
+
+        self.assertEqual(results, {"App": 0, "Broken": 1, "Slow": util.APP_TIMEOUT_EXIT_CODE})
+        self.assertLess(elapsed, 3)
+        self.assertTrue(any("Broken (exit 1), Slow (exit 124)" in msg for msg in cm.output))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
 class TestSortFilesBy(unittest.TestCase):
     def setUp(self):
         # Create a temporary directory with sample files for testing
@@ -180,11 +357,11 @@ class TestSortFilesBy(unittest.TestCase):
                 Path(self.temp_dir_path) / "z-file.txt",
             ]
         )
-        self.assertEqual(sorted_files, expected_files)
+        self.assertEqual([entry.path for entry in sorted_files], expected_files)
 
     def test_sort_by_date_all_files(self):
         sorted_files = util.sort_files_by(self.temp_dir_path, "all", "date")
-        self.assertEqual(sorted_files, sorted(sorted_files, key=lambda f: f.stat().st_ctime))
+        self.assertEqual(sorted_files, sorted(sorted_files, key=lambda f: f.path.stat().st_ctime))
 
     def test_sort_by_name_mp3_files(self):
         sorted_files = util.sort_files_by(self.temp_dir_path, "mp3", "name")
@@ -195,21 +372,123 @@ class TestSortFilesBy(unittest.TestCase):
                 Path(self.temp_dir_path) / "a-file.mp3",
             ]
         )
-        self.assertEqual(sorted_files, expected_files)
+        self.assertEqual([entry.path for entry in sorted_files], expected_files)
 
     def test_sort_by_date_mp3_files(self):
         sorted_files = util.sort_files_by(self.temp_dir_path, "mp3", "date")
-        self.assertEqual(sorted_files, sorted(sorted_files, key=lambda f: f.stat().st_ctime))
+        self.assertEqual(sorted_files, sorted(sorted_files, key=lambda f: f.path.stat().st_ctime))
+
+    def test_sort_by_size(self):
+        (Path(self.temp_dir_path) / "b-file.mp3").write_bytes(b"x" * 100)
+        (Path(self.temp_dir_path) / "z-file.txt").write_bytes(b"x" * 10)
+
+        sorted_files = util.sort_files_by(self.temp_dir_path, "all", "size")
+
+        self.assertEqual(
+            [entry.name for entry in sorted_files],
+            ["a-file.mp3", "c-file.mp3", "z-file.txt", "b-file.mp3"],
+        )
+        self.assertEqual(sorted_files[-1].size, 100)
+
+    def test_sort_by_type(self):
+        (Path(self.temp_dir_path) / "d-file.AAC").touch()
+
+        sorted_files = util.sort_files_by(self.temp_dir_path, "all", "type")
+
+        self.assertEqual(
+            [entry.name for entry in sorted_files],
+            ["d-file.AAC", "a-file.mp3", "b-file.mp3", "c-file.mp3", "z-file.txt"],
+        )
+
+    def test_directories_and_case(self):
+        """Test that folders are skipped and extensions match case-insensitively"""
+        (Path(self.temp_dir_path) / "folder.mp3").mkdir()
+        (Path(self.temp_dir_path) / "LOUD.MP3").touch()
+
+        sorted_files = util.sort_files_by(self.temp_dir_path, "mp3", "name")
+
+        self.assertEqual(
+            [entry.name for entry in sorted_files],
+            ["LOUD.MP3", "a-file.mp3", "b-file.mp3", "c-file.mp3"],
+        )
+
+    def test_entries_are_path_like(self):
+        entry = util.sort_files_by(self.temp_dir_path, "txt", "name")[0]
+        self.assertEqual(os.fspath(entry), str(Path(self.temp_dir_path) / "z-file.txt"))
+        self.assertEqual(entry.suffix, ".txt")
+        self.assertFalse(hasattr(entry, "__dict__"))
+
+    def test_name_sort_skips_stat(self):
+        """Test that sorting by name does not stat every file"""
+        with patch("os.DirEntry.stat", side_effect=AssertionError("stat called")):
+            sorted_files = util.sort_files_by(self.temp_dir_path, "all", "name")
+        self.assertIsNone(sorted_files[0].size)
+
+    def test_invalid_sort_by(self):
+        with self.assertRaises(ValueError):
+            util.sort_files_by(self.temp_dir_path, "all", "color")
+
+    def make_tree(self):
+        root = Path(self.temp_dir_path)
+        (root / "albums" / "live").mkdir(parents=True)
+        (root / "albums" / "big.mp3").write_bytes(b"x" * 300)
+        (root / "albums" / "live" / "bigger.mp3").write_bytes(b"x" * 500)
+        (root / "albums" / "live" / "notes.txt").write_bytes(b"x" * 1000)
+        (root / "a-file.mp3").write_bytes(b"x" * 100)
+
+    def test_recursive(self):
+        self.make_tree()
+
+        sorted_files = util.sort_files_by(self.temp_dir_path, "mp3", "name", recursive=True)
+
+        self.assertEqual(
+            [entry.name for entry in sorted_files],
+            ["a-file.mp3", "b-file.mp3", "big.mp3", "bigger.mp3", "c-file.mp3"],
+        )
+
+    def test_iter_files_is_lazy(self):
+        files = util.iter_files(self.temp_dir_path, "all", recursive=True)
+        self.assertIsInstance(next(files), util.FileEntry)
+
+    def test_top_largest(self):
+        """Test that top N with reverse returns the largest files, largest first"""
+        self.make_tree()
+
+        sorted_files = util.sort_files_by(
+            self.temp_dir_path, "mp3", "size", recursive=True, top=2, reverse=True
+        )
+
+        self.assertEqual([entry.name for entry in sorted_files], ["bigger.mp3", "big.mp3"])
+
+    def test_top_matches_full_sort(self):
+        self.make_tree()
+
+        for reverse in (False, True):
+            full = util.sort_files_by(self.temp_dir_path, "all", "size", True, reverse=reverse)
+            top = util.sort_files_by(self.temp_dir_path, "all", "size", True, 3, reverse)
+            self.assertEqual([entry.path for entry in top], [entry.path for entry in full[:3]])
+
+    def test_invalid_top(self):
+        with self.assertRaises(ValueError):
+            util.sort_files_by(self.temp_dir_path, "all", "size", top=0)
 
     def tearDown(self):
         self.temp_dir.cleanup()
 
 
+VIDEO_INFO = {"title": "Test Video", "requested_downloads": [{"filepath": "Test Video.mp4"}]}
+
+
 class TestYtDlpDownload(unittest.TestCase):
     def setUp(self):
+        use_temp_journal(self)
+        # Keep the media index out of the user's home directory
+        record_patcher = patch("mac_utils.util.record_downloads")
+        record_patcher.start()
+        self.addCleanup(record_patcher.stop)
         self.yt_url = "https://youtube.com/some_video_url"
 
-    @patch("mac_utils.util.tag_mp3_file")
+    @patch("mac_utils.util.tag_mp3_files")
     @patch("mac_utils.history_manager.add_to_history")
     @patch("mac_utils.history_manager.is_downloaded")
     @patch("mac_utils.util.get_yt_dl_options")
@@ -234,7 +513,11 @@ class TestYtDlpDownload(unittest.TestCase):
 
         # Mock the YoutubeDL instance and its extract_info method
         ydl_instance = MagicMock()
-        ydl_instance.extract_info.return_value = {"title": "Test Song", "upload_date": "20230101"}
+        ydl_instance.extract_info.return_value = {
+            "title": "Test Song",
+            "upload_date": "20230101",
+            "requested_downloads": [{"filepath": "Test Song.mp3"}],
+        }
         mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
 
         url = self.yt_url
@@ -258,7 +541,7 @@ class TestYtDlpDownload(unittest.TestCase):
 
         # Mock the YoutubeDL instance and its extract_info method
         ydl_instance = MagicMock()
-        ydl_instance.extract_info.return_value = {"title": "Test Video"}
+        ydl_instance.extract_info.return_value = VIDEO_INFO
         mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
 
         media_company = "youtube"
@@ -269,9 +552,10 @@ class TestYtDlpDownload(unittest.TestCase):
         ydl_instance.extract_info.assert_called_once_with(url, download=True)
         mock_add_to_history.assert_called_once()
 
+    @patch("mac_utils.util.time.sleep")
     @patch("mac_utils.history_manager.is_downloaded")
     @patch("yt_dlp.YoutubeDL")
-    def test_download_error(self, mock_YoutubeDL, mock_is_downloaded):
+    def test_download_error(self, mock_YoutubeDL, mock_is_downloaded, mock_sleep):
         # Mock history check
         mock_is_downloaded.return_value = False
 
@@ -289,11 +573,12 @@ class TestYtDlpDownload(unittest.TestCase):
 
         self.assertIn("Download failed", str(cm.exception))
 
+    @patch("mac_utils.util.time.sleep")
     @patch("mac_utils.history_manager.is_downloaded")
     @patch("mac_utils.util.get_yt_dl_options")
     @patch("yt_dlp.YoutubeDL")
     def test_download_non_zero_error_code(
-        self, mock_YoutubeDL, mock_get_options, mock_is_downloaded
+        self, mock_YoutubeDL, mock_get_options, mock_is_downloaded, mock_sleep
     ):
         """Test that extraction failures from yt-dlp are handled correctly"""
         # Mock history check
@@ -320,6 +605,262 @@ class TestYtDlpDownload(unittest.TestCase):
 
         self.assertIn("extraction failed", str(cm.exception).lower())
 
+    @patch("mac_utils.util.time.sleep")
+    @patch("mac_utils.history_manager.add_to_history")
+    @patch("mac_utils.history_manager.is_downloaded")
+    @patch("mac_utils.util.get_yt_dl_options")
+    @patch("yt_dlp.YoutubeDL")
+    def test_ignored_extraction_error_fails(
+        self, mock_YoutubeDL, mock_get_options, mock_is_downloaded, mock_add, mock_sleep
+    ):
+        """Test that an MP3 download yt-dlp gave up on is retried and not recorded"""
+        mock_get_options.return_value = {"ignoreerrors": True, "outtmpl": "%(title)s.%(ext)s"}
+        mock_is_downloaded.return_value = False
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        ydl_instance = MagicMock()
+        # With ignoreerrors, yt-dlp logs the error and returns None
+        ydl_instance.extract_info.return_value = None
+        mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
+
+        with patch("mac_utils.util.jobs.journal.finish") as mock_finish:
+            with self.assertRaises(Exception):
+                util.yt_dlp_download(self.yt_url, "youtube", "mp3", max_retries=2)
+
+        self.assertEqual(ydl_instance.extract_info.call_count, 2)
+        mock_add.assert_not_called()
+        mock_finish.assert_not_called()
+        self.assertEqual(metrics.value("failures", media_type="mp3"), 1)
+        self.assertEqual(metrics.value("downloads", media_type="mp3"), 0)
+
+    @patch("mac_utils.util.time.sleep")
+    @patch("mac_utils.history_manager.is_downloaded")
+    @patch("yt_dlp.YoutubeDL")
+    def test_fatal_error_not_retried(self, mock_YoutubeDL, mock_is_downloaded, mock_sleep):
+        """Test that permanent errors fail on the first attempt"""
+        from yt_dlp.utils import DownloadError
+
+        mock_is_downloaded.return_value = False
+        ydl_instance = MagicMock()
+        ydl_instance.extract_info.side_effect = DownloadError("ERROR: Video unavailable")
+        mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
+
+        with self.assertRaises(DownloadError):
+            util.yt_dlp_download(self.yt_url, "youtube", "video", max_retries=5)
+
+        ydl_instance.extract_info.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch("mac_utils.util.time.sleep")
+    @patch("mac_utils.history_manager.is_downloaded")
+    @patch("yt_dlp.YoutubeDL")
+    def test_retries_back_off(self, mock_YoutubeDL, mock_is_downloaded, mock_sleep):
+        """Test that waits between attempts grow exponentially"""
+        mock_is_downloaded.return_value = False
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        ydl_instance = MagicMock()
+        ydl_instance.extract_info.side_effect = Exception("Connection reset by peer")
+        mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
+
+        with patch("mac_utils.retry.random.random", return_value=0):
+            with self.assertRaises(Exception):
+                util.yt_dlp_download(self.yt_url, "youtube", "video", max_retries=4, retry_delay=1)
+
+        self.assertEqual(ydl_instance.extract_info.call_count, 4)
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [1, 2, 4])
+        self.assertEqual(metrics.value("retries"), 3)
+        self.assertEqual(metrics.value("failures", media_type="video"), 1)
+
+
+class TestDownloaderSession(unittest.TestCase):
+    def setUp(self):
+        use_temp_journal(self)
+        record_patcher = patch("mac_utils.util.record_downloads")
+        record_patcher.start()
+        self.addCleanup(record_patcher.stop)
+        self.options = {"format": "bestaudio/best", "outtmpl": "%(title)s.%(ext)s"}
+
+    @patch("mac_utils.history_manager.add_to_history")
+    @patch("mac_utils.history_manager.is_downloaded")
+    @patch("mac_utils.util.get_yt_dl_options")
+    @patch("mac_utils.util.time.sleep")
+    @patch("yt_dlp.YoutubeDL")
+    def test_downloader_reused_across_retries(
+        self, mock_YoutubeDL, mock_sleep, mock_get_options, mock_is_downloaded, mock_add
+    ):
+        """Test that retries reuse the downloader created for the first attempt"""
+        mock_get_options.return_value = self.options
+        mock_is_downloaded.return_value = False
+        ydl_instance = MagicMock()
+        ydl_instance.extract_info.side_effect = [Exception("Timed out"), VIDEO_INFO]
+        mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
+
+        util.yt_dlp_download("https://youtube.com/watch?v=xyz", "youtube", "video")
+
+        self.assertEqual(ydl_instance.extract_info.call_count, 2)
+        mock_YoutubeDL.assert_called_once()
+        # The downloader is closed once the download finishes
+        mock_YoutubeDL.return_value.__exit__.assert_called_once()
+
+    @patch("mac_utils.history_manager.add_to_history")
+    @patch("mac_utils.history_manager.is_downloaded")
+    @patch("mac_utils.util.get_yt_dl_options")
+    @patch("yt_dlp.YoutubeDL")
+    def test_session_reused_across_urls(
+        self, mock_YoutubeDL, mock_get_options, mock_is_downloaded, mock_add
+    ):
+        """Test that one session builds options and a downloader once for many URLs"""
+        mock_get_options.return_value = self.options
+        mock_is_downloaded.return_value = False
+        ydl_instance = MagicMock()
+        ydl_instance.extract_info.return_value = VIDEO_INFO
+        mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
+
+        with util.DownloaderSession() as session:
+            for i in range(3):
+                util.yt_dlp_download(
+                    f"https://youtube.com/watch?v={i}", "youtube", "video", session=session
+                )
+            mock_YoutubeDL.return_value.__exit__.assert_not_called()
+
+        mock_get_options.assert_called_once_with("video")
+        mock_YoutubeDL.assert_called_once()
+        self.assertEqual(ydl_instance.extract_info.call_count, 3)
+        mock_YoutubeDL.return_value.__exit__.assert_called_once()
+
+    @patch("mac_utils.util.get_yt_dl_options")
+    @patch("yt_dlp.YoutubeDL")
+    def test_one_downloader_per_thread(self, mock_YoutubeDL, mock_get_options):
+        """Test that threads get their own downloader but share the options"""
+        mock_get_options.return_value = self.options
+        mock_YoutubeDL.side_effect = lambda options: MagicMock()
+
+        with util.DownloaderSession() as session:
+            main_downloader = session.get_downloader("mp3")
+            self.assertIs(session.get_downloader("mp3"), main_downloader)
+
+            thread_downloaders = []
+            thread = threading.Thread(
+                target=lambda: thread_downloaders.append(session.get_downloader("mp3"))
+            )
+            thread.start()
+            thread.join()
+
+        self.assertIsNot(thread_downloaders[0], main_downloader)
+        mock_get_options.assert_called_once_with("mp3")
+
+    @patch("mac_utils.util.get_yt_dl_options")
+    def test_output_dir_sets_template(self, mock_get_options):
+        mock_get_options.side_effect = lambda media_type: dict(self.options)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_dir = str(Path(temp_dir) / "downloads")
+            with util.DownloaderSession() as session:
+                options = session.get_options("mp3", output_dir)
+
+            self.assertTrue(Path(output_dir).exists())
+        self.assertEqual(options["outtmpl"], str(Path(output_dir) / "%(title)s.%(ext)s"))
+
+
+class TestDownloadedFiles(unittest.TestCase):
+    def setUp(self):
+        use_temp_journal(self)
+
+    @patch("mac_utils.util.record_downloads")
+    @patch("mac_utils.util.tag_mp3_files")
+    @patch("mac_utils.history_manager.add_to_history")
+    @patch("mac_utils.history_manager.is_downloaded")
+    @patch("mac_utils.util.get_yt_dl_options")
+    @patch("yt_dlp.YoutubeDL")
+    def test_final_paths_come_from_post_processor(
+        self,
+        mock_YoutubeDL,
+        mock_get_options,
+        mock_is_downloaded,
+        mock_add,
+        mock_tag_mp3,
+        mock_record_downloads,
+    ):
+        """Test that tagging and history use the file yt-dlp reports, not a guess"""
+        mock_get_options.return_value = {"outtmpl": "%(title)s.%(ext)s"}
+        mock_is_downloaded.return_value = False
+        ydl_instance = MagicMock()
+        mock_YoutubeDL.return_value.__enter__.return_value = ydl_instance
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # yt-dlp sanitizes titles, so the file name differs from the title
+            final_path = Path(temp_dir) / "AC_DC - Song.mp3"
+            final_path.touch()
+            entry_info = {"title": "AC/DC - Song", "artist": "AC/DC"}
+
+            def extract_info(url, download):
+                # Run the post-processor the session registered, as yt-dlp would
+                collector = ydl_instance.add_post_processor.call_args.args[0]
+                download_info = {**entry_info, "filepath": str(final_path)}
+                collector.run(download_info)
+                # yt-dlp then strips the fields shared with the entry from its dict
+                download_info.pop("title")
+                download_info.pop("artist")
+                return entry_info
+
+            ydl_instance.extract_info.side_effect = extract_info
+
+            files = util.yt_dlp_download("https://soundcloud.com/acdc/song", "SoundCloud", "mp3")
+
+        self.assertEqual(files, [final_path])
+        ydl_instance.add_post_processor.assert_called_once()
+        self.assertEqual(ydl_instance.add_post_processor.call_args.kwargs, {"when": "after_move"})
+        mock_tag_mp3.assert_called_once_with(
+            [(final_path, {**entry_info, "filepath": str(final_path)})]
+        )
+        self.assertEqual(mock_add.call_args.kwargs["file_path"], str(final_path))
+        mock_record_downloads.assert_called_once_with(
+            [(final_path, {**entry_info, "filepath": str(final_path)})],
+            "https://soundcloud.com/acdc/song",
+        )
+
+    def test_downloads_from_info(self):
+        """Test the fallback that reads final paths from the info dict"""
+        info = {
+            "title": "Playlist",
+            "entries": [
+                {"title": "One", "requested_downloads": [{"filepath": "One.mp3"}]},
+                None,
+                {"title": "Two", "requested_downloads": [{"filepath": "Two.mp3"}]},
+            ],
+        }
+
+        downloads = util._downloads_from_info(info)
+
+        self.assertEqual([path for path, _ in downloads], [Path("One.mp3"), Path("Two.mp3")])
+        self.assertEqual(downloads[1][1]["title"], "Two")
+        self.assertEqual(util._downloads_from_info(None), [])
+
+    def test_collect_downloads_is_per_thread(self):
+        session = util.DownloaderSession()
+        session.record_download(Path("main.mp3"), {})
+        thread = threading.Thread(target=session.record_download, args=(Path("other.mp3"), {}))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(session.collect_downloads(), [(Path("main.mp3"), {})])
+        self.assertEqual(session.collect_downloads(), [])
+
+    def test_collector_keeps_a_copy_of_info(self):
+        """Test that yt-dlp changing its info dict after the post-processor ran is ignored"""
+        session = util.DownloaderSession()
+        collector = util._file_collector_class()(session)
+        info = {"title": "Song", "artist": "Artist", "filepath": "Song.mp3"}
+
+        collector.run(info)
+        info.clear()
+
+        self.assertEqual(
+            session.collect_downloads(),
+            [(Path("Song.mp3"), {"title": "Song", "artist": "Artist", "filepath": "Song.mp3"})],
+        )
+
 
 class TestMoveMp3FilesToItunes(unittest.TestCase):
     def setUp(self):
@@ -327,6 +868,14 @@ class TestMoveMp3FilesToItunes(unittest.TestCase):
         self.temp_dir = tempfile.TemporaryDirectory()
         self.temp_dir_path = self.temp_dir.name
 
+        # Keep the media index out of the user's home directory
+        drop_patcher = patch("mac_utils.util.drop_duplicate_files", side_effect=list)
+        self.mock_drop_duplicates = drop_patcher.start()
+        self.addCleanup(drop_patcher.stop)
+        update_patcher = patch("mac_utils.util.update_file_paths")
+        self.mock_update_file_paths = update_patcher.start()
+        self.addCleanup(update_patcher.stop)
+
     def test_move_mp3_files_to_music_folder(self):
         """Test moving mp3 files to itunes music folder"""
         # Create test MP3 files
@@ -357,6 +906,38 @@ class TestMoveMp3FilesToItunes(unittest.TestCase):
                 if dest_file.exists():
                     dest_file.unlink()
 
+    @patch("mac_utils.util.sort_files_by")
+    def test_move_given_files_only(self, mock_sort_files_by):
+        """Test that explicit files are moved without scanning the current directory"""
+        source_dir = Path(self.temp_dir_path) / "downloads"
+        source_dir.mkdir()
+        song = source_dir / "song.mp3"
+        song.touch()
+        music_folder = Path(self.temp_dir_path) / "Music"
+        music_folder.mkdir()
+
+        util.move_mp3_files_to_music_folder(str(music_folder), files=[song])
+
+        self.assertTrue((music_folder / "song.mp3").exists())
+        self.assertFalse(song.exists())
+        mock_sort_files_by.assert_not_called()
+        self.mock_update_file_paths.assert_called_once_with([(song, music_folder / "song.mp3")])
+
+    def test_duplicates_are_not_moved(self):
+        """Test that files already in the library are left out of the move"""
+        source_dir = Path(self.temp_dir_path) / "downloads"
+        source_dir.mkdir()
+        songs = [source_dir / "new.mp3", source_dir / "duplicate.mp3"]
+        for song in songs:
+            song.touch()
+        music_folder = Path(self.temp_dir_path) / "Music"
+        music_folder.mkdir()
+        self.mock_drop_duplicates.side_effect = lambda files: files[:1]
+
+        util.move_mp3_files_to_music_folder(str(music_folder), files=songs)
+
+        self.assertEqual([path.name for path in music_folder.iterdir()], ["new.mp3"])
+
     def test_move_mp3_files_no_files(self):
         """Test behavior when no MP3 files are present"""
         music_folder = Path(self.temp_dir_path) / "Music"
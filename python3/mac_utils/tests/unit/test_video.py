@@ -15,6 +15,11 @@ class TestMoveVideoFilesToDownloads(unittest.TestCase):
         self.temp_dir = tempfile.TemporaryDirectory()
         self.temp_dir_path = self.temp_dir.name
 
+        # Keep the media index out of the user's home directory
+        update_patcher = patch("mac_utils.video.update_file_paths")
+        self.mock_update_file_paths = update_patcher.start()
+        self.addCleanup(update_patcher.stop)
+
     def test_move_video_files_default_path(self):
         """Test moving video files to default Downloads folder"""
         # Create test video files
@@ -82,6 +87,23 @@ class TestMoveVideoFilesToDownloads(unittest.TestCase):
             if (custom_folder / "custom_test.mp4").exists():
                 (custom_folder / "custom_test.mp4").unlink()
 
+    @patch("mac_utils.video.sort_files_by")
+    def test_move_given_video_files(self, mock_sort_files_by):
+        """Test that explicit files are moved without scanning the current directory"""
+        source_file = Path(self.temp_dir_path) / "clip.mp4"
+        source_file.touch()
+        downloads_folder = Path(self.temp_dir_path) / "Downloads"
+        downloads_folder.mkdir()
+
+        video.move_video_files_to_downloads(str(downloads_folder), files=[source_file])
+
+        self.assertTrue((downloads_folder / "clip.mp4").exists())
+        self.mock_update_file_paths.assert_called_once_with(
+            [(source_file, downloads_folder / "clip.mp4")]
+        )
+        self.assertFalse(source_file.exists())
+        mock_sort_files_by.assert_not_called()
+
     def tearDown(self):
         self.temp_dir.cleanup()
 
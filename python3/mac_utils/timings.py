@@ -0,0 +1,194 @@
+"""Lightweight timing of pipeline stages
+
+Stages are wrapped in ``with span("name"):`` or decorated with ``@timed("name")``.
+Spans are only recorded while timing is enabled (the global ``--timings`` option);
+otherwise a span costs one flag check. yt-dlp's own stages - transfer and each
+post-processor - are timed through the hooks in ``progress_hook`` and
+``postprocessor_hook``.
+"""
+
+import json
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, List, Optional
+
+_enabled = False
+_lock = threading.Lock()
+# stage name -> [count, total seconds, max seconds]
+_stages: Dict[str, List[float]] = {}
+# Start times of running yt-dlp post-processors, per thread
+_local = threading.local()
+
+_NOOP = nullcontext()
+
+
+def enable() -> None:
+    """Start recording spans"""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop recording spans"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """Check whether spans are recorded"""
+    return _enabled
+
+
+def reset() -> None:
+    """Forget everything recorded so far"""
+    with _lock:
+        _stages.clear()
+
+
+def record(name: str, seconds: float) -> None:
+    """Record one run of a stage
+
+    Args:
+        name: Stage name, e.g. "history.lookup"
+        seconds: How long the run took
+    """
+    if not _enabled:
+        return
+    with _lock:
+        stats = _stages.get(name)
+        if stats is None:
+            _stages[name] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+
+class _Span:
+    """Context manager that records the time spent in its body"""
+
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        record(self.name, time.perf_counter() - self.started)
+
+
+def span(name: str) -> ContextManager:
+    """Time the body of a with block as one run of a stage
+
+    Args:
+        name: Stage name
+
+    Returns:
+        Context manager - a shared no-op when timing is disabled
+    """
+    return _Span(name) if _enabled else _NOOP
+
+
+def timed(name: str) -> Callable:
+    """Decorator that times each call of a function as one run of a stage
+
+    Args:
+        name: Stage name
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def progress_hook(d: Dict[str, Any]) -> None:
+    """yt-dlp progress hook that records transfer time of each finished file"""
+    if _enabled and d.get("status") == "finished" and d.get("elapsed") is not None:
+        record("yt-dlp.transfer", d["elapsed"])
+
+
+def postprocessor_hook(d: Dict[str, Any]) -> None:
+    """yt-dlp post-processor hook that records the time of each post-processor"""
+    if not _enabled:
+        return
+    name = d.get("postprocessor", "unknown")
+    if d.get("status") == "started":
+        if not hasattr(_local, "started"):
+            _local.started = {}
+        _local.started[name] = time.perf_counter()
+    elif d.get("status") == "finished":
+        started = getattr(_local, "started", {}).pop(name, None)
+        if started is not None:
+            record(f"yt-dlp.postprocess.{name}", time.perf_counter() - started)
+
+
+def summary() -> Dict[str, Dict[str, float]]:
+    """Get the recorded stages
+
+    Returns:
+        dict: count, total, mean and max seconds of each stage, by stage name
+    """
+    with _lock:
+        return {
+            name: {"count": count, "total": total, "mean": total / count, "max": longest}
+            for name, (count, total, longest) in sorted(_stages.items())
+        }
+
+
+def format_report(stages: Dict[str, Dict[str, float]], wall_seconds: Optional[float] = None) -> str:
+    """Format stages as a table, slowest first
+
+    Args:
+        stages: Stages from ``summary``
+        wall_seconds: Total run time, shown as a final row and used for percentages
+
+    Returns:
+        str: Multi-line report
+    """
+    header = f"{'Stage':<40} {'Count':>6} {'Total':>10} {'Mean':>10} {'Max':>10}"
+    if wall_seconds:
+        header += f" {'Share':>6}"
+    lines = ["⏱️  Timings:", header]
+    for name, stats in sorted(stages.items(), key=lambda item: -item[1]["total"]):
+        line = (
+            f"{name:<40} {stats['count']:>6} {stats['total']:>9.3f}s "
+            f"{stats['mean']:>9.3f}s {stats['max']:>9.3f}s"
+        )
+        if wall_seconds:
+            line += f" {stats['total'] / wall_seconds:>6.0%}"
+        lines.append(line)
+    if wall_seconds is not None:
+        lines.append(f"{'Total (wall clock)':<40} {'':>6} {wall_seconds:>9.3f}s")
+    return "\n".join(lines)
+
+
+def write_json(path: Path, stages: Dict[str, Dict[str, float]], **fields: Any) -> None:
+    """Append the stages of a run to a JSON Lines file
+
+    One line per run, so timings of many runs can be aggregated.
+
+    Args:
+        path: File to append to
+        stages: Stages from ``summary``
+        **fields: Extra fields for the line, e.g. command and wall_seconds
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = {"timestamp": datetime.now().isoformat(), **fields, "stages": stages}
+    with open(path, "a") as f:
+        f.write(json.dumps(line) + "\n")
@@ -0,0 +1,183 @@
+"""URL canonicalization for YouTube and SoundCloud
+
+Every spelling of a link to the same media - ``youtu.be`` short links,
+``m.youtube.com``, ``&list=`` and tracking parameters, pasted shell escapes -
+maps to one stable key such as ``youtube:dQw4w9WgXcQ`` or
+``soundcloud:artist/track``. Validation, history lookups and deduplication all
+use these keys. Patterns are compiled once at import.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+YOUTUBE = "YouTube"
+SOUNDCLOUD = "SoundCloud"
+
+# Backslashes added by shells when pasting URLs, e.g. watch\?v\=...
+_SHELL_ESCAPE_PATTERN = re.compile(r"\\([?=&])")
+_URL_PATTERN = re.compile(
+    r"^(?P<scheme>https?)://(?P<host>[^/?#]+)(?P<path>[^?#]*)(?:\?(?P<query>[^#]*))?",
+    re.IGNORECASE,
+)
+_WWW_PATTERN = re.compile(r"^(?:www|m|music)\.")
+
+_YOUTUBE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE_PATH_ID_PATTERN = re.compile(r"^/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})(?:/|$)")
+_YOUTUBE_VIDEO_PARAM_PATTERN = re.compile(r"(?:^|&)v=([A-Za-z0-9_-]{11})(?:&|$)")
+_YOUTUBE_LIST_PARAM_PATTERN = re.compile(r"(?:^|&)list=([A-Za-z0-9_-]+)(?:&|$)")
+
+_SOUNDCLOUD_PATH_PATTERN = re.compile(r"^/([a-z0-9_-]+)(?:/(sets/)?([a-z0-9_-]+))?/?$")
+# First path segments that are SoundCloud pages rather than users
+_SOUNDCLOUD_RESERVED = frozenset(
+    ["discover", "stream", "search", "charts", "upload", "settings", "you", "pages", "mobile"]
+)
+
+_YOUTUBE_HOSTS = frozenset(["youtube.com", "youtube-nocookie.com"])
+_SOUNDCLOUD_HOSTS = frozenset(["soundcloud.com"])
+
+
+class CanonicalUrl(NamedTuple):
+    """A recognised media URL"""
+
+    media_company: str
+    kind: str  # video, playlist, track, set, user or page
+    key: str  # stable key, e.g. youtube:dQw4w9WgXcQ
+    url: str  # canonical URL for the key
+
+
+def strip_shell_escapes(url: str) -> str:
+    """Remove backslashes shells add to pasted URLs, plus surrounding whitespace
+
+    Args:
+        url: URL as typed or pasted
+
+    Returns:
+        str: URL with ``\\?``, ``\\=`` and ``\\&`` unescaped
+    """
+    url = url.strip()
+    return _SHELL_ESCAPE_PATTERN.sub(r"\1", url) if "\\" in url else url
+
+
+def _parse_youtube(host: str, path: str, query: str) -> Optional[CanonicalUrl]:
+    """Canonicalize a URL on a YouTube host"""
+    if host == "youtu.be":
+        video_id = path.strip("/")
+        if not _YOUTUBE_ID_PATTERN.match(video_id):
+            return None
+    else:
+        match = _YOUTUBE_VIDEO_PARAM_PATTERN.search(query) if path == "/watch" else None
+        match = match or _YOUTUBE_PATH_ID_PATTERN.match(path)
+        video_id = match[1] if match else None
+
+    if video_id:
+        return CanonicalUrl(
+            YOUTUBE, "video", f"youtube:{video_id}", f"https://www.youtube.com/watch?v={video_id}"
+        )
+
+    if path == "/playlist":
+        match = _YOUTUBE_LIST_PARAM_PATTERN.search(query)
+        if match:
+            return CanonicalUrl(
+                YOUTUBE,
+                "playlist",
+                f"youtube:playlist:{match[1]}",
+                f"https://www.youtube.com/playlist?list={match[1]}",
+            )
+    return None
+
+
+def _parse_soundcloud(path: str) -> Optional[CanonicalUrl]:
+    """Canonicalize a URL on a SoundCloud host"""
+    match = _SOUNDCLOUD_PATH_PATTERN.match(path.lower())
+    if not match or match[1] in _SOUNDCLOUD_RESERVED:
+        return None
+
+    user, is_set, name = match.groups()
+    if not name:
+        kind, key = "user", user
+    elif is_set:
+        kind, key = "set", f"{user}/sets/{name}"
+    elif name in ("likes", "tracks", "reposts", "albums", "sets", "popular-tracks"):
+        kind, key = "user", f"{user}/{name}"
+    else:
+        kind, key = "track", f"{user}/{name}"
+    return CanonicalUrl(SOUNDCLOUD, kind, f"soundcloud:{key}", f"https://soundcloud.com/{key}")
+
+
+def parse_url(url: str) -> Optional[CanonicalUrl]:
+    """Canonicalize a YouTube or SoundCloud media URL
+
+    Args:
+        url: URL as typed or pasted
+
+    Returns:
+        CanonicalUrl or None: None if the URL is not a recognised video, playlist,
+            track, set or user URL
+    """
+    match = _URL_PATTERN.match(strip_shell_escapes(url))
+    if not match:
+        return None
+
+    host = _WWW_PATTERN.sub("", match["host"].lower().split(":", 1)[0])
+    path = match["path"] or "/"
+    if host in _YOUTUBE_HOSTS or host == "youtu.be":
+        return _parse_youtube(host, path, match["query"] or "")
+    if host in _SOUNDCLOUD_HOSTS:
+        return _parse_soundcloud(path)
+    return None
+
+
+def detect_media_company(url: str) -> Optional[str]:
+    """Get the media company a URL belongs to
+
+    Any page on a YouTube or SoundCloud host counts, e.g. channels.
+
+    Args:
+        url: URL as typed or pasted
+
+    Returns:
+        str or None: "YouTube", "SoundCloud" or None
+    """
+    match = _URL_PATTERN.match(strip_shell_escapes(url))
+    if not match or len(match["path"]) <= 1:
+        return None
+
+    host = _WWW_PATTERN.sub("", match["host"].lower().split(":", 1)[0])
+    if host in _YOUTUBE_HOSTS or host == "youtu.be":
+        return YOUTUBE
+    if host in _SOUNDCLOUD_HOSTS:
+        return SOUNDCLOUD
+    return None
+
+
+def _normalize_other_url(url: str) -> str:
+    """Normalize a URL that is not a recognised media URL
+
+    Args:
+        url: URL to normalize
+
+    Returns:
+        str: URL with shell escapes, fragment, ``www.`` and trailing slash removed
+            and the scheme and host lowercased
+    """
+    url = strip_shell_escapes(url).split("#", 1)[0]
+    match = _URL_PATTERN.match(url)
+    if match:
+        host = match["host"].lower()
+        host = host[4:] if host.startswith("www.") else host
+        url = f"{match['scheme'].lower()}://{host}{url[match.end('host'):]}"
+    return url.rstrip("/")
+
+
+def canonical_key(url: str) -> str:
+    """Get the stable key for a URL
+
+    Args:
+        url: URL as typed or pasted
+
+    Returns:
+        str: Canonical key (e.g. ``youtube:dQw4w9WgXcQ``) for media URLs, otherwise
+            the normalized URL
+    """
+    parsed = parse_url(url)
+    return parsed.key if parsed else _normalize_other_url(url)
@@ -1,16 +1,46 @@
+import copy
+import heapq
 import json
 import logging
+import os
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
-import yt_dlp
-from mutagen.easyid3 import EasyID3
-from mutagen.id3 import ID3NoHeaderError
+from . import jobs, metrics, progress, timings
+from .config_manager import get_config_value
+from .dedup import DuplicateFilter, drop_duplicate_files, record_downloads, update_file_paths
+from .mover import ProgressCallback, move_files
+from .retry import RetryPolicy
+from .snapshots import iter_snapshot_files
+from .tagging import find_artwork, tag_mp3_file, tag_mp3_files  # noqa: F401 - re-exported
+from .timings import span, timed
+from .urls import strip_shell_escapes
+
+# yt_dlp and mutagen are slow to import, so they are imported by the functions that
+# use them rather than at module load
 
 log = logging.getLogger(__name__)
 
+COOKIE_CACHE_FILE = Path.home() / ".mac-utils" / "cookies-cache.json"
+COOKIE_CACHE_TTL = 24 * 60 * 60  # seconds
+
+DEFAULT_APP_TIMEOUT = 30  # seconds
+DEFAULT_LAUNCH_WORKERS = 8
+APP_TIMEOUT_EXIT_CODE = 124
+
+# file name -> (mtime_ns, parsed data) of the JSON configs in mac_utils/config
+_json_config_cache: Dict[str, Tuple[int, Any]] = {}
+
+# browser -> (resolved_at, cookiesfrombrowser tuple or None if the browser is unavailable)
+_cookie_cache: Dict[str, Tuple[float, Optional[tuple]]] = {}
+_cookie_cache_lock = threading.Lock()
+
 
 def get_comp_user_name() -> str:
     """Get the name of the computer user"""
@@ -29,12 +59,104 @@ def get_itunes_music_folder() -> str:
     return f"/Users/{comp_user}/Music/Music/Media.localized/Automatically Add to Music.localized"
 
 
-def get_yt_dl_options(media_type: str, show_progress: bool = True) -> dict:
+def _load_cached_cookies(browser: str, ttl: int) -> Optional[Tuple[float, Optional[tuple]]]:
+    """Read an unexpired cookie resolution for a browser from the on-disk cache"""
+    try:
+        with open(COOKIE_CACHE_FILE) as f:
+            entry = json.load(f)[browser]
+        resolved_at = float(entry["resolved_at"])
+        cookies = entry["cookiesfrombrowser"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    if time.time() - resolved_at > ttl:
+        return None
+    return resolved_at, tuple(cookies) if cookies is not None else None
+
+
+def _save_cached_cookies(browser: str, resolved_at: float, cookies: Optional[tuple]) -> None:
+    """Write a cookie resolution for a browser to the on-disk cache"""
+    try:
+        with open(COOKIE_CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    cache[browser] = {"resolved_at": resolved_at, "cookiesfrombrowser": cookies}
+    try:
+        COOKIE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(COOKIE_CACHE_FILE, "w") as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        log.debug(f"Could not write cookie cache {COOKIE_CACHE_FILE}: {e}")
+
+
+@timed("cookies")
+def resolve_browser_cookies(
+    browser: str = "chrome", ttl: int = COOKIE_CACHE_TTL, persist: bool = True
+) -> Optional[tuple]:
+    """Resolve yt-dlp's ``cookiesfrombrowser`` option for a browser, with caching
+
+    Parsing ``--cookies-from-browser`` is expensive, so the result - including a
+    failure - is memoized in-process and, if ``persist`` is set, on disk for ``ttl``
+    seconds. Batch and playlist runs therefore resolve cookies once.
+
+    Args:
+        browser (str): Browser to load cookies from (default: "chrome")
+        ttl (int): Seconds a resolution stays valid (default: 24 hours)
+        persist (bool): Whether to also cache the result on disk (default: True)
+
+    Returns:
+        tuple or None: Value for the ``cookiesfrombrowser`` option, or None if the
+            browser's cookies are unavailable
+    """
+    with _cookie_cache_lock:
+        cached = _cookie_cache.get(browser)
+        if cached and time.time() - cached[0] <= ttl:
+            return cached[1]
+
+        cached = _load_cached_cookies(browser, ttl) if persist else None
+        if cached:
+            _cookie_cache[browser] = cached
+            return cached[1]
+
+        import yt_dlp
+
+        cookies: Optional[tuple]
+        try:
+            cookies = yt_dlp.parse_options(["--cookies-from-browser", browser]).ydl_opts[
+                "cookiesfrombrowser"
+            ]
+        except Exception as e:
+            log.warning(
+                f"Could not load {browser.title()} cookies "
+                f"({browser.title()} may not be installed): {str(e)}"
+            )
+            log.warning("Continuing without browser cookies - some downloads may fail")
+            cookies = None
+
+        resolved_at = time.time()
+        _cookie_cache[browser] = (resolved_at, cookies)
+        if persist:
+            _save_cached_cookies(browser, resolved_at, cookies)
+        return cookies
+
+
+def clear_cookie_cache() -> None:
+    """Forget cached cookie resolutions, in-process and on disk"""
+    with _cookie_cache_lock:
+        _cookie_cache.clear()
+        COOKIE_CACHE_FILE.unlink(missing_ok=True)
+
+
+@timed("yt-dlp.options")
+def get_yt_dl_options(media_type: str, show_progress: Optional[bool] = None) -> dict:
     """Get download options for YouTube DL
 
     Args:
         media_type (str): Type of media ('mp3' or 'video')
-        show_progress (bool): Whether to show download progress (default: True)
+        show_progress (bool): Whether to show download progress
+            (default: the show_progress config value)
 
     Returns:
         dict: yt-dlp options dictionary
@@ -44,6 +166,8 @@ def get_yt_dl_options(media_type: str, show_progress: bool = True) -> dict:
     """
     if media_type not in ["mp3", "video"]:
         raise ValueError("Media type must be either 'mp3' or 'video'")
+    if show_progress is None:
+        show_progress = get_config_value("show_progress", True)
 
     if media_type == "mp3":
         # example cli command
@@ -59,8 +183,13 @@ def get_yt_dl_options(media_type: str, show_progress: bool = True) -> dict:
                     "key": "FFmpegExtractAudio",
                     "preferredcodec": "mp3",
                     "preferredquality": "192",
-                }
+                },
+                # Cover art is embedded by tag_mp3_file; convert it to a format Apple Music shows
+                {"key": "FFmpegThumbnailsConvertor", "format": "jpg", "when": "before_dl"},
             ],
+            "writethumbnail": True,
+            # yt-dlp's own progress line is replaced by yt_dl_progress_hook
+            "noprogress": True,
         }
 
         # Add progress hook if enabled
@@ -68,14 +197,9 @@ def get_yt_dl_options(media_type: str, show_progress: bool = True) -> dict:
             options["progress_hooks"] = [yt_dl_progress_hook]
 
         # Try to add Chrome cookies, but don't fail if Chrome is not available
-        try:
-            cookies = yt_dlp.parse_options(["--cookies-from-browser", "chrome"]).ydl_opts[
-                "cookiesfrombrowser"
-            ]
+        cookies = resolve_browser_cookies("chrome")
+        if cookies:
             options["cookiesfrombrowser"] = cookies
-        except Exception as e:
-            log.warning(f"Could not load Chrome cookies (Chrome may not be installed): {str(e)}")
-            log.warning("Continuing without browser cookies - some downloads may fail")
 
         return options
 
@@ -86,6 +210,7 @@ def get_yt_dl_options(media_type: str, show_progress: bool = True) -> dict:
         "ignoreerrors": False,
         "outtmpl": "%(title)s.%(ext)s",
         "merge_output_format": "mp4",
+        "noprogress": True,
     }
 
     # Add progress hook if enabled
@@ -96,17 +221,12 @@ def get_yt_dl_options(media_type: str, show_progress: bool = True) -> dict:
 
 
 def yt_dl_progress_hook(d: dict[str, Any]) -> None:
-    """YouTube DL hook to show download progress"""
-    if d["status"] == "downloading":
-        # Extract progress information
-        percent = d.get("_percent_str", "N/A")
-        speed = d.get("_speed_str", "N/A")
-        eta = d.get("_eta_str", "N/A")
-
-        # Print progress on same line
-        print(f"\rDownloading: {percent} | Speed: {speed} | ETA: {eta}", end="", flush=True)
-    elif d["status"] == "finished":
-        print()  # New line after download completes
+    """YouTube DL hook to show download progress
+
+    Progress of all downloads is drawn by the shared, throttled ``progress.reporter``.
+    """
+    progress.reporter.hook(d)
+    if d["status"] == "finished":
         log.info(f"Done downloading, now converting file {d.get('filename', 'file')}")
 
 
@@ -125,106 +245,281 @@ def get_json_config(file_name: str) -> dict:
     # Get config path relative to this module's location
     config_path = Path(__file__).parent / "config" / f"{file_name}.json"
 
-    if not config_path.exists():
+    try:
+        mtime_ns = config_path.stat().st_mtime_ns
+    except FileNotFoundError:
         raise FileNotFoundError(f"Config file not found: {config_path}")
 
-    with open(config_path) as f:
-        return json.load(f)
+    # Parsed once per change of the file; callers get their own copy to modify
+    cached = _json_config_cache.get(file_name)
+    if cached is None or cached[0] != mtime_ns:
+        with open(config_path) as f:
+            cached = (mtime_ns, json.load(f))
+        _json_config_cache[file_name] = cached
+    return copy.deepcopy(cached[1])
+
 
+def open_app(dir: str, app: str, timeout: Optional[float] = DEFAULT_APP_TIMEOUT) -> int:
+    """open a single application
 
-def open_app(dir: str, app: str) -> int:
-    """open a single application"""
+    Args:
+        dir (str): Folder the application is in
+        app (str): Application name, without ".app"
+        timeout (float, optional): Seconds to wait for ``open`` before giving up
+
+    Returns:
+        int: Exit code of ``open`` (124 if it timed out)
+    """
     log.info(f"Dir: {dir} - Opening {app}...")
     try:
         result = subprocess.run(
-            ["open", f"{dir}/{app}.app"], check=True, capture_output=True, text=True
+            ["open", f"{dir}/{app}.app"],
+            check=True,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
         )
         return result.returncode
     except subprocess.CalledProcessError as e:
         log.error(f"Failed to open {app}: {e.stderr}")
         return e.returncode
+    except subprocess.TimeoutExpired:
+        log.error(f"Timed out opening {app} after {timeout}s")
+        return APP_TIMEOUT_EXIT_CODE
     except FileNotFoundError:
         log.error("'open' command not found. This utility requires macOS.")
         return 1
 
 
-def open_apps(type: str) -> None:
-    """open applications
+def get_app_list(type: str, profile: str = "apps") -> List[Tuple[str, str]]:
+    """Get the applications configured in my-apps.json
 
     Args:
-        type (str): Type of applications to open. Can be "installed" or "system"
+        type (str): Type of applications: "installed", "system" or "music"
+        profile (str): List to use, e.g. "apps" or "full" (default: "apps")
+
+    Returns:
+        list: (folder, application name) pairs
+
+    Raises:
+        ValueError: Unknown type or profile
     """
     if type not in ["installed", "system", "music"]:
         raise ValueError("Type must be either 'installed' or 'system'")
 
     data = get_json_config("my-apps")[type]
+    if profile not in data or profile == "path":
+        raise ValueError(f"No '{profile}' app list for {type} applications")
+    return [(data["path"], app) for app in data[profile]]
 
-    for app in data["apps"]:
-        open_app(data["path"], app)
 
+def launch_apps(
+    apps: List[Tuple[str, str]],
+    timeout: Optional[float] = DEFAULT_APP_TIMEOUT,
+    workers: int = DEFAULT_LAUNCH_WORKERS,
+) -> Dict[str, int]:
+    """Open applications concurrently
 
-def sort_files_by(path_to_folder: str, file_type: str, sort_by: str) -> list[Path]:
-    """Sort files in folder by name, date, file type, or size
+    Total time is bounded by the slowest launch instead of the sum of all of them.
 
     Args:
-        path_to_folder (str): Path to folder
-        file_type (str): File type to filter by
-        sort_by (str): Sort by name, date, file type, or size
+        apps (list): (folder, application name) pairs
+        timeout (float, optional): Seconds to wait for each application
+        workers (int): Maximum number of applications opened at once
+
+    Returns:
+        dict: Application name -> exit code of ``open``, in the given order
     """
-    directory = Path(path_to_folder)
-    filtered_files = []
-    if file_type == "all":
-        filtered_files = [file for file in directory.iterdir() if file.is_file()]
-    else:
-        filtered_files = [
-            file
-            for file in directory.iterdir()
-            if file.is_file() and file.suffix.lower() == f".{file_type}"
-        ]
+    started_at = time.monotonic()
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(workers, len(apps))), thread_name_prefix="mac-utils-open"
+    ) as executor:
+        futures = [executor.submit(open_app, dir, app, timeout=timeout) for dir, app in apps]
+        results = {app: future.result() for (_, app), future in zip(apps, futures)}
+
+    failed = {app: code for app, code in results.items() if code != 0}
+    log.info(
+        f"Opened {len(results) - len(failed)} of {len(results)} app(s) "
+        f"in {time.monotonic() - started_at:.1f}s"
+    )
+    if failed:
+        log.warning(
+            "Failed to open: " + ", ".join(f"{app} (exit {code})" for app, code in failed.items())
+        )
+    return results
 
-    if sort_by == "name":
-        filtered_files.sort(key=lambda f: f.name)
-    elif sort_by == "date":
-        filtered_files.sort(key=lambda f: f.stat().st_ctime)
-    return filtered_files
 
+def open_apps(
+    type: str, profile: str = "apps", timeout: Optional[float] = DEFAULT_APP_TIMEOUT
+) -> Dict[str, int]:
+    """open applications
 
-# YouTube DL/SoundCloud DL
-def tag_mp3_file(file_path: Path, metadata: Dict[str, Any]) -> None:
-    """Add ID3 tags to an MP3 file
+    Args:
+        type (str): Type of applications to open. Can be "installed", "system" or "music"
+        profile (str): App list to open, e.g. "apps" or "full" (default: "apps")
+        timeout (float, optional): Seconds to wait for each application
+
+    Returns:
+        dict: Application name -> exit code of ``open``
+    """
+    return launch_apps(get_app_list(type, profile), timeout=timeout)
+
+
+class FileEntry:
+    """A file found by ``iter_files``, with its stat values read once"""
+
+    __slots__ = ("path", "name", "suffix", "size", "mtime", "ctime")
+
+    def __init__(
+        self,
+        path: str,
+        size: Optional[int] = None,
+        mtime: Optional[float] = None,
+        ctime: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            path: Path to the file
+            size: Size in bytes, if known
+            mtime: Modification time, if known
+            ctime: Creation (metadata change) time, if known
+        """
+        self.path = Path(path)
+        self.name = self.path.name
+        self.suffix = os.path.splitext(self.name)[1].lower()
+        self.size = size
+        self.mtime = mtime
+        self.ctime = ctime
+
+    @classmethod
+    def from_dir_entry(cls, entry: os.DirEntry, with_stat: bool = True) -> "FileEntry":
+        """Build an entry from ``os.scandir`` output
+
+        Args:
+            entry: Directory entry
+            with_stat: Read size and times (one stat call). Otherwise they are None
+
+        Returns:
+            FileEntry: Entry for the file
+        """
+        if not with_stat:
+            return cls(entry.path)
+        stat = entry.stat()
+        return cls(entry.path, stat.st_size, stat.st_mtime, stat.st_ctime)
+
+    def __fspath__(self) -> str:
+        return str(self.path)
+
+    def __repr__(self) -> str:
+        return f"FileEntry({str(self.path)!r})"
+
+
+# sort_by -> (sort key, whether the key needs stat values)
+SORT_KEYS: Dict[str, Tuple[Callable[[FileEntry], Any], bool]] = {
+    "name": (lambda f: f.name, False),
+    "date": (lambda f: (f.ctime, f.name), True),
+    "size": (lambda f: (f.size, f.name), True),
+    "type": (lambda f: (f.suffix, f.name), False),
+}
+
+
+def iter_files(
+    path_to_folder: str, file_type: str, with_stat: bool = True, recursive: bool = False
+) -> Iterator[FileEntry]:
+    """Yield the files in a folder as ``os.scandir`` lists them
+
+    File type checks use the directory listing, so the only per-file syscall is
+    the stat behind ``with_stat``. Nothing is collected, so huge trees can be
+    streamed.
 
     Args:
-        file_path: Path to the MP3 file
-        metadata: Metadata dictionary from yt-dlp
+        path_to_folder (str): Path to folder
+        file_type (str): File extension to filter by, or "all"
+        with_stat (bool): Read size and times for each file
+        recursive (bool): Also walk sub folders (symlinked folders are not followed)
+
+    Yields:
+        FileEntry: Each matching file, in directory order
     """
-    try:
-        # Try to load existing tags or create new ones
+    suffix = None if file_type == "all" else f".{file_type.lower().lstrip('.')}"
+    folders = [path_to_folder]
+    while folders:
+        folder = folders.pop()
         try:
-            audio = EasyID3(file_path)
-        except ID3NoHeaderError:
-            # No ID3 tags exist, create them
-            audio = EasyID3()
-            audio.save(file_path)
-            audio = EasyID3(file_path)
-
-        # Add available metadata
-        if metadata.get("title"):
-            audio["title"] = metadata["title"]
-        if metadata.get("artist") or metadata.get("uploader"):
-            audio["artist"] = metadata.get("artist") or metadata.get("uploader")
-        if metadata.get("album"):
-            audio["album"] = metadata["album"]
-        if metadata.get("upload_date"):
-            # Convert YYYYMMDD to YYYY
-            date = metadata["upload_date"]
-            audio["date"] = date[:4] if len(date) >= 4 else date
-
-        audio.save()
-        log.debug(f"Tagged MP3 file: {file_path.name}")
-    except Exception as e:
-        log.warning(f"Could not tag MP3 file {file_path.name}: {str(e)}")
+            entries = os.scandir(folder)
+        except OSError as e:
+            if folder == path_to_folder:
+                raise
+            log.warning(f"Skipping folder {folder}: {str(e)}")
+            continue
+
+        with entries:
+            for entry in entries:
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                    continue
+                if suffix and not entry.name.lower().endswith(suffix):
+                    continue
+                if entry.is_file():
+                    yield FileEntry.from_dir_entry(entry, with_stat=with_stat)
+
+
+@timed("sort")
+def sort_files_by(
+    path_to_folder: str,
+    file_type: str,
+    sort_by: str,
+    recursive: bool = False,
+    top: Optional[int] = None,
+    reverse: bool = False,
+    use_index: bool = False,
+) -> List[FileEntry]:
+    """Sort files in folder by name, date, file type, or size
+
+    With ``top``, only the first N files are kept, using a heap while the folder is
+    streamed, so memory stays bounded by N instead of the number of files.
+
+    With ``use_index``, files are listed from the folder's snapshot (see
+    ``snapshots``), which only rescans folders that changed since the last run.
+
+    Args:
+        path_to_folder (str): Path to folder
+        file_type (str): File type to filter by
+        sort_by (str): Sort by name, date (created), type (extension), or size
+        recursive (bool): Include files in sub folders
+        top (int, optional): Only return the first N files of the sorted order
+        reverse (bool): Sort descending, e.g. newest or largest first
+        use_index (bool): List files from the on-disk snapshot index
+
+    Returns:
+        list: Sorted file entries - use ``.path`` for the file's Path
 
+    Raises:
+        ValueError: Unknown sort_by value or top below 1
+    """
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Sort by must be one of: {', '.join(SORT_KEYS)}")
+    if top is not None and top < 1:
+        raise ValueError("Top must be at least 1")
+
+    sort_key, needs_stat = SORT_KEYS[sort_by]
+    files: Iterator[FileEntry]
+    if use_index:
+        suffix = None if file_type == "all" else f".{file_type.lower().lstrip('.')}"
+        files = (
+            FileEntry(*file)
+            for file in iter_snapshot_files(path_to_folder, recursive=recursive)
+            if not suffix or file[0].lower().endswith(suffix)
+        )
+    else:
+        files = iter_files(path_to_folder, file_type, with_stat=needs_stat, recursive=recursive)
+    if top is not None:
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return select(top, files, key=sort_key)
+    return sorted(files, key=sort_key, reverse=reverse)
 
+
+# YouTube DL/SoundCloud DL
 def clean_url(url: str, media_company: str) -> str:
     """Clean URL to be used for downloading
 
@@ -235,38 +530,211 @@ def clean_url(url: str, media_company: str) -> str:
     if media_company.lower() != "youtube":
         return url
 
-    # If YouTube URL
-    if "watch\\?v\\=" in url:
-        # Handle copy/paste from YouTube to terminal where backslashes are added
-        return url.replace("watch\\?v\\=", "watch?v=")
-    return url
+    # Handle copy/paste from YouTube to terminal where backslashes are added
+    return strip_shell_escapes(url)
+
+
+# (final file path, yt-dlp info dict for that file)
+DownloadedFile = Tuple[Path, Dict[str, Any]]
+
+
+@lru_cache(maxsize=None)
+def _file_collector_class() -> type:
+    """Build the post-processor class that reports final file paths to a session
+
+    The class is created lazily because subclassing yt-dlp's PostProcessor requires
+    importing yt_dlp.
+    """
+    from yt_dlp.postprocessor.common import PostProcessor
+
+    class DownloadedFileCollector(PostProcessor):
+        """Runs after yt-dlp has converted and moved a file into place"""
+
+        def __init__(self, session: "DownloaderSession") -> None:
+            super().__init__()
+            self.session = session
+
+        def run(self, info: Dict[str, Any]) -> Tuple[list, Dict[str, Any]]:
+            if info.get("filepath"):
+                # Copy: yt-dlp strips the fields shared with the video from this dict later
+                self.session.record_download(Path(info["filepath"]), dict(info))
+            return [], info
+
+    return DownloadedFileCollector
+
+
+def _downloads_from_info(info: Optional[Dict[str, Any]]) -> List[DownloadedFile]:
+    """Get final file paths recorded in a yt-dlp info dict (including playlist entries)"""
+    if not info:
+        return []
+
+    downloads = [
+        (Path(download["filepath"]), info)
+        for download in info.get("requested_downloads") or []
+        if download.get("filepath")
+    ]
+    for entry in info.get("entries") or []:
+        downloads.extend(_downloads_from_info(entry))
+    return downloads
+
+
+class DownloaderSession:
+    """Reusable yt-dlp downloaders for retries and multi-URL runs
+
+    Creating a ``YoutubeDL`` initializes every extractor, loads the cookie jar and
+    opens a fresh HTTP connection pool. A session builds the options once per
+    (media type, output directory) and keeps one warm ``YoutubeDL`` per thread for
+    each of them, since ``YoutubeDL`` instances are not thread safe.
+
+    Each downloader reports the final path of every file it writes (after FFmpeg
+    conversion and moving), which ``collect_downloads`` hands back per thread.
+
+    Example:
+        with DownloaderSession() as session:
+            for url in urls:
+                yt_dlp_download(url, "SoundCloud", "mp3", session=session)
+    """
+
+    def __init__(self) -> None:
+        self._options: Dict[Tuple[str, Optional[str]], dict] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stack = ExitStack()
+        # Skips media already downloaded from another URL, see yt_dlp_download
+        self.duplicate_filter = DuplicateFilter()
+
+    def get_options(self, media_type: str, output_dir: str = None) -> dict:
+        """Get the yt-dlp options for a media type, building them on first use
+
+        Args:
+            media_type (str): Type of media ('mp3' or 'video')
+            output_dir (str): Custom output directory (default: current directory)
+
+        Returns:
+            dict: yt-dlp options dictionary
+        """
+        key = (media_type, output_dir)
+        with self._lock:
+            if key not in self._options:
+                options = get_yt_dl_options(media_type)
+
+                # Set custom output directory if provided
+                if output_dir:
+                    output_path = Path(output_dir)
+                    if not output_path.exists():
+                        output_path.mkdir(parents=True, exist_ok=True)
+                    options["outtmpl"] = str(output_path / "%(title)s.%(ext)s")
+
+                self._options[key] = options
+            return self._options[key]
+
+    def get_downloader(self, media_type: str, output_dir: str = None) -> Any:
+        """Get this thread's ``YoutubeDL`` for a media type, creating it on first use
+
+        Args:
+            media_type (str): Type of media ('mp3' or 'video')
+            output_dir (str): Custom output directory (default: current directory)
+
+        Returns:
+            yt_dlp.YoutubeDL: Downloader that stays open until the session is closed
+        """
+        import yt_dlp
+
+        downloaders = getattr(self._local, "downloaders", None)
+        if downloaders is None:
+            downloaders = self._local.downloaders = {}
+
+        key = (media_type, output_dir)
+        if key not in downloaders:
+            options = dict(self.get_options(media_type, output_dir))
+            options["match_filter"] = self.duplicate_filter
+            # Time transfers and post-processors for --timings (no-ops unless enabled)
+            # and count transferred bytes for --metrics-file. The job journal records
+            # partial files so interrupted downloads resume on the next run
+            options["progress_hooks"] = [
+                *options.get("progress_hooks", []),
+                timings.progress_hook,
+                metrics.progress_hook,
+                jobs.journal.progress_hook,
+            ]
+            options["postprocessor_hooks"] = [timings.postprocessor_hook]
+            with self._lock, span("yt-dlp.init"):
+                ydl = self._stack.enter_context(yt_dlp.YoutubeDL(options))
+            ydl.add_post_processor(_file_collector_class()(self), when="after_move")
+            downloaders[key] = ydl
+        return downloaders[key]
+
+    def record_download(self, file_path: Path, info: Dict[str, Any]) -> None:
+        """Record a file written by this thread's downloader
+
+        Args:
+            file_path: Final path of the file
+            info: yt-dlp info dict for the file
+        """
+        if not hasattr(self._local, "downloads"):
+            self._local.downloads = []
+        self._local.downloads.append((file_path, info))
+
+    def collect_downloads(self) -> List[DownloadedFile]:
+        """Return and forget the files recorded on this thread
+
+        Returns:
+            list: (file path, info dict) pairs in the order they were written
+        """
+        downloads = getattr(self._local, "downloads", [])
+        self._local.downloads = []
+        return downloads
+
+    def close(self) -> None:
+        """Close every downloader created by this session"""
+        with self._lock:
+            self._stack.close()
+            self._options.clear()
+        self._local = threading.local()
+
+    def __enter__(self) -> "DownloaderSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
 
 def yt_dlp_download(
     url: str,
     media_company: str,
     media_type: str,
-    max_retries: int = 3,
-    retry_delay: int = 2,
+    max_retries: Optional[int] = None,
+    retry_delay: Optional[float] = None,
     dry_run: bool = False,
     output_dir: str = None,
     force: bool = False,
-) -> None:
+    session: Optional[DownloaderSession] = None,
+) -> List[Path]:
     """YouTube DL download with retry logic
 
     Args:
         url (str): Media URL to download
         media_company (str): Media company to download from
         media_type (str): Media type to download
-        max_retries (int): Maximum number of retry attempts (default: 3)
-        retry_delay (int): Seconds to wait between retries (default: 2)
+        max_retries (int): Maximum number of attempts (default: retry_count config key)
+        retry_delay (float): Seconds to wait before the first retry; later retries back
+            off exponentially (default: retry_delay config key)
         dry_run (bool): If True, only show what would be downloaded (default: False)
         output_dir (str): Custom output directory (default: current directory)
-        force (bool): If True, download even if URL exists in history (default: False)
+        force (bool): If True, download even if URL exists in history or the same media
+            was downloaded from another URL (default: False)
+        session (DownloaderSession): Session to reuse downloaders from - pass one
+            when downloading several URLs (default: a session for this URL only)
+
+    Returns:
+        list: Final paths of the downloaded files, as reported by yt-dlp (empty when
+            the download was skipped or is a dry run)
 
     Raises:
-        Exception: If download fails after all retries
+        Exception: If download fails with a fatal error or after all retries
     """
+    from yt_dlp.utils import DownloadError
+
     from .history_manager import add_to_history, get_download_info, is_downloaded
 
     cleaned_url = clean_url(url, media_company)
@@ -277,86 +745,129 @@ def yt_dlp_download(
         log.info(f"⏭️  Skipping - already downloaded: {info.get('title', url)}")
         log.info(f"   Downloaded on: {info.get('timestamp', 'unknown')}")
         log.info("   Use --force to download anyway")
-        return
+        metrics.inc("skipped", reason="history")
+        return []
 
     if dry_run:
         log.info(f"[DRY RUN] Would download {media_type} from {media_company}: {url}")
         if output_dir:
             log.info(f"[DRY RUN] Output directory: {output_dir}")
-        return
-
-    options = get_yt_dl_options(media_type)
-
-    # Set custom output directory if provided
-    if output_dir:
-        output_path = Path(output_dir)
-        if not output_path.exists():
-            output_path.mkdir(parents=True, exist_ok=True)
-        options["outtmpl"] = str(output_path / "%(title)s.%(ext)s")
+        return []
 
+    policy = RetryPolicy.from_config(max_retries, retry_delay)
+    skip_duplicates = not force and get_config_value("skip_duplicates", True)
+    started_at = time.monotonic()
     last_exception = None
     downloaded_title = None
-    downloaded_path = None
-    metadata = None
 
-    for attempt in range(max_retries):
-        try:
-            with yt_dlp.YoutubeDL(options) as ydl:
+    # Downloaders are reused across retries, and across URLs when a session is passed in.
+    # Partial files of an interrupted earlier run are moved to where yt-dlp resumes them
+    with (
+        nullcontext(session) if session else DownloaderSession() as active_session,
+        jobs.journal.track(url, media_type, Path(output_dir or ".")),
+    ):
+        for attempt in range(1, policy.max_attempts + 1):
+            try:
+                ydl = active_session.get_downloader(media_type, output_dir)
+                # Drop anything recorded by a failed attempt
+                active_session.collect_downloads()
+                active_session.duplicate_filter.reset(enabled=skip_duplicates)
                 # Extract info to get title and metadata before downloading
-                info = ydl.extract_info(cleaned_url, download=True)
+                with span("yt-dlp"):
+                    info = ydl.extract_info(cleaned_url, download=True)
+                downloads = active_session.collect_downloads() or _downloads_from_info(info)
                 if info:
                     downloaded_title = info.get("title", "Unknown")
-                    metadata = info
-                    # Build the expected file path
-                    if output_dir:
-                        downloaded_path = str(Path(output_dir) / f"{downloaded_title}.{media_type}")
-                    else:
-                        downloaded_path = f"{downloaded_title}.{media_type}"
-
-            log.info(f"Successfully downloaded {media_company} {media_type}!")
-
-            # Tag MP3 files with metadata
-            if media_type == "mp3" and metadata and downloaded_path:
-                file_path = Path(downloaded_path)
-                if file_path.exists():
-                    tag_mp3_file(file_path, metadata)
-                else:
-                    # File might be in current directory if output_dir wasn't specified
-                    # and the actual filename might have a different extension before conversion
-                    # Try to find it by looking for files with the title
-                    current_dir_path = Path(f"{downloaded_title}.mp3")
-                    if current_dir_path.exists():
-                        tag_mp3_file(current_dir_path, metadata)
-
-            # Add to history
-            add_to_history(
-                url=url,
-                title=downloaded_title or "Unknown",
-                media_type=media_type,
-                file_path=downloaded_path,
-            )
 
-            return  # Success - exit function
-        except Exception as e:
-            last_exception = e
-            if attempt < max_retries - 1:
+                duplicates = active_session.duplicate_filter.skipped
+                if duplicates and not downloads:
+                    # Same media already downloaded from another URL
+                    log.info(f"⏭️  Skipping - already in library: {downloaded_title or url}")
+                    log.info("   Use --force to download anyway")
+                    add_to_history(
+                        url=url,
+                        title=downloaded_title or "Unknown",
+                        media_type=media_type,
+                        file_path=duplicates[0]["file_path"] if len(duplicates) == 1 else None,
+                    )
+                    metrics.inc("skipped", reason="duplicate")
+                    jobs.journal.finish(url)
+                    return []
+
+                empty_playlist = bool(info) and info.get("_type") == "playlist"
+                if not downloads and not (empty_playlist and not info.get("entries")):
+                    # With ignoreerrors (MP3s) yt-dlp reports a failed extraction or
+                    # download and returns None or info without files instead of raising
+                    raise DownloadError(f"Nothing was downloaded from {url}")
+
+                log.info(f"Successfully downloaded {media_company} {media_type}!")
+
+                # Tag MP3 files with the metadata of the entry they were downloaded from
+                if media_type == "mp3":
+                    mp3_files = [
+                        (file_path, file_info)
+                        for file_path, file_info in downloads
+                        if file_path.suffix.lower() == ".mp3" and file_path.exists()
+                    ]
+                    tag_mp3_files(mp3_files)
+                    # Thumbnails are only written to be embedded as cover art
+                    for _, file_info in mp3_files:
+                        artwork = find_artwork(file_info)
+                        if artwork:
+                            artwork.unlink(missing_ok=True)
+
+                record_downloads(downloads, url)
+                # Add to history
+                add_to_history(
+                    url=url,
+                    title=downloaded_title or "Unknown",
+                    media_type=media_type,
+                    file_path=str(downloads[0][0]) if len(downloads) == 1 else None,
+                )
+                metrics.inc("downloads", media_type=media_type)
+                metrics.inc("files_downloaded", len(downloads), media_type=media_type)
+                jobs.journal.finish(url)
+
+                return [file_path for file_path, _ in downloads]  # Success - exit function
+            except Exception as e:
+                last_exception = e
+                delay = policy.next_delay(attempt, e, time.monotonic() - started_at)
+                if delay is None:
+                    log.error(
+                        f"Unable to download url: {url} after {attempt} attempt(s) - {str(e)}"
+                    )
+                    metrics.inc("failures", media_type=media_type)
+                    break
                 log.warning(
-                    f"Download attempt {attempt + 1} failed: {str(e)}.\n"
-                    f"Retrying in {retry_delay}s..."
+                    f"Download attempt {attempt} failed: {str(e)}.\nRetrying in {delay:.1f}s..."
                 )
-                time.sleep(retry_delay)
-            else:
-                log.error(f"Unable to download url: {url} after {max_retries} attempts - {str(e)}")
+                metrics.inc("retries")
+                time.sleep(delay)
 
-    # If we get here, all retries failed
+    # If we get here, the error was fatal or all retries failed
     raise last_exception
 
 
-def move_mp3_files_to_music_folder(custom_path: str = "") -> None:
+@timed("move")
+def move_mp3_files_to_music_folder(
+    custom_path: str = "",
+    files: Optional[List[Path]] = None,
+    progress: Optional[ProgressCallback] = None,
+    force: bool = False,
+) -> None:
     """Move downloaded mp3 files to the Apple Music folder
 
+    Files are moved in parallel and safely across filesystems, e.g. to a Music
+    library on an external drive. Existing files are never overwritten, and files
+    whose audio is already in the library are deleted instead of moved.
+
     Args:
         custom_path (str, optional): Path to mp3s - Defaults to ""
+        files (list, optional): Files to move, e.g. as returned by ``yt_dlp_download``.
+            Defaults to every mp3 in the current directory
+        progress (callable, optional): Called as (file, bytes_moved, total_bytes)
+        force (bool, optional): If True, keep files whose audio is already in the
+            library. Defaults to False
 
     Raises:
         ValueError: Music folder path does not exist
@@ -365,11 +876,19 @@ def move_mp3_files_to_music_folder(custom_path: str = "") -> None:
     if not music_folder_path.exists():
         raise ValueError(f"Path {music_folder_path} does not exist")
 
-    # Sort files by creation time
-    # sorted_file_paths = sorted(mp3_file_paths, key=lambda x: x.stat().st_ctime)
-    sorted_file_paths = sort_files_by("./", "mp3", "date")
-    for file_path in sorted_file_paths:
-        file = file_path.name
-        log.info(f"Moving file {file} to Itunes Music folder...")
-        dest = music_folder_path / file
-        file_path.rename(dest)
+    if files is None:
+        # Sort files by creation time
+        files = [entry.path for entry in sort_files_by("./", "mp3", "date")]
+    if not force and get_config_value("skip_duplicates", True):
+        files = drop_duplicate_files(files)
+    for file_path in files:
+        log.info(f"Moving file {file_path.name} to Itunes Music folder...")
+
+    moves: List[Tuple[Path, Path]] = []
+    move_files(
+        files,
+        music_folder_path,
+        progress=progress,
+        on_moved=lambda source, dest: moves.append((source, dest)),
+    )
+    update_file_paths(moves)
@@ -1,16 +1,31 @@
 import logging
 from pathlib import Path
+from typing import List, Optional, Tuple
 
+from .dedup import update_file_paths
+from .mover import ProgressCallback, move_files
+from .timings import timed
 from .util import sort_files_by, yt_dlp_download
 
 log = logging.getLogger(__name__)
 
 
-def move_video_files_to_downloads(custom_path: str = "") -> None:
+@timed("move")
+def move_video_files_to_downloads(
+    custom_path: str = "",
+    files: Optional[List[Path]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> None:
     """Move downloaded video files to the Downloads folder
 
+    Files are moved in parallel and safely across filesystems. Existing files are
+    never overwritten.
+
     Args:
         custom_path (str, optional): Custom path to move videos to. Defaults to ~/Downloads
+        files (list, optional): Files to move, e.g. as returned by ``yt_dlp_download``.
+            Defaults to every video in the current directory
+        progress (callable, optional): Called as (file, bytes_moved, total_bytes)
 
     Raises:
         ValueError: Downloads folder path does not exist
@@ -20,22 +35,27 @@ def move_video_files_to_downloads(custom_path: str = "") -> None:
     if not downloads_folder.exists():
         raise ValueError(f"Path {downloads_folder} does not exist")
 
-    # Sort video files by creation time (most common video formats)
-    video_extensions = ["mp4"]
-    moved_files = []
-
-    for ext in video_extensions:
-        try:
-            sorted_file_paths = sort_files_by("./", ext, "date")
-            for file_path in sorted_file_paths:
-                file = file_path.name
-                log.info(f"Moving file {file} to Downloads folder...")
-                dest = downloads_folder / file
-                file_path.rename(dest)
-                moved_files.append(file)
-        except Exception:
-            # No files of this type found, continue
-            continue
+    if files is None:
+        # Sort video files by creation time (most common video formats)
+        video_extensions = ["mp4"]
+        files = []
+        for ext in video_extensions:
+            try:
+                files.extend(entry.path for entry in sort_files_by("./", ext, "date"))
+            except Exception:
+                # No files of this type found, continue
+                continue
+
+    for file_path in files:
+        log.info(f"Moving file {file_path.name} to Downloads folder...")
+    moves: List[Tuple[Path, Path]] = []
+    moved_files = move_files(
+        files,
+        downloads_folder,
+        progress=progress,
+        on_moved=lambda source, dest: moves.append((source, dest)),
+    )
+    update_file_paths(moves)
 
     if moved_files:
         log.info(f"Moved {len(moved_files)} video file(s) to {downloads_folder}")
@@ -54,9 +74,11 @@ def download_youtube_video(
         output_dir (str): Custom output directory
         force (bool): If True, download even if URL exists in history
     """
-    yt_dlp_download(url, "YouTube", "video", dry_run=dry_run, output_dir=output_dir, force=force)
+    files = yt_dlp_download(
+        url, "YouTube", "video", dry_run=dry_run, output_dir=output_dir, force=force
+    )
     if not dry_run:
         log.info("YouTube Videos successfully downloaded")
         # If custom output is specified, don't move files
         if not output_dir:
-            move_video_files_to_downloads()
+            move_video_files_to_downloads(files=files)
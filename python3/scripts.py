@@ -1,5 +1,6 @@
 import os
 import subprocess
+import sys
 from pathlib import Path
 
 
@@ -29,3 +30,18 @@ def run_coverage():
         timeout=60,
     )
     subprocess.run(["python", "-m", "coverage", "html"], cwd=script_dir, check=True, timeout=60)
+
+
+def run_benchmark():
+    """Run benchmarks and compare them with the stored baseline
+
+    Arguments are passed on, e.g. ``poetry run benchmark --quick --save-baseline``.
+    """
+    # Ensure we're running from the python3 directory
+    script_dir = Path(__file__).parent
+    subprocess.run(
+        ["python", "-m", "mac_utils.tests.benchmarks", *sys.argv[1:]],
+        cwd=script_dir,
+        check=True,
+        timeout=3600,
+    )